@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Kimeneti fájlok (összesítés, számlamelléklet, hibalista) indexe a dashboard
+kártyáihoz.
+
+A dashboard eddig minden frissítéskor globbal listázta az output és a TS
+mappát, és minden találatot stat-olt a legújabb megtalálásához — a Tk szálon,
+minden futás után. Az output mappa csak nő (minden futás új, időbélyeges
+fájlt ír), OneDrive alatt pedig minden stat lassú.
+
+Itt mappánként és fajtánként egy név → mtime tábla van, ami a munkamenetek
+között is megmarad (JSON, atomikus írással):
+
+- a futások a kimenetüket record()-dal azonnal beírják;
+- külső változás (kézzel másolt / törölt fájl) a mappa mtime-ján látszik: ha
+  az nem változott, a frissítés egyetlen stat; ha igen, egy listázás, és csak
+  az új nevek kerülnek stat-ra, a törölt nevek kiesnek.
+
+Usage:
+    from artifact_index import ArtifactIndex
+    artifacts = ArtifactIndex(Path("artifact_index.json"))
+    artifacts.record(out_path)                         # futás után
+    hit = artifacts.latest("summary", [output_root(), ts_root()])
+    if hit:
+        path, mtime = hit
+"""
+from __future__ import annotations
+
+import fnmatch
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+# --- Konfiguráció ---
+INDEX_VERSION = 1
+KINDS = {
+    "summary": "timesheet_summary_*.xlsx",
+    "invoice": "szamlamelleklet_*.xlsx",
+    "invalid": "invalid_parok_*.xlsx",
+}
+
+
+def kind_of(name: str) -> str | None:
+    """A fájlnévhez tartozó kimenet-fajta, vagy None (Excel zárolófájl sem)."""
+    if name.startswith("~$"):
+        return None
+    for kind, pattern in KINDS.items():
+        if fnmatch.fnmatch(name, pattern):
+            return kind
+    return None
+
+
+class ArtifactIndex:
+    """Mappánként: {"dir_mtime_ns", "files": {fajta: {név: mtime}}}."""
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._folders: dict[str, dict] = {}
+        self._loaded = False
+
+    # --- perzisztencia ---
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == INDEX_VERSION:
+                self._folders = data.get("folders") or {}
+        except (OSError, ValueError):
+            pass
+
+    def _save(self):
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(
+                json.dumps({"version": INDEX_VERSION, "folders": self._folders}, ensure_ascii=False),
+                encoding="utf-8",
+            )
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logging.debug(f"Kimenet-index írás sikertelen ({self.path}): {e}")
+            try:
+                tmp.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    # --- mappa szinkron ---
+    def _folder(self, folder: Path) -> dict:
+        key = os.path.abspath(folder)
+        entry = self._folders.get(key)
+        if entry is None:
+            entry = self._folders[key] = {"dir_mtime_ns": None, "files": {}}
+        return entry
+
+    def _sync(self, folder: Path) -> bool:
+        """A mappa bejegyzése naprakész; True, ha változott (mentendő)."""
+        entry = self._folder(folder)
+        try:
+            dir_mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            changed = bool(entry["files"])
+            entry["files"], entry["dir_mtime_ns"] = {}, None
+            return changed
+        if entry["dir_mtime_ns"] == dir_mtime:
+            return False
+
+        # a mappa változott: listázás, stat csak az új neveken
+        present: dict[str, set[str]] = {k: set() for k in KINDS}
+        files = entry["files"]
+        with os.scandir(folder) as it:
+            for de in it:
+                kind = kind_of(de.name)
+                if kind is None:
+                    continue
+                present[kind].add(de.name)
+                known = files.setdefault(kind, {})
+                if de.name not in known:
+                    try:
+                        known[de.name] = de.stat().st_mtime
+                    except OSError:
+                        present[kind].discard(de.name)
+        for kind in list(files):
+            files[kind] = {n: m for n, m in files[kind].items() if n in present.get(kind, ())}
+        entry["dir_mtime_ns"] = dir_mtime
+        return True
+
+    # --- nyilvános ---
+    def record(self, path: str | os.PathLike):
+        """Egy futás kimenete: azonnal bekerül (a mappa többi fájlja nem)."""
+        p = Path(path)
+        kind = kind_of(p.name)
+        if kind is None:
+            return
+        try:
+            mtime = p.stat().st_mtime
+        except OSError:
+            return
+        with self._lock:
+            self._load()
+            self._folder(p.parent)["files"].setdefault(kind, {})[p.name] = mtime
+            self._save()
+
+    def latest(self, kind: str, folders) -> tuple[Path, float] | None:
+        """A fajta legújabb fájlja a mappákban: (útvonal, mtime), vagy None."""
+        best: tuple[Path, float] | None = None
+        with self._lock:
+            self._load()
+            dirty = False
+            seen = set()
+            for folder in folders:
+                folder = Path(folder)
+                key = os.path.abspath(folder)
+                if key in seen:
+                    continue
+                seen.add(key)
+                dirty |= self._sync(folder)
+                for name, mtime in self._folder(folder)["files"].get(kind, {}).items():
+                    if best is None or mtime > best[1]:
+                        best = (folder / name, mtime)
+            if dirty:
+                self._save()
+        return best
+
+
+__all__ = ["ArtifactIndex", "KINDS", "kind_of"]
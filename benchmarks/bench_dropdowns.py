@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: update_dropdowns motorok ugyanazon a mappán — xlwings (Excel COM,
+soros), openpyxl soros és openpyxl ProcessPool.
+
+A TS mappában futtatandó (ugyanúgy, mint a szkriptek). Minden kör a TS
+fájlok friss másolatán fut egy ideiglenes mappában, az eredeti fájlok nem
+változnak. Az xlwings motor csak ott mér, ahol az xlwings + asztali Excel
+elérhető (különben kihagyja).
+
+Usage:
+    python benchmarks/bench_dropdowns.py
+    python benchmarks/bench_dropdowns.py --months januar februar --workers 4 --repeat 3
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import update_dropdowns as ud  # noqa: E402
+
+
+def run_once(engine: str, files: list[str], months, codes, projects, workers: int) -> tuple[float, int]:
+    tmp = tempfile.mkdtemp(prefix="bench_dropdowns_")
+    try:
+        for f in files:
+            shutil.copy2(f, tmp)
+        ud.FOLDER_PATH = tmp
+        t0 = time.perf_counter()
+        if engine == "xlwings":
+            results = list(ud.run_xlwings(files, months, codes, projects))
+        else:
+            results = list(ud.run_openpyxl(files, months, codes, projects, workers))
+        elapsed = time.perf_counter() - t0
+        return elapsed, sum(1 for r in results if r["ok"])
+    finally:
+        ud.FOLDER_PATH = "."
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="update_dropdowns motor benchmark")
+    parser.add_argument("--folder", default=".")
+    parser.add_argument("--months", nargs="+", default=None)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    os.chdir(args.folder)
+    files = sorted(f for f in os.listdir(".") if ud.is_ts_file(f))
+    months = [ud.remove_accents(m) for m in args.months] if args.months else ud.default_target_months()
+    codes, projects = ud.load_code_lists()
+    print(f"{len(files)} TS fájl, hónapok: {', '.join(months)}")
+
+    runs = [("openpyxl x1", "openpyxl", 1), (f"openpyxl x{args.workers}", "openpyxl", args.workers)]
+    try:
+        import xlwings  # noqa: F401
+
+        runs.insert(0, ("xlwings", "xlwings", 1))
+    except ImportError:
+        print("  xlwings nem elérhető — kihagyva")
+
+    for label, engine, workers in runs:
+        times = []
+        ok = 0
+        try:
+            for _ in range(args.repeat):
+                elapsed, ok = run_once(engine, files, months, codes, projects, workers)
+                times.append(elapsed)
+        except Exception as e:
+            print(f"  {label:<14} hiba: {e}")
+            continue
+        print(
+            f"  {label:<14} legjobb {min(times):6.2f}s   átlag {sum(times) / len(times):6.2f}s   "
+            f"kész: {ok}/{len(files)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: ecovis_ts.core.helpers.write_table — cellánként létrehozott
+Font/Border/Alignment objektumok (régi) vs. regisztrált NamedStyle-ok név
+szerint (új). Írási idő, mentési idő és fájlméret egy szintetikus,
+20 000 soros összesítésen.
+
+Usage:
+    python benchmarks/bench_named_styles.py
+    python benchmarks/bench_named_styles.py --rows 50000
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+ROOT = Path(__file__).resolve().parent.parent
+HELPERS = ROOT / "ecovis_ts_tool" / "src" / "ecovis_ts" / "core" / "helpers.py"
+
+# a helpers modult közvetlenül töltjük be: az ecovis_ts csomag __init__-je a
+# GUI-t (ttkbootstrap) is importálná
+_spec = importlib.util.spec_from_file_location("ecovis_helpers", HELPERS)
+helpers = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(helpers)
+register_styles, write_table = helpers.register_styles, helpers.write_table
+
+
+def old_write_table(sheet, df, start_row, start_col=1):
+    """A korábbi helpers.write_table (cellánként új stílus objektumok)."""
+    header_font = Font(name="Segoe UI", bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    thin_border = Border(
+        left=Side(style="thin"),
+        right=Side(style="thin"),
+        top=Side(style="thin"),
+        bottom=Side(style="thin"),
+    )
+    for j, col_name in enumerate(df.columns):
+        cell = sheet.cell(row=start_row, column=start_col + j)
+        cell.value = col_name
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = Alignment(horizontal="center")
+        cell.border = thin_border
+    for i, row in enumerate(df.values):
+        for j, value in enumerate(row):
+            cell = sheet.cell(row=start_row + i + 1, column=start_col + j)
+            cell.value = value
+            cell.font = Font(name="Segoe UI", size=10)
+            cell.border = thin_border
+            if isinstance(value, (int, float)):
+                cell.alignment = Alignment(horizontal="right")
+
+
+def make_summary(rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Ügyfélkód": rng.choice([f"C{i:03d}" for i in range(150)], rows),
+            "Projektkód": rng.choice(["KONYV", "BER", "TAN", "ADO", "INT"], rows),
+            "Munkatárs": rng.choice(["GP", "BK", "XY", "ZZ"], rows),
+            "Óra": rng.integers(1, 40, rows) / 4,
+        }
+    )
+
+
+def run(label: str, writer, df: pd.DataFrame, new_wb) -> None:
+    wb = new_wb()
+    t0 = time.perf_counter()
+    writer(wb.active, df, start_row=3)
+    t_write = time.perf_counter() - t0
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        t0 = time.perf_counter()
+        wb.save(path)
+        t_save = time.perf_counter() - t0
+        size = os.path.getsize(path)
+    finally:
+        os.unlink(path)
+    print(
+        f"  {label:<12} írás {t_write:6.2f}s   mentés {t_save:6.2f}s   "
+        f"fájl {size / 1024:8.1f} KB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NamedStyle write_table benchmark")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    df = make_summary(args.rows, args.seed)
+    print(f"Sorok: {args.rows}, oszlopok: {len(df.columns)}")
+    run("régi", old_write_table, df, Workbook)
+    run("NamedStyle", write_table, df, lambda: register_styles(Workbook()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: a GUI hidegindítása — main.py és ecovis_ts_tool/run.py.
+
+Mindkét alkalmazást TS_STARTUP_EXIT=1 mellett indítja: az ablak megjelenése
+és a háttérbetöltés (törzsadat, ügyfélkódok, logó) után kiírják az indulási
+fázisaikat (mp a folyamat indulásától) és kilépnek:
+
+    imports     a modul importok vége
+    window      a widgetek felépítve
+    shown       az első üresjárat: az ablak kirajzolva
+    background  a háttérbetöltés kész
+
+Megjelenítő kell hozzá (Windows-on adott; Linuxon pl. xvfb-run). Az
+--importtime kapcsolóval a python -X importtime szerinti legdrágább importok
+is kiíródnak.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 5 --importtime
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PHASES = ["imports", "window", "shown", "background"]
+APPS = [
+    ("main.py", ROOT, ["main.py"]),
+    ("run.py", ROOT / "ecovis_ts_tool", ["run.py"]),
+]
+
+
+def run_once(cwd: Path, argv: list[str], importtime: bool) -> tuple[float, dict, str]:
+    env = {**os.environ, "TS_STARTUP_EXIT": "1", "PYTHONDONTWRITEBYTECODE": "1"}
+    cmd = [sys.executable, *(["-X", "importtime"] if importtime else []), *argv]
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True, timeout=120)
+    wall = time.perf_counter() - t0
+    phases = {}
+    for line in proc.stdout.splitlines():
+        try:
+            data = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(data, dict) and "shown" in data:
+            phases = data
+    if proc.returncode != 0 or not phases:
+        tail = (proc.stderr or proc.stdout).strip().splitlines()[-3:]
+        raise RuntimeError(f"rc={proc.returncode}: " + " | ".join(tail))
+    return wall, phases, proc.stderr
+
+
+def top_imports(stderr: str, n: int = 12) -> list[tuple[int, str]]:
+    """A legdrágább (kumulatív) importok a -X importtime kimenetéből: (µs, modul)."""
+    # "import time:  self [us] | cumulative | imported package" — a név előtti
+    # szóközök a beágyazási mélységet jelzik
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2]
+        if name.startswith("  "):  # csak a legfelső szintű importok
+            continue
+        rows.append((int(parts[1]), name.strip()))
+    return sorted(rows, reverse=True)[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GUI hidegindítás benchmark")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--importtime", action="store_true", help="A legdrágább importok kiírása")
+    args = parser.parse_args()
+
+    for label, cwd, argv in APPS:
+        best: dict[str, float] = {}
+        walls = []
+        stderr = ""
+        try:
+            for _ in range(args.repeat):
+                wall, phases, stderr = run_once(cwd, argv, args.importtime)
+                walls.append(wall)
+                for k in PHASES:
+                    if k in phases:
+                        best[k] = min(best.get(k, float("inf")), phases[k])
+        except Exception as e:
+            print(f"  {label:<8} hiba: {e}")
+            continue
+        cols = "   ".join(f"{k} {best[k]:5.2f}s" for k in PHASES if k in best)
+        print(f"  {label:<8} {cols}   folyamat {min(walls):5.2f}s")
+        if args.importtime:
+            for us, name in top_imports(stderr):
+                print(f"      {us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: pd.ExcelFile + pd.read_excel(nrows=300) vs. ts_reader.read_month_sheet
+
+A TS mappában futtatandó (ugyanúgy, mint a szkriptek), a cache-t NEM használja,
+mindkét útvonal minden körben ténylegesen beolvassa a lapot.
+
+Usage:
+    python benchmarks/bench_ts_reader.py januar
+    python benchmarks/bench_ts_reader.py januar --folder . --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import unicodedata
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ts_reader import (  # noqa: E402
+    MAX_ROWS_PER_SHEET,
+    read_month_sheet,
+    workbook_sheet_names,
+)
+
+
+def _norm(s: str) -> str:
+    nfkd = unicodedata.normalize("NFKD", str(s))
+    return "".join(c for c in nfkd if not unicodedata.combining(c)).strip().lower()
+
+
+def is_ts_file(name: str) -> bool:
+    return name.endswith(".xlsx") and "TS" in name and not name.startswith("~$")
+
+
+def old_path(path: Path, month_norm: str) -> int:
+    xls = pd.ExcelFile(path)
+    n = 0
+    for sheet in xls.sheet_names:
+        if _norm(sheet) != month_norm:
+            continue
+        df = pd.read_excel(xls, sheet_name=sheet, nrows=MAX_ROWS_PER_SHEET)
+        n += len(df.dropna(how="all"))
+    return n
+
+
+def new_path(path: Path, month_norm: str) -> int:
+    n = 0
+    for sheet in workbook_sheet_names(path):
+        if _norm(sheet) != month_norm:
+            continue
+        n += len(read_month_sheet(path, sheet))
+    return n
+
+
+def measure(fn, files: list[Path], month_norm: str, repeat: int) -> tuple[float, float, int]:
+    rows = 0
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        rows = sum(fn(f, month_norm) for f in files)
+    elapsed = (time.perf_counter() - t0) / repeat
+
+    tracemalloc.start()
+    for f in files:
+        fn(f, month_norm)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TS olvasó benchmark")
+    parser.add_argument("month", help="Hónap (pl. januar)")
+    parser.add_argument("--folder", "-f", default=".")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    folder = Path(args.folder)
+    files = [folder / f for f in sorted(os.listdir(folder)) if is_ts_file(f)]
+    if not files:
+        print("Nincs TS fájl a mappában.")
+        return
+    month_norm = _norm(args.month)
+
+    print(f"{len(files)} TS fájl, hónap: {month_norm}, ismétlés: {args.repeat}")
+    for label, fn in (("pandas read_excel", old_path), ("ts_reader stream", new_path)):
+        sec, peak_mb, rows = measure(fn, files, month_norm, args.repeat)
+        print(f"  {label:<18} {sec * 1000:8.1f} ms/kör   csúcs: {peak_mb:6.1f} MB   sorok: {rows}")
+
+
+if __name__ == "__main__":
+    main()
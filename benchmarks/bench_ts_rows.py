@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: a timesheet_summary lapszintű sorfeldolgozása — régi iterrows
+ciklus (float() try/except, set lookup, soronként dict) vs. a vektorizált
+ts_ingest._ingest_sheet (to_numeric, isin, egyetlen pd.concat a végén).
+
+Szintetikus hónap-lapokkal fut (Excel I/O nélkül), 50 / 500 / 5000
+"munkafüzettel"; a két út eredményét össze is veti.
+
+Usage:
+    python benchmarks/bench_ts_rows.py
+    python benchmarks/bench_ts_rows.py --sizes 50 500 --rows 80
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ts_ingest import RECORD_COLUMNS, _ingest_sheet, _new_batch  # noqa: E402
+
+CODES = [f"C{i:03d}" for i in range(120)]
+ACTIVE = set(CODES[:100])  # ~1/6 passzív ügyfél
+PROJECTS = ["Könyvelés - fix", "Bérszámfejtés", "Tanácsadás", "Intrastat, MNB"]
+DESCS = ["Havi zárás", "Bevallás", "Egyeztetés", np.nan]
+
+
+def make_sheet(rng: random.Random, rows: int) -> pd.DataFrame:
+    """Egy TS hónap-lap, ahogy a ts_reader adja (dtype=object, NaN-os hézagokkal)."""
+    data = []
+    for _ in range(rows):
+        hours = rng.choice([0.25, 0.5, 1, 1.5, 2, 3.75, 8, "n/a", np.nan])
+        data.append(
+            [
+                rng.choice(CODES) if rng.random() > 0.03 else np.nan,
+                rng.choice(PROJECTS),
+                hours,
+                rng.choice(DESCS),
+            ]
+        )
+    return pd.DataFrame(
+        data,
+        columns=["Ügyfélkód", "Projekt neve", "Időráfordítás (óra)", "Munka leírása"],
+        dtype=object,
+    )
+
+
+def old_step(df: pd.DataFrame, person: str, file: str, month: str) -> list[dict]:
+    """A korábbi, soronkénti feldolgozás (a dropna lépések után)."""
+    df = df.dropna(how="all")
+    df = df.dropna(subset=["Ügyfélkód", "Projekt neve", "Időráfordítás (óra)"])
+    records = []
+    for _, r in df.iterrows():
+        try:
+            hours = float(r["Időráfordítás (óra)"])
+        except Exception:
+            continue
+        val = r.get("Munka leírása", "")
+        desc_val = "" if pd.isna(val) else str(val)
+        kod = str(r["Ügyfélkód"])
+        if kod not in ACTIVE:
+            continue
+        records.append(
+            {
+                "Ügyfélkód": kod,
+                "Projekt neve": str(r["Projekt neve"]),
+                "Munka leírása": desc_val,
+                "Dolgozó": person,
+                "Forrás fájl": file,
+                "Óra": round(hours, 2),
+                "Hónap": month,
+            }
+        )
+    return records
+
+
+def run_old(sheets: list[pd.DataFrame]) -> pd.DataFrame:
+    records: list[dict] = []
+    for i, df in enumerate(sheets):
+        records.extend(old_step(df.copy(), f"TS P{i}", f"TS P{i}.xlsx", "januar"))
+    return pd.DataFrame.from_records(records, columns=RECORD_COLUMNS)
+
+
+def run_new(sheets: list[pd.DataFrame]) -> pd.DataFrame:
+    frames: list[pd.DataFrame] = []
+    for i, df in enumerate(sheets):
+        batch = _new_batch(f"TS P{i}.xlsx")
+        _ingest_sheet(batch, df.copy(), f"TS P{i}", "januar", ACTIVE)
+        frames.extend(batch["frames"])
+    if not frames:
+        return pd.DataFrame(columns=RECORD_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TS sorfeldolgozás benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--rows", type=int, default=120, help="Sor / lap")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pool = [make_sheet(rng, args.rows) for _ in range(50)]
+
+    print(f"Sor / lap: {args.rows}")
+    for n in args.sizes:
+        sheets = [pool[i % len(pool)] for i in range(n)]
+        t0 = time.perf_counter()
+        old = run_old(sheets)
+        t_old = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        new = run_new(sheets)
+        t_new = time.perf_counter() - t0
+
+        same = old.reset_index(drop=True).equals(new.reset_index(drop=True))
+        print(
+            f"  {n:>5} munkafüzet: iterrows {t_old * 1000:9.1f} ms   "
+            f"vektorizált {t_new * 1000:8.1f} ms   "
+            f"x{t_old / max(t_new, 1e-9):5.1f}   sorok: {len(new)}   egyezik: {same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Kódlista-ujjlenyomat a legördülő-frissítéshez (update_dropdowns).
+
+A frissítés után a TS munkafüzet egy egyéni dokumentum-tulajdonságot kap
+(EcovisDropdownHash) a beírt ügyfélkód- és projektlisták (+ a frissített
+hónapok) hash-ével. A következő futás a tulajdonságot közvetlenül a zip
+docProps/custom.xml bejegyzéséből olvassa (se openpyxl, se Excel), és ha a
+hash egyezik, a fájlt meg sem nyitja — így nem íródnak újra a OneDrive-on
+éppen nyitva lévő fájlok, ha a TS kódok nem változtak.
+
+Usage:
+    from dropdown_stamp import code_list_hash, is_up_to_date, stamp_openpyxl
+    digest = code_list_hash(ugyfelkodok, projektnevek, months)
+    if not is_up_to_date(path, digest):
+        ...
+        stamp_openpyxl(wb, digest)
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import xml.etree.ElementTree as ET
+import zipfile
+
+from openpyxl.packaging.custom import StringProperty
+
+STAMP_PROPERTY = "EcovisDropdownHash"
+STAMP_VERSION = 2  # a hash bemenetének változásakor emelendő
+
+_CUSTOM_PART = "docProps/custom.xml"
+_MSO_PROPERTY_TYPE_STRING = 4
+
+
+def code_list_hash(ugyfelkodok, projektnevek, months=(), layout: str = "columns") -> str:
+    """sha1 a listákból (sorrendtartó), a hónapokból (rendezve) és az
+    elrendezésből (columns / names — váltáskor minden fájl frissül)."""
+    payload = json.dumps(
+        [STAMP_VERSION, list(ugyfelkodok), list(projektnevek), sorted(months), layout],
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def read_custom_property(path: str | os.PathLike, name: str = STAMP_PROPERTY) -> str | None:
+    """Egyéni dokumentum-tulajdonság értéke a zip-ből, munkafüzet-betöltés nélkül."""
+    try:
+        with zipfile.ZipFile(path) as zf:
+            if _CUSTOM_PART not in zf.NameToInfo:
+                return None
+            root = ET.fromstring(zf.read(_CUSTOM_PART))
+    except (OSError, zipfile.BadZipFile, ET.ParseError):
+        return None
+    for prop in root:
+        if prop.tag.rsplit("}", 1)[-1] == "property" and prop.get("name") == name:
+            # <property name=".."><vt:lpwstr>érték</vt:lpwstr></property>
+            for value in prop:
+                return value.text
+    return None
+
+
+def is_up_to_date(path: str | os.PathLike, digest: str) -> bool:
+    return read_custom_property(path) == digest
+
+
+def stamp_openpyxl(wb, digest: str):
+    """A hash beírása egy openpyxl munkafüzetbe (mentés előtt)."""
+    props = wb.custom_doc_props
+    if STAMP_PROPERTY in props.names:
+        del props[STAMP_PROPERTY]
+    props.append(StringProperty(name=STAMP_PROPERTY, value=digest))
+
+
+def stamp_xlwings(book, digest: str):
+    """A hash beírása egy xlwings (Excel COM) munkafüzetbe (mentés előtt)."""
+    props = book.api.CustomDocumentProperties
+    try:
+        props(STAMP_PROPERTY).Delete()
+    except Exception:
+        pass  # még nincs ilyen tulajdonság
+    props.Add(STAMP_PROPERTY, False, _MSO_PROPERTY_TYPE_STRING, digest)
+
+
+__all__ = [
+    "STAMP_PROPERTY",
+    "code_list_hash",
+    "read_custom_property",
+    "is_up_to_date",
+    "stamp_openpyxl",
+    "stamp_xlwings",
+]
@@ -1,3 +1,8 @@
+import time
+
+# startup reference for EcovisApp.startup_phases (taken before the UI imports)
+STARTUP_T0 = time.perf_counter()
+
 import sys
 from pathlib import Path
 from src.ecovis_ts.ui.app import EcovisApp
@@ -9,5 +14,5 @@ if src_path not in sys.path:
 
 
 if __name__ == "__main__":
-    app = EcovisApp()
+    app = EcovisApp(startup_t0=STARTUP_T0)
     app.mainloop()
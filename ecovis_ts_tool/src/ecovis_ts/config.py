@@ -15,6 +15,8 @@ DEFAULT_SETTINGS = {
     "auto_open_output_on_success": True,
     "auto_open_details_on_error": True,
     "sound_enabled": True,
+    "job_timeout_min": 30,  # 0 => no timeout
+    "max_parallel_readers": 2,
 }
 
 
@@ -2,8 +2,17 @@ import pandas as pd
 import logging
 from datetime import datetime
 from openpyxl import Workbook
+from ..utils import jobs, progress
 from ..utils.paths import ts_root, output_root
-from .helpers import norm_header, write_table, add_title_banner, autosize_columns
+from .helpers import (
+    norm_header,
+    write_table,
+    add_title_banner,
+    autosize_columns,
+    register_styles,
+)
+from .sheet_cache import sheet_names, read_sheet
+from . import master_data
 
 
 def aggregate_timesheets(month: str):
@@ -15,13 +24,7 @@ def aggregate_timesheets(month: str):
 
     # 1. Load active clients
     try:
-        ceg_path = ts_dir / "Ecovis Compliance Solution számlázási adatok_2025.xlsx"
-        ceg = pd.read_excel(ceg_path, sheet_name="Cégadatok")
-        active_clients = set(
-            ceg[ceg["Ügyfél aktív"].astype("str").str.strip().str.lower() == "igen"][
-                "Ügyfélkód"
-            ].astype("str")
-        )
+        active_clients = master_data.active_clients()
     except Exception as e:
         logger.error(f"Hiba az aktív ügyfelek betöltésekor: {e}")
         return None
@@ -34,14 +37,16 @@ def aggregate_timesheets(month: str):
         if "TS" in p.name and not p.name.startswith("~$")
     ]
 
+    progress.start("aggregate", total=len(files))
     for file_path in files:
+        jobs.checkpoint()
         name_part = file_path.stem.replace("TS ", "")
         logger.info(f"Feldolgozás: {file_path.name}")
+        progress.file_started(file_path.name)
 
         try:
-            xls = pd.ExcelFile(file_path)
             month_sheet = next(
-                (s for s in xls.sheet_names if norm_header(s) == norm_header(month)),
+                (s for s in sheet_names(file_path) if norm_header(s) == norm_header(month)),
                 None,
             )
 
@@ -49,20 +54,20 @@ def aggregate_timesheets(month: str):
                 logger.warning(
                     f"  - Nem található '{month}' munkalap a(z) {file_path.name} fájlban."
                 )
+                progress.file_skipped(file_path.name, "no month sheet")
                 continue
 
-            df = pd.read_excel(xls, sheet_name=month_sheet)
+            df = read_sheet(file_path, month_sheet)
             df.columns = [str(c).strip() for c in df.columns]
 
-            # Filter rows with data
-            mask = (
-                df["Ügyfélkód"].notna()
-                & df["Projektkód"].notna()
-                & (df["Időtartam (óra)"] > 0)
-            )
+            # Filter rows with data. Cached sheets are raw (dtype=object), so the
+            # hours are coerced once and the numeric value is what gets stored.
+            hours = pd.to_numeric(df["Időtartam (óra)"], errors="coerce")
+            mask = df["Ügyfélkód"].notna() & df["Projektkód"].notna() & (hours > 0)
             valid_df = df[mask]
+            progress.file_finished(file_path.name, rows=int(mask.sum()))
 
-            for _, row in valid_df.iterrows():
+            for idx, row in valid_df.iterrows():
                 u_kod = str(row["Ügyfélkód"]).strip()
                 if u_kod in active_clients:
                     records.append(
@@ -74,14 +79,16 @@ def aggregate_timesheets(month: str):
                                 row.get("Feladat részletezése", "")
                             ),
                             "Dátum": row["Dátum"],
-                            "Óra": row["Időtartam (óra)"],
+                            "Óra": float(hours[idx]),
                         }
                     )
         except Exception as e:
             logger.error(f"  - Hiba a(z) {file_path.name} feldolgozásakor: {e}")
+            progress.file_failed(file_path.name, str(e))
 
     if not records:
         logger.error("Nem találtam adatot a megadott hónapra.")
+        progress.error("Nem találtam adatot a megadott hónapra.")
         return None
 
     # 3. Create Result Workbook
@@ -92,13 +99,13 @@ def aggregate_timesheets(month: str):
         .reset_index()
     )
 
-    wb = Workbook()
+    wb = register_styles(Workbook())
     ws = wb.active
     ws.title = "Összesítés"
 
     add_title_banner(ws, "Havi Összesített Idők", month, col_count=4)
     write_table(ws, summary_df, start_row=3)
-    autosize_columns(ws)
+    autosize_columns(ws, summary_df)
 
     filename = (
         f"timesheet_summary_{month}_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
@@ -107,4 +114,5 @@ def aggregate_timesheets(month: str):
     wb.save(save_path)
 
     logger.info(f"✅ Kész! Mentve: {save_path.name}")
+    progress.output(save_path)
     return save_path
@@ -1,7 +1,56 @@
 import unicodedata
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 
+# Named styles shared by every generated report. A cell referencing a named
+# style stores one style id instead of its own Font/Border/Alignment objects,
+# so openpyxl has nothing to de-duplicate on save.
+STYLE_HEADER = "Ecovis Header"
+STYLE_BODY = "Ecovis Body"
+STYLE_NUMERIC = "Ecovis Numeric"
+STYLE_BANNER = "Ecovis Banner"
+
+_THIN = Side(style="thin")
+
+
+def _build_styles():
+    border = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+    return [
+        NamedStyle(
+            name=STYLE_HEADER,
+            font=Font(name="Segoe UI", bold=True, color="FFFFFF"),
+            fill=PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid"),
+            alignment=Alignment(horizontal="center"),
+            border=border,
+        ),
+        NamedStyle(
+            name=STYLE_BODY,
+            font=Font(name="Segoe UI", size=10),
+            border=border,
+        ),
+        NamedStyle(
+            name=STYLE_NUMERIC,
+            font=Font(name="Segoe UI", size=10),
+            alignment=Alignment(horizontal="right"),
+            border=border,
+        ),
+        NamedStyle(
+            name=STYLE_BANNER,
+            font=Font(name="Segoe UI", size=16, bold=True, color="FFFFFF"),
+            fill=PatternFill(start_color="002060", end_color="002060", fill_type="solid"),
+            alignment=Alignment(horizontal="center", vertical="center"),
+        ),
+    ]
+
+
+def register_styles(wb):
+    """Registers the Ecovis named styles on a workbook (idempotent)."""
+    existing = set(wb.named_styles)
+    for style in _build_styles():
+        if style.name not in existing:
+            wb.add_named_style(style)
+    return wb
+
 
 def norm_header(s):
     """Normalizes strings for comparison (removes accents, lowercase, strips)."""
@@ -18,8 +67,22 @@ def norm_header(s):
     )
 
 
-def autosize_columns(sheet):
-    """Automatically adjusts column widths based on content."""
+def autosize_columns(sheet, df=None, start_col=1, cap=60):
+    """Adjusts column widths to the longest header or value (+2, at most cap).
+
+    With a DataFrame the widths are planned from the data that write_table
+    wrote (vectorized per column), so the merged title banner does not
+    widen the first column and no cell is re-read. Without one, falls back
+    to scanning every cell of the sheet.
+    """
+    if df is not None:
+        for j, col_name in enumerate(df.columns, start=start_col):
+            values = df.iloc[:, j - start_col].dropna()
+            longest = int(values.astype(str).str.len().max()) if len(values) else 0
+            width = max(longest, len(str(col_name))) + 2
+            sheet.column_dimensions[get_column_letter(j)].width = min(width, cap)
+        return
+
     for col in sheet.columns:
         max_length = 0
         column = col[0].column_letter
@@ -29,49 +92,30 @@ def autosize_columns(sheet):
                     max_length = max(max_length, len(str(cell.value)))
             except:
                 pass
-        sheet.column_dimensions[column].width = max_length + 2
+        sheet.column_dimensions[column].width = min(max_length + 2, cap)
 
 
 def add_title_banner(sheet, title, month, col_count=7):
     """Adds the standard Ecovis styled title banner to a sheet."""
+    register_styles(sheet.parent)
     sheet.merge_cells(start_row=1, start_column=1, end_row=1, end_column=col_count)
     cell = sheet.cell(row=1, column=1)
     cell.value = f"{title} - {month}"
-    cell.font = Font(name="Segoe UI", size=16, bold=True, color="FFFFFF")
-    cell.alignment = Alignment(horizontal="center", vertical="center")
-    cell.fill = PatternFill(start_color="002060", end_color="002060", fill_type="solid")
+    cell.style = STYLE_BANNER
     sheet.row_dimensions[1].height = 30
 
 
 def write_table(sheet, df, start_row, start_col=1):
-    """Writes a DataFrame to a sheet with standard styling and borders."""
-    # Header styling
-    header_font = Font(name="Segoe UI", bold=True, color="FFFFFF")
-    header_fill = PatternFill(
-        start_color="4472C4", end_color="4472C4", fill_type="solid"
-    )
-    thin_border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin"),
-    )
+    """Writes a DataFrame to a sheet with the named header/body/numeric styles."""
+    register_styles(sheet.parent)
 
     # Write headers
-    for j, col_name in enumerate(df.columns):
-        cell = sheet.cell(row=start_row, column=start_col + j)
-        cell.value = col_name
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="center")
-        cell.border = thin_border
-
-    # Write data
-    for i, row in enumerate(df.values):
-        for j, value in enumerate(row):
-            cell = sheet.cell(row=start_row + i + 1, column=start_col + j)
-            cell.value = value
-            cell.font = Font(name="Segoe UI", size=10)
-            cell.border = thin_border
-            if isinstance(value, (int, float)):
-                cell.alignment = Alignment(horizontal="right")
+    for j, col_name in enumerate(df.columns, start=start_col):
+        cell = sheet.cell(row=start_row, column=j, value=col_name)
+        cell.style = STYLE_HEADER
+
+    # Write data, one row at a time; numbers are right-aligned
+    for i, row in enumerate(df.values.tolist(), start=start_row + 1):
+        for j, value in enumerate(row, start=start_col):
+            cell = sheet.cell(row=i, column=j, value=value)
+            cell.style = STYLE_NUMERIC if isinstance(value, (int, float)) else STYLE_BODY
@@ -1,8 +1,15 @@
 import pandas as pd
 import logging
 from openpyxl import Workbook
+from ..utils import progress
 from ..utils.paths import output_root, ts_root
-from .helpers import norm_header, write_table, add_title_banner, autosize_columns
+from .helpers import (
+    norm_header,
+    write_table,
+    add_title_banner,
+    autosize_columns,
+    register_styles,
+)
 
 
 def generate_invoice_annex(month: str, target_clients: list = None):
@@ -16,6 +23,7 @@ def generate_invoice_annex(month: str, target_clients: list = None):
         logger.error(
             f"Nem található összesített fájl a(z) {month} hónaphoz. Futtasd az Összesítést először!"
         )
+        progress.error(f"Nem található összesített fájl a(z) {month} hónaphoz.")
         return None
 
     summary_path = summaries[-1]
@@ -28,17 +36,18 @@ def generate_invoice_annex(month: str, target_clients: list = None):
         logger.warning("Nincs adat a megadott szűrők alapján.")
         return None
 
-    wb = Workbook()
+    wb = register_styles(Workbook())
     ws = wb.active
     ws.title = "Számlamelléklet"
 
     add_title_banner(ws, "Számlamelléklet", month, col_count=len(df.columns))
     write_table(ws, df, start_row=3)
-    autosize_columns(ws)
+    autosize_columns(ws, df, cap=90)
 
     out_name = f"szamlamelleklet_{month}.xlsx"
     save_path = output_root() / out_name
     wb.save(save_path)
 
     logger.info(f"✅ Számlamelléklet elkészült: {out_name}")
+    progress.output(save_path)
     return save_path
@@ -0,0 +1,100 @@
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+import pandas as pd
+
+from ..utils.paths import ts_root
+
+# Same workbook, sheets and snapshot directory as the top-level master_data.py.
+MASTER_FILE = "Ecovis Compliance Solution számlázási adatok_2025.xlsx"
+CEGADATOK_SHEET = "Cégadatok"
+TS_KODOK_SHEET = "TS kódok"
+SNAPSHOT_SUBDIR = Path(".ts_cache") / "master"
+SNAPSHOT_VERSION = 1
+
+Fingerprint = Tuple[int, int]
+
+_MEMO: Dict[str, Tuple[Fingerprint, Dict[str, pd.DataFrame]]] = {}
+
+
+def master_path() -> Path:
+    """Returns the master data workbook inside the TS folder."""
+    return ts_root() / MASTER_FILE
+
+
+def fingerprint(path: Optional[Path] = None) -> Fingerprint:
+    """(size, mtime_ns) identifies one version of the master workbook."""
+    st = Path(path or master_path()).stat()
+    return st.st_size, st.st_mtime_ns
+
+
+def _snapshot_path(p: Path) -> Path:
+    digest = hashlib.sha1(str(p).encode("utf-8")).hexdigest()[:16]
+    return p.parent / SNAPSHOT_SUBDIR / f"{digest}_sheets.pkl"
+
+
+def _load_sheets(p: Path, fp: Fingerprint) -> Dict[str, pd.DataFrame]:
+    snap = _snapshot_path(p)
+    try:
+        with open(snap, "rb") as f:
+            payload = pickle.load(f)
+        if payload.get("version") == SNAPSHOT_VERSION and payload.get("fp") == fp:
+            return payload["sheets"]
+    except Exception:
+        pass
+
+    with pd.ExcelFile(p) as xls:
+        sheets = {
+            CEGADATOK_SHEET: pd.read_excel(xls, sheet_name=CEGADATOK_SHEET),
+            TS_KODOK_SHEET: pd.read_excel(xls, sheet_name=TS_KODOK_SHEET),
+        }
+
+    tmp = snap.with_name(f"{snap.name}.{os.getpid()}.tmp")
+    try:
+        snap.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": SNAPSHOT_VERSION, "fp": fp, "sheets": sheets}, f)
+        os.replace(tmp, snap)
+    except Exception as e:
+        logging.getLogger(__name__).debug(f"Master snapshot write failed: {e}")
+        try:
+            tmp.unlink(missing_ok=True)
+        except OSError:
+            pass
+    return sheets
+
+
+def _sheets() -> Dict[str, pd.DataFrame]:
+    """Both master sheets, parsed once per process and re-read when the file changes."""
+    p = master_path().resolve()
+    fp = fingerprint(p)
+    hit = _MEMO.get(str(p))
+    if hit and hit[0] == fp:
+        return hit[1]
+    sheets = _load_sheets(p, fp)
+    _MEMO[str(p)] = (fp, sheets)
+    return sheets
+
+
+def cegadatok() -> pd.DataFrame:
+    """Returns a copy of the 'Cégadatok' sheet."""
+    return _sheets()[CEGADATOK_SHEET].copy()
+
+
+def ts_kodok() -> pd.DataFrame:
+    """Returns a copy of the 'TS kódok' sheet."""
+    return _sheets()[TS_KODOK_SHEET].copy()
+
+
+def active_clients() -> Set[str]:
+    """Client codes marked active ('Ügyfél aktív' == 'igen')."""
+    ceg = _sheets()[CEGADATOK_SHEET]
+    return set(
+        ceg[ceg["Ügyfél aktív"].astype("str").str.strip().str.lower() == "igen"][
+            "Ügyfélkód"
+        ].astype("str")
+    )
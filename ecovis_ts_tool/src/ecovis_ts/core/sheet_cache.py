@@ -0,0 +1,108 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from ..utils.paths import ts_root
+
+# On-disk cache of the raw (dtype=object) sheets read by the aggregator and
+# the validator, keyed by (path, size, mtime) plus sheet name and row limit.
+# It lives next to the top-level ts_cache.py entries but in its own
+# subdirectory: the payloads differ (whole sheets here, selected columns
+# there) and each cache prunes every entry of a changed workbook under its
+# directory, so sharing .ts_cache/sheets would make them delete each other's.
+CACHE_SUBDIR = Path(".ts_cache") / "pkg_sheets"
+
+Fingerprint = Tuple[str, int, int]
+
+
+def cache_dir() -> Path:
+    """Returns the sheet cache directory inside the TS folder."""
+    return ts_root() / CACHE_SUBDIR
+
+
+def fingerprint(path) -> Fingerprint:
+    """(absolute path, size, mtime_ns) identifies one version of a workbook."""
+    p = Path(path).resolve()
+    st = p.stat()
+    return str(p), st.st_size, st.st_mtime_ns
+
+
+def _digest(s: str) -> str:
+    return hashlib.sha1(s.encode("utf-8")).hexdigest()[:16]
+
+
+def _entry_path(fp: Fingerprint, kind: str) -> Path:
+    path_s, size, mtime = fp
+    return cache_dir() / f"{_digest(path_s)}_{size}_{mtime}_{_digest(kind)}"
+
+
+def _prune_stale(fp: Fingerprint):
+    """Drops entries that belong to older versions of the same workbook."""
+    path_s, size, mtime = fp
+    prefix = _digest(path_s)
+    current = f"{prefix}_{size}_{mtime}_"
+    try:
+        for old in cache_dir().glob(f"{prefix}_*"):
+            if not old.name.startswith(current):
+                old.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def _atomic_write(target: Path, write):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, target)
+    except Exception as e:
+        logging.getLogger(__name__).debug(f"Cache write failed ({target.name}): {e}")
+        try:
+            tmp.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def sheet_names(path) -> List[str]:
+    """Returns the sheet names of a workbook, from cache when unchanged."""
+    fp = fingerprint(path)
+    entry = _entry_path(fp, "__sheet_names__").with_suffix(".json")
+    if entry.exists():
+        try:
+            return json.loads(entry.read_text(encoding="utf-8"))
+        except Exception:
+            pass
+
+    with pd.ExcelFile(path) as xls:
+        names = list(xls.sheet_names)
+    _prune_stale(fp)
+    _atomic_write(
+        entry,
+        lambda p: p.write_text(json.dumps(names, ensure_ascii=False), encoding="utf-8"),
+    )
+    return names
+
+
+def read_sheet(path, sheet: str, nrows: Optional[int] = None) -> pd.DataFrame:
+    """Returns the raw (dtype=object) sheet, parsing the workbook only on a cache miss.
+
+    nrows is passed to pd.read_excel: None (the default) reads every row, an
+    int keeps only the first nrows data rows. It is part of the cache key.
+    """
+    fp = fingerprint(path)
+    entry = _entry_path(fp, f"{sheet}\x00{nrows}").with_suffix(".pkl")
+    if entry.exists():
+        try:
+            return pd.read_pickle(entry)
+        except Exception:
+            pass
+
+    df = pd.read_excel(path, sheet_name=sheet, nrows=nrows, dtype=object)
+    _prune_stale(fp)
+    _atomic_write(entry, lambda p: df.to_pickle(p))
+    return df.copy()
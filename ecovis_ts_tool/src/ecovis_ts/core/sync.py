@@ -1,47 +1,114 @@
+import hashlib
+import json
+import xml.etree.ElementTree as ET
+import zipfile
+
 import xlwings as xw
-import pandas as pd
 import logging
+from ..utils import jobs, progress
 from ..utils.paths import ts_root
+from . import master_data
+
+# A workbook stamped with the hash of the lists it was given is skipped next
+# time without being opened in Excel. This sync writes something different
+# from the top-level update_dropdowns.py (Y/Z lists on the first sheet only;
+# no month sheets, validations or layouts), so it uses its own property:
+# sharing dropdown_stamp's EcovisDropdownHash would let the two tools
+# invalidate each other's stamps and rewrite every workbook on each switch.
+STAMP_PROPERTY = "EcovisSyncListsHash"
+_MSO_PROPERTY_TYPE_STRING = 4
+
 
+def code_list_hash(u_list, p_list):
+    """sha1 of the client and project lists, order preserved."""
+    payload = json.dumps([list(u_list), list(p_list)], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def read_stamp(path):
+    """Reads the stamp from docProps/custom.xml inside the xlsx zip, or None."""
+    try:
+        with zipfile.ZipFile(path) as zf:
+            if "docProps/custom.xml" not in zf.NameToInfo:
+                return None
+            root = ET.fromstring(zf.read("docProps/custom.xml"))
+    except (OSError, zipfile.BadZipFile, ET.ParseError):
+        return None
+    for prop in root:
+        if prop.tag.rsplit("}", 1)[-1] == "property" and prop.get("name") == STAMP_PROPERTY:
+            for value in prop:
+                return value.text
+    return None
 
-def sync_dropdown_lists():
+
+def _write_stamp(book, digest):
+    props = book.api.CustomDocumentProperties
+    try:
+        props(STAMP_PROPERTY).Delete()
+    except Exception:
+        pass
+    props.Add(STAMP_PROPERTY, False, _MSO_PROPERTY_TYPE_STRING, digest)
+
+
+def sync_dropdown_lists(force=False):
     logger = logging.getLogger(__name__)
     logger.info("▶ Legördülők frissítése minden TS fájlban...")
 
     ts_dir = ts_root()
-    master_path = ts_dir / "Ecovis Compliance Solution számlázási adatok_2025.xlsx"
+    master_path = master_data.master_path()
 
     try:
         # Load master data
-        master_df = pd.read_excel(master_path, sheet_name="TS kódok")
+        master_df = master_data.ts_kodok()
         u_list = master_df["Ügyfélkód"].unique().tolist()
         p_list = master_df["TS kód"].unique().tolist()
+        digest = code_list_hash(u_list, p_list)
 
-        app = xw.App(visible=False, add_book=False)
-        for ts_file in ts_dir.glob("*.xlsx"):
-            if "TS" not in ts_file.name or ts_file.name.startswith("~$"):
-                continue
-            if ts_file.name == master_path.name:
+        stale = []
+        up_to_date = 0
+        ts_files = [
+            p
+            for p in ts_dir.glob("*.xlsx")
+            if "TS" in p.name and not p.name.startswith("~$") and p.name != master_path.name
+        ]
+        progress.start("sync", total=len(ts_files))
+        for ts_file in ts_files:
+            if not force and read_stamp(ts_file) == digest:
+                up_to_date += 1
+                progress.file_skipped(ts_file.name, "up to date")
                 continue
+            stale.append(ts_file)
 
-            logger.info(f"  - Frissítés: {ts_file.name}")
-            wb = app.books.open(ts_file)
+        if stale:
+            app = xw.App(visible=False, add_book=False)
+            # a hung COM call cannot be interrupted: cancelling kills Excel
+            jobs.on_cancel(app.kill)
+            for ts_file in stale:
+                jobs.checkpoint()
+                logger.info(f"  - Frissítés: {ts_file.name}")
+                wb = app.books.open(ts_file)
 
-            # Update the hidden Lists sheet or static columns
-            # Assuming logic from original update_dropdowns.py
-            sheet = wb.sheets[0]
-            sheet.range("Y2:Y500").clear_contents()
-            sheet.range("Z2:Z500").clear_contents()
+                # Update the hidden Lists sheet or static columns
+                # Assuming logic from original update_dropdowns.py
+                sheet = wb.sheets[0]
+                sheet.range("Y2:Y500").clear_contents()
+                sheet.range("Z2:Z500").clear_contents()
 
-            sheet.range("Y2").options(transpose=True).value = u_list
-            sheet.range("Z2").options(transpose=True).value = p_list
+                sheet.range("Y2").options(transpose=True).value = u_list
+                sheet.range("Z2").options(transpose=True).value = p_list
 
-            wb.save()
-            wb.close()
+                _write_stamp(wb, digest)
+                wb.save()
+                wb.close()
+                progress.file_finished(ts_file.name)
 
-        app.quit()
+            app.quit()
+        logger.info(f"  ⏭ {up_to_date} fájl naprakész (változatlan kódlisták)")
         logger.info("✅ Minden legördülő lista frissítve.")
         return True
+    except jobs.JobCancelled:
+        raise
     except Exception as e:
         logger.error(f"Hiba a frissítés során: {e}")
+        progress.error(f"Hiba a frissítés során: {e}")
         return False
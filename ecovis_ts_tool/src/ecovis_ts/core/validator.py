@@ -2,8 +2,17 @@ import pandas as pd
 import logging
 from datetime import datetime
 from openpyxl import Workbook
+from ..utils import jobs, progress
 from ..utils.paths import ts_root, output_root
-from .helpers import norm_header, write_table, add_title_banner, autosize_columns
+from .helpers import (
+    norm_header,
+    write_table,
+    add_title_banner,
+    autosize_columns,
+    register_styles,
+)
+from .sheet_cache import sheet_names, read_sheet
+from . import master_data
 
 
 def validate_client_project_pairs(month: str):
@@ -14,8 +23,7 @@ def validate_client_project_pairs(month: str):
 
     # 1. Load Master Pairs
     try:
-        master_path = ts_dir / "Ecovis Compliance Solution számlázási adatok_2025.xlsx"
-        master_df = pd.read_excel(master_path, sheet_name="TS kódok")
+        master_df = master_data.ts_kodok()
         master_pairs = set(
             zip(
                 master_df["Ügyfélkód"].astype(str).str.strip(),
@@ -34,18 +42,21 @@ def validate_client_project_pairs(month: str):
         if "TS" in p.name and not p.name.startswith("~$")
     ]
 
+    progress.start("validate", total=len(files))
     for file_path in files:
+        jobs.checkpoint()
         logger.info(f"Ellenőrzés: {file_path.name}")
+        progress.file_started(file_path.name)
         try:
-            xls = pd.ExcelFile(file_path)
             sheet = next(
-                (s for s in xls.sheet_names if norm_header(s) == norm_header(month)),
+                (s for s in sheet_names(file_path) if norm_header(s) == norm_header(month)),
                 None,
             )
             if not sheet:
+                progress.file_skipped(file_path.name, "no month sheet")
                 continue
 
-            df = pd.read_excel(xls, sheet_name=sheet)
+            df = read_sheet(file_path, sheet)
             mask = df["Ügyfélkód"].notna() & df["Projektkód"].notna()
 
             for idx, row in df[mask].iterrows():
@@ -60,25 +71,30 @@ def validate_client_project_pairs(month: str):
                             "Projektkód": p,
                         }
                     )
+            progress.file_finished(file_path.name, rows=int(mask.sum()))
         except Exception as e:
             logger.error(f"Hiba a(z) {file_path.name} fájlban: {e}")
+            progress.file_failed(file_path.name, str(e))
 
     if not errors:
         logger.info("✅ Minden párosítás helyes.")
+        progress.summary(errors=0)
         return True
 
     # 3. Save error report
     err_df = pd.DataFrame(errors)
-    wb = Workbook()
+    wb = register_styles(Workbook())
     ws = wb.active
     ws.title = "Hibás párok"
     add_title_banner(ws, "Hibás Projekt-Ügyfél párosítások", month, col_count=4)
     write_table(ws, err_df, start_row=3)
-    autosize_columns(ws)
+    autosize_columns(ws, err_df)
 
     out_path = (
         output_root() / f"hibas_parok_{month}_{datetime.now().strftime('%H%M')}.xlsx"
     )
     wb.save(out_path)
     logger.warning(f"⚠️ {len(errors)} hiba található. Lista mentve: {out_path.name}")
+    progress.output(out_path)
+    progress.summary(errors=len(errors))
     return False
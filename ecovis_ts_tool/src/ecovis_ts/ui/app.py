@@ -1,22 +1,50 @@
-import threading
+import json
 import logging
+import os
 import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
 import ttkbootstrap as tb
 from ttkbootstrap.constants import PRIMARY, BOTH
 
 from ..config import SETTINGS
+from ..utils import jobs, progress
 from ..utils.logging import UIHandler
-from ..core import (
-    aggregate_timesheets,
-    sync_dropdown_lists,
-    validate_client_project_pairs,
-)
+
+# The core (pandas, openpyxl, xlwings) is imported on a background thread
+# after the window is shown, and lazily by execute_task if a task is started
+# before that finishes.
 from .dashboard import DashboardFrame
 from .settings import SettingsFrame
 
 
+PUMP_BUDGET_S = 0.03
+PUMP_INTERVAL_MS = 100
+
+TASK_TITLES = {
+    "aggregate": "Összesítés",
+    "sync": "Legördülők frissítése",
+    "validate": "Párellenőrzés",
+    "invoice": "Számlamelléklet",
+}
+TASK_RESOURCES = {
+    "aggregate": {"ts_folder": jobs.READ, "master": jobs.READ},
+    "sync": {"ts_folder": jobs.WRITE, "master": jobs.READ},
+    "validate": {"ts_folder": jobs.READ, "master": jobs.READ},
+    "invoice": {"ts_folder": jobs.READ, "master": jobs.READ},
+}
+
+
 class EcovisApp(tb.Window):
-    def __init__(self):
+    def __init__(self, startup_t0=None):
+        # startup phases in seconds since startup_t0 (run.py: before its imports)
+        self._t0 = startup_t0 if startup_t0 is not None else time.perf_counter()
+        self.startup_phases = {}
+        self._mark_startup("imports")
+
         theme = SETTINGS.get("theme", "minty")
         super().__init__(title="Ecovis Timesheet Tool", themename=theme)
         self.state("zoomed")
@@ -25,11 +53,17 @@ class EcovisApp(tb.Window):
         self.log_queue = queue.Queue()
         self._init_logging()
 
+        # Job scheduler: resource limits, cancellation, timeouts
+        self.jobs = jobs.JobManager(
+            caps={"ts_folder": SETTINGS.get("max_parallel_readers", 2)},
+            on_change=lambda: self.after(0, self.dashboard.refresh_jobs),
+        )
+
         # UI Components
         self.notebook = tb.Notebook(self)
         self.notebook.pack(fill=BOTH, expand=True)
 
-        self.dashboard = DashboardFrame(self.notebook, self.execute_task)
+        self.dashboard = DashboardFrame(self.notebook, self.execute_task, self.jobs)
         self.settings = SettingsFrame(self.notebook)
 
         self.notebook.add(self.dashboard, text="📊 Vezérlőpult")
@@ -38,44 +72,112 @@ class EcovisApp(tb.Window):
         # Start the log pump
         self.after(100, self._pump_logs)
 
+        self._mark_startup("window")
+        self.after_idle(self._on_shown)
+
+    def _mark_startup(self, phase):
+        self.startup_phases[phase] = round(time.perf_counter() - self._t0, 3)
+
+    def _on_shown(self):
+        self._mark_startup("shown")
+        threading.Thread(target=self._load_in_background, daemon=True).start()
+
+    def _load_in_background(self):
+        """Imports the core and loads the master data while the window is usable."""
+        try:
+            from ..core import master_data
+
+            master_data.ts_kodok()
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Törzsadat betöltése sikertelen: {e}")
+        self._mark_startup("background")
+        self.after(0, self._report_startup)
+
+    def _report_startup(self):
+        """Logs the startup phases, appends them to logs/startup.jsonl and, for
+        the benchmark (TS_STARTUP_EXIT=1), prints them and exits."""
+        p = self.startup_phases
+        logging.getLogger(__name__).info(
+            f"Indulás: ablak {p.get('shown', 0):.2f} s, adatok {p.get('background', 0):.2f} s "
+            f"(importok {p.get('imports', 0):.2f} s)"
+        )
+        try:
+            Path("logs").mkdir(exist_ok=True)
+            rec = {"at": datetime.now().isoformat(timespec="seconds"), **p}
+            with open(Path("logs") / "startup.jsonl", "a", encoding="utf-8") as f:
+                f.write(json.dumps(rec) + "\n")
+        except OSError:
+            pass
+        if os.environ.get("TS_STARTUP_EXIT") == "1":
+            print(json.dumps(p), flush=True)
+            self.destroy()
+
     def _init_logging(self):
         """Redirects root logging to our UI handler."""
         handler = UIHandler(self.log_queue)
         logging.getLogger().addHandler(handler)
         logging.getLogger().setLevel(logging.INFO)
+        # structured progress events share the queue (and the UI-thread pump)
+        progress.subscribe(lambda ev: self.log_queue.put(("event", ev)))
 
     def execute_task(self, task_type: str, *args):
-        """Standard runner that executes core logic in a background thread."""
+        """Submits the core logic to the job scheduler (runs on a worker thread)."""
 
         def worker():
             try:
+                from .. import core
+
                 if task_type == "aggregate":
-                    aggregate_timesheets(*args)
+                    result = core.aggregate_timesheets(*args)
                 elif task_type == "sync":
-                    sync_dropdown_lists()
+                    result = core.sync_dropdown_lists()
                 elif task_type == "validate":
-                    validate_client_project_pairs(*args)
+                    result = core.validate_client_project_pairs(*args)
                 elif task_type == "invoice":
-                    from ..core.invoicing import generate_invoice_annex
-
-                    generate_invoice_annex(*args)
+                    result = core.generate_invoice_annex(*args)
+                else:
+                    result = None
 
                 # Update UI stats on completion
                 self.after(0, self.dashboard.update)
+                return result is not False
+            except jobs.JobCancelled:
+                logging.warning(f"Megszakítva: {TASK_TITLES.get(task_type, task_type)}")
+                raise
             except Exception as e:
                 logging.error(f"Váratlan hiba: {str(e)}")
+                return False
+
+        timeout_min = float(SETTINGS.get("job_timeout_min", 30) or 0)
+        title = " — ".join([TASK_TITLES.get(task_type, task_type), *map(str, args)])
+        self.jobs.submit(
+            title,
+            worker,
+            TASK_RESOURCES.get(task_type, {"ts_folder": jobs.WRITE}),
+            timeout=timeout_min * 60 if timeout_min > 0 else None,
+        )
 
-        threading.Thread(target=worker, daemon=True).start()
+    def destroy(self):
+        self.jobs.cancel_all()
+        super().destroy()
 
     def _pump_logs(self):
-        """Checks the queue for new logs to display in the Dashboard Treeview."""
+        """Drains the log queue in batches within a per-tick time budget."""
+        deadline = time.perf_counter() + PUMP_BUDGET_S
+        logs = []
         try:
-            while True:
+            while time.perf_counter() < deadline:
                 level, msg = self.log_queue.get_nowait()
-                self.dashboard.add_log(level, msg)
+                if level == "event":
+                    self.dashboard.on_progress(msg)
+                else:
+                    logs.append((level, msg))
+            more = True
         except queue.Empty:
-            pass
-        self.after(100, self._pump_logs)
+            more = False
+        self.dashboard.add_logs(logs)
+        # leftovers continue right after Tk handles its own events
+        self.after(1 if more else PUMP_INTERVAL_MS, self._pump_logs)
 
 
 def main():
@@ -1,6 +1,22 @@
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from datetime import datetime
+from pathlib import Path
+
+from ..utils import jobs
+from ..utils.progress import FILE_DONE_STATES
+
+# The log view keeps at most this many lines; older ones are dropped.
+LOG_MAX_LINES = 2000
+
+JOB_STATE_LABELS = {
+    jobs.QUEUED: "⏸ sorban",
+    jobs.RUNNING: "⏳ fut",
+    jobs.DONE: "✅ kész",
+    jobs.FAILED: "❌ hiba",
+    jobs.CANCELLED: "⛔ megszakítva",
+    jobs.TIMEOUT: "⌛ időtúllépés",
+}
 
 
 class StatCard(tb.Labelframe):
@@ -23,9 +39,11 @@ class StatCard(tb.Labelframe):
 class DashboardFrame(tb.Frame):
     """The main dashboard container used by app.py."""
 
-    def __init__(self, parent, callback):
+    def __init__(self, parent, callback, job_manager=None):
         super().__init__(parent, padding=20)
         self.callback = callback  # This is the execute_task function from app.py
+        self.job_manager = job_manager
+        self._jobs_tick_pending = False
 
         # --- 1. Top Control Bar (Month & Buttons) ---
         ctrl_frame = tb.LabelFrame(self, text="Műveletek", padding=15)
@@ -84,7 +102,46 @@ class DashboardFrame(tb.Frame):
 
         # --- 2. Status Cards Area ---
         self.status_card = StatCard(self, title="Rendszer Állapot")
-        self.status_card.pack(fill=X, pady=(0, 20))
+        self.status_card.pack(fill=X, pady=(0, 10))
+
+        # Progress driven by the core's structured events (utils.progress)
+        prog_frame = tb.Frame(self)
+        prog_frame.pack(fill=X, pady=(0, 20))
+        self.progressbar = tb.Progressbar(
+            prog_frame, mode="determinate", maximum=1, value=0, bootstyle=INFO
+        )
+        self.progressbar.pack(side=LEFT, fill=X, expand=YES)
+        self.progress_label = tb.Label(prog_frame, text="—", width=8, anchor=E)
+        self.progress_label.pack(side=LEFT, padx=(8, 0))
+        self._done = 0
+        self._total = 0
+        self.last_output = None
+
+        # Jobs: queued / running / finished, with cancel
+        jobs_frame = tb.LabelFrame(self, text="Feladatok", padding=10)
+        jobs_frame.pack(fill=X, pady=(0, 20))
+        self.jobs_list = tb.Treeview(
+            jobs_frame,
+            columns=("id", "title", "state", "time"),
+            show="headings",
+            height=4,
+            bootstyle=SECONDARY,
+        )
+        for col, text, width in (
+            ("id", "#", 40),
+            ("title", "Feladat", 500),
+            ("state", "Állapot", 140),
+            ("time", "Idő", 80),
+        ):
+            self.jobs_list.heading(col, text=text)
+            self.jobs_list.column(col, width=width, anchor=W)
+        self.jobs_list.pack(side=LEFT, fill=X, expand=YES)
+        tb.Button(
+            jobs_frame,
+            text="⛔ Megszakítás",
+            bootstyle=(DANGER, OUTLINE),
+            command=self.cancel_selected_job,
+        ).pack(side=LEFT, padx=(10, 0), anchor=N)
 
         # --- 3. Log Output Area ---
         log_frame = tb.LabelFrame(self, text="Eseménynapló", padding=10)
@@ -97,16 +154,84 @@ class DashboardFrame(tb.Frame):
 
     def add_log(self, level, message):
         """This matches the level/msg format sent by app.py _pump_logs."""
+        self.add_logs([(level, message)])
+
+    def add_logs(self, entries):
+        """Appends a batch of (level, msg): one insert, one trim, one scroll."""
+        if not entries:
+            return
+        entries = list(entries)[-LOG_MAX_LINES:]
         timestamp = datetime.now().strftime("%H:%M:%S")
-        full_msg = f"[{timestamp}] {level.upper()}: {message}\n"
+        text = "".join(
+            f"[{timestamp}] {level.upper()}: {message}\n" for level, message in entries
+        )
 
         self.log_text.config(state=NORMAL)
-        self.log_text.insert(END, full_msg)
+        self.log_text.insert(END, text)
+        # "end-1c" is the trailing newline; its line number is the line count + 1
+        lines = int(self.log_text.index("end-1c").split(".")[0]) - 1
+        if lines > LOG_MAX_LINES:
+            self.log_text.delete("1.0", f"{lines - LOG_MAX_LINES + 1}.0")
         self.log_text.see(END)
         self.log_text.config(state=DISABLED)
 
+    def cancel_selected_job(self):
+        if self.job_manager is None:
+            return
+        for iid in self.jobs_list.selection():
+            self.job_manager.cancel(int(iid))
+
+    def refresh_jobs(self):
+        """Redraws the job list; ticks every second while jobs are active."""
+        if self.job_manager is None:
+            return
+        selected = set(self.jobs_list.selection())
+        self.jobs_list.delete(*self.jobs_list.get_children())
+        for job in reversed(self.job_manager.jobs()):  # newest first
+            secs = job.duration()
+            self.jobs_list.insert(
+                "",
+                END,
+                iid=str(job.id),
+                values=(
+                    job.id,
+                    job.title,
+                    JOB_STATE_LABELS.get(job.state, job.state),
+                    f"{secs:.1f} s" if secs is not None else "—",
+                ),
+            )
+        keep = [iid for iid in selected if self.jobs_list.exists(iid)]
+        if keep:
+            self.jobs_list.selection_set(keep)
+        if self.job_manager.active() and not self._jobs_tick_pending:
+            self._jobs_tick_pending = True
+            self.after(1000, self._tick_jobs)
+
+    def _tick_jobs(self):
+        self._jobs_tick_pending = False
+        self.refresh_jobs()
+
+    def on_progress(self, event):
+        """Handles a progress event dict (called on the UI thread by app.py)."""
+        kind = event.get("event")
+        if kind == "start":
+            self._done = 0
+            self._total = int(event.get("total") or 0)
+            self.last_output = None
+            self.progressbar.configure(maximum=max(1, self._total), value=0)
+            self.progress_label.config(text=f"0/{self._total}" if self._total else "—")
+        elif kind == "file" and event.get("status") in FILE_DONE_STATES:
+            self._done += 1
+            self.progressbar.configure(value=min(self._done, max(1, self._total)))
+            self.progress_label.config(
+                text=f"{self._done}/{self._total}" if self._total else str(self._done)
+            )
+        elif kind == "output":
+            self.last_output = Path(event["path"])
+
     def update(self):
         """Called by app.py's execute_task after a thread finishes."""
-        self.status_card.update_stats(
-            "Kész", f"Utolsó futtatás: {datetime.now().strftime('%H:%M:%S')}"
-        )
+        subtitle = f"Utolsó futtatás: {datetime.now().strftime('%H:%M:%S')}"
+        if self.last_output is not None:
+            subtitle += f" — {self.last_output.name}"
+        self.status_card.update_stats("Kész", subtitle)
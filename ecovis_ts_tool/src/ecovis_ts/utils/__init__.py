@@ -1,6 +1,7 @@
 from .paths import ts_root, output_root, reports_root, backup_root, open_file
 from .mailer import send_email
 from .logging import setup_logging
+from . import jobs, progress
 
 __all__ = [
     "ts_root",
@@ -10,4 +11,6 @@ __all__ = [
     "open_file",
     "send_email",
     "setup_logging",
+    "jobs",
+    "progress",
 ]
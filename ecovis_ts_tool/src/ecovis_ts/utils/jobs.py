@@ -0,0 +1,228 @@
+import itertools
+import logging
+import threading
+import time
+
+# Job scheduler for the in-process core tasks; same states and resource model
+# as the top-level job_manager.py. Each task declares the resources it uses
+# ({"ts_folder": "read"}); readers run in parallel up to caps[name], a writer
+# is exclusive, and the queue is FIFO so a waiting writer is not overtaken.
+#
+# The tasks run in this process, so cancellation and timeouts are cooperative:
+# the core calls checkpoint() between files (raises JobCancelled once a stop
+# was requested) and registers on_cancel() callbacks for external resources,
+# e.g. the xlwings Excel instance, which are killed immediately.
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMEOUT = "timeout"
+FINISHED_STATES = (DONE, FAILED, CANCELLED, TIMEOUT)
+
+READ = "read"
+WRITE = "write"
+
+DEFAULT_CAPS = {"ts_folder": 2, "master": 4}
+KEEP_FINISHED = 50
+
+_current = threading.local()
+
+
+class JobCancelled(Exception):
+    """Raised by checkpoint() in a job whose cancellation was requested."""
+
+
+class Job:
+    def __init__(self, job_id, title, run, resources, timeout):
+        self.id = job_id
+        self.title = title
+        self.run = run
+        self.resources = dict(resources or {})
+        self.timeout = timeout
+        self.state = QUEUED
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.stop_reason = None
+        self._stop = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def stopping(self):
+        return self._stop.is_set()
+
+    def on_cancel(self, callback):
+        """Registers callback() to run when the job is cancelled or times out."""
+        with self._lock:
+            if not self._stop.is_set():
+                self._callbacks.append(callback)
+                return
+        _safe_call(callback)
+
+    def _request_stop(self, reason):
+        with self._lock:
+            if self._stop.is_set():
+                return
+            self.stop_reason = reason
+            self._stop.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for cb in callbacks:
+            _safe_call(cb)
+
+    def duration(self):
+        if self.started is None:
+            return None
+        return (self.finished or time.time()) - self.started
+
+
+def _safe_call(callback):
+    try:
+        callback()
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Leállítási művelet sikertelen: {e}")
+
+
+def current():
+    """The Job running on this thread, or None outside the scheduler."""
+    return getattr(_current, "job", None)
+
+
+def checkpoint():
+    """Raises JobCancelled if the current job should stop; no-op otherwise."""
+    job = current()
+    if job is not None and job.stopping:
+        raise JobCancelled(job.stop_reason)
+
+
+def on_cancel(callback):
+    """Registers a stop callback on the current job (ignored outside a job)."""
+    job = current()
+    if job is not None:
+        job.on_cancel(callback)
+
+
+class JobManager:
+    def __init__(self, caps=None, on_change=None, keep_finished=KEEP_FINISHED):
+        self.caps = {**DEFAULT_CAPS, **(caps or {})}
+        self.on_change = on_change
+        self.keep_finished = keep_finished
+        self._jobs = []
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    def submit(self, title, run, resources=None, timeout=None):
+        """Queues run(); a False return value or an exception marks it failed."""
+        with self._lock:
+            job = Job(next(self._ids), title, run, resources, timeout or None)
+            self._jobs.append(job)
+        self._changed()
+        self._dispatch()
+        return job
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = next((j for j in self._jobs if j.id == job_id), None)
+            if job is None or job.state in FINISHED_STATES:
+                return False
+            queued = job.state == QUEUED
+            if queued:
+                job.state = CANCELLED
+                job.finished = time.time()
+        if queued:
+            self._changed()
+            self._dispatch()
+        else:
+            job._request_stop(CANCELLED)
+        return True
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs)
+
+    def active(self):
+        return [j for j in self.jobs() if j.state in (QUEUED, RUNNING)]
+
+    def cancel_all(self):
+        for job in self.active():
+            self.cancel(job.id)
+
+    def _fits(self, job, usage):
+        for name, mode in job.resources.items():
+            readers, writer = usage.get(name, (0, False))
+            if writer or (mode == WRITE and readers):
+                return False
+            if mode != WRITE and readers >= self.caps.get(name, 1):
+                return False
+        return True
+
+    @staticmethod
+    def _use(job, usage):
+        for name, mode in job.resources.items():
+            readers, writer = usage.get(name, (0, False))
+            usage[name] = (readers + (mode != WRITE), writer or mode == WRITE)
+
+    def _dispatch(self):
+        started = []
+        with self._lock:
+            usage = {}
+            for job in self._jobs:
+                if job.state == RUNNING:
+                    self._use(job, usage)
+            waiting = {}  # queued jobs reserve their resources in order
+            for job in self._jobs:
+                if job.state != QUEUED:
+                    continue
+                if self._fits(job, usage) and self._fits(job, waiting):
+                    job.state = RUNNING
+                    job.started = time.time()
+                    self._use(job, usage)
+                    started.append(job)
+                else:
+                    self._use(job, waiting)
+        for job in started:
+            threading.Thread(target=self._run, args=(job,), daemon=True).start()
+        if started:
+            self._changed()
+
+    def _run(self, job):
+        timer = None
+        if job.timeout:
+            timer = threading.Timer(job.timeout, job._request_stop, args=(TIMEOUT,))
+            timer.daemon = True
+            timer.start()
+        _current.job = job
+        ok, error = False, None
+        try:
+            ok = job.run() is not False
+        except JobCancelled:
+            pass
+        except Exception as e:
+            error = str(e)
+            logging.getLogger(__name__).exception(f"Feladat hiba ({job.title}): {e}")
+        finally:
+            _current.job = None
+            if timer is not None:
+                timer.cancel()
+        with self._lock:
+            job.finished = time.time()
+            job.error = error
+            if job.stopping:
+                job.state = job.stop_reason or CANCELLED
+            else:
+                job.state = DONE if ok and error is None else FAILED
+            finished = [j for j in self._jobs if j.state in FINISHED_STATES]
+            drop = {j.id for j in finished[: max(0, len(finished) - self.keep_finished)]}
+            self._jobs = [j for j in self._jobs if j.id not in drop]
+        self._changed()
+        self._dispatch()
+
+    def _changed(self):
+        if self.on_change is not None:
+            try:
+                self.on_change()
+            except Exception:
+                pass
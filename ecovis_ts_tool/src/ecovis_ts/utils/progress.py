@@ -0,0 +1,75 @@
+import threading
+
+# Same event vocabulary as the top-level progress.py (the scripts' JSON-lines
+# protocol). The core functions run in-process here, so events go straight to
+# subscribed callbacks instead of stdout: no marker lines, no parsing.
+#
+#   {"event": "start", "task": "aggregate", "total": 5}
+#   {"event": "file", "file": "TS GP.xlsx", "status": "finished", "rows": 12}
+#   {"event": "output", "path": "C:/.../timesheet_summary_januar_....xlsx"}
+#   {"event": "error", "message": "...", "file": "TS GP.xlsx"}
+#   {"event": "summary", "processed": 5, "skipped": 0, "errors": 0}
+
+FILE_STARTED = "started"
+FILE_FINISHED = "finished"
+FILE_SKIPPED = "skipped"
+FILE_FAILED = "failed"
+FILE_DONE_STATES = (FILE_FINISHED, FILE_SKIPPED, FILE_FAILED)
+
+_listeners = []
+_lock = threading.Lock()
+
+
+def subscribe(callback):
+    """Registers callback(event_dict); called from the task's thread."""
+    with _lock:
+        _listeners.append(callback)
+
+
+def unsubscribe(callback):
+    with _lock:
+        if callback in _listeners:
+            _listeners.remove(callback)
+
+
+def emit(event, **data):
+    payload = {"event": event, **{k: v for k, v in data.items() if v is not None}}
+    with _lock:
+        listeners = list(_listeners)
+    for cb in listeners:
+        try:
+            cb(payload)
+        except Exception:
+            pass  # a broken listener must not break the task
+
+
+def start(task, total=None):
+    emit("start", task=task, total=total)
+
+
+def file_started(name):
+    emit("file", file=str(name), status=FILE_STARTED)
+
+
+def file_finished(name, rows=None):
+    emit("file", file=str(name), status=FILE_FINISHED, rows=rows)
+
+
+def file_skipped(name, reason=None):
+    emit("file", file=str(name), status=FILE_SKIPPED, reason=reason)
+
+
+def file_failed(name, message=None):
+    emit("file", file=str(name), status=FILE_FAILED, message=message)
+
+
+def output(path):
+    emit("output", path=str(path))
+
+
+def error(message, file=None):
+    emit("error", message=message, file=file)
+
+
+def summary(**counts):
+    emit("summary", **counts)
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Same import root as run.py: the package lives under src/
+src_path = str(Path(__file__).resolve().parent.parent / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
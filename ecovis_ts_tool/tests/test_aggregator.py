@@ -0,0 +1,57 @@
+import pytest
+from openpyxl import Workbook, load_workbook
+
+# the package imports the UI (ttkbootstrap) and the sync (xlwings) on import
+pytest.importorskip("ttkbootstrap")
+pytest.importorskip("xlwings")
+
+from ecovis_ts.core import aggregator, sheet_cache  # noqa: E402
+
+HEADER = ["Dátum", "Ügyfélkód", "Projektkód", "Feladat részletezése", "Időtartam (óra)"]
+
+
+def _write_ts(path, rows):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "januar"
+    ws.append(HEADER)
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+@pytest.fixture
+def ts_folder(tmp_path, monkeypatch):
+    for module in (aggregator, sheet_cache):
+        monkeypatch.setattr(module, "ts_root", lambda: tmp_path)
+    monkeypatch.setattr(aggregator, "output_root", lambda: tmp_path)
+    monkeypatch.setattr(aggregator.master_data, "active_clients", lambda: {"AUC"})
+    return tmp_path
+
+
+def _summary_hours(path):
+    ws = load_workbook(path).active
+    rows = list(ws.iter_rows(min_row=3, values_only=True))
+    header = rows[0]
+    return {
+        (r[header.index("Ügyfélkód")], r[header.index("Munkatárs")]): r[header.index("Óra")]
+        for r in rows[1:]
+        if r[0] is not None
+    }
+
+
+def test_string_hour_cell_is_summed_as_number(ts_folder):
+    _write_ts(
+        ts_folder / "TS AB.xlsx",
+        [
+            ["2025-01-02", "AUC", "P1", "a", 1.5],
+            ["2025-01-03", "AUC", "P1", "b", "2"],  # hours typed as text
+            ["2025-01-04", "AUC", "P1", "c", "n/a"],  # not a number: dropped
+        ],
+    )
+    _write_ts(ts_folder / "TS CD.xlsx", [["2025-01-02", "AUC", "P1", "d", 4]])
+
+    out = aggregator.aggregate_timesheets("januar")
+
+    assert out is not None
+    assert _summary_hours(out) == {("AUC", "AB"): 3.5, ("AUC", "CD"): 4}
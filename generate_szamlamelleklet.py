@@ -3,49 +3,29 @@
 import pandas as pd
 import os
 import re
-import unicodedata
 from datetime import datetime
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
 from openpyxl.drawing.image import Image as XLImage
 import sys
 import logging
 from pathlib import Path
 
+import master_data
+import progress
+import ts_facts
+from sheet_index import has_month_sheet
+from ts_constants import ORDERED_CODES_DEFAULT, remove_accents
+from ts_cache import sheet_names, read_sheet
+from width_plan import WidthPlan
+
 # ---- CONFIG ----
 FOLDER_PATH = "."
-COMPLIANCE_FILE = "Ecovis Compliance Solution számlázási adatok_2025.xlsx"
-CEGADATOK_SHEET = "Cégadatok"
+COMPLIANCE_FILE = master_data.COMPLIANCE_FILE
+CEGADATOK_SHEET = master_data.CEGADATOK_SHEET
 LOGO_CANDIDATES = ["ecovis_logo.png", "/mnt/data/ecovis_logo.png"]
 MAX_ROWS_PER_SHEET = 300
 
-# ➤ Alapértelmezett (korábban kért) lista:
-ORDERED_CODES_DEFAULT = [
-    "AUC",
-    "AXM",
-    "BRD",
-    "HÖG",
-    "ITP",
-    "JIS",
-    "KKE",
-    "KLU",
-    "KRT",
-    "LUT",
-    "MES",
-    "NUM",
-    "OLD",
-    "PCO",
-    "PRM",
-    "RAP",
-    "ROC",
-    "SCH",
-    "SPA",
-    "TLA",
-    "VAB",
-    "ZAP",
-]
-
 BOILERPLATE = {
     "magyar": {
         "title": "Számlamelléklet (teljesítési igazolás)",
@@ -100,11 +80,6 @@ logging.info(f"Log file: {LOG_FILE.resolve()}")
 
 
 # ---- HELPERS ----
-def remove_accents(s: str) -> str:
-    nfkd = unicodedata.normalize("NFKD", str(s))
-    return "".join(c for c in nfkd if not unicodedata.combining(c))
-
-
 HONAPOK = [
     "januar",
     "februar",
@@ -184,57 +159,30 @@ def month_to_year_and_quarter(selected_month_norm: str) -> tuple[int, int]:
     return year, quarter
 
 
-def autosize_columns(ws, min_col: int, max_col: int, min_row: int, max_row: int):
-    for c in range(min_col, max_col + 1):
-        width = 0
-        for r in range(min_row, max_row + 1):
-            v = ws.cell(row=r, column=c).value
-            if v is not None:
-                width = max(width, len(str(v)))
-        ws.column_dimensions[get_column_letter(c)].width = min(max(width + 2, 10), 90)
-
+# ---- Törzsadatok (a master_data modulból, folyamatonként egyszer beolvasva) ----
 def load_active_clients() -> set[str]:
-    df = pd.read_excel(COMPLIANCE_FILE, sheet_name=CEGADATOK_SHEET)
-    active_clients = set(
-        df[df["Ügyfél aktív"].astype(str).str.strip().str.lower() == "igen"]["Ügyfélkód"].astype(str)
-    )
-    return active_clients
+    return set(master_data.active_clients(COMPLIANCE_FILE))
 
 
 def load_client_name_map() -> dict[str, str]:
-    df = pd.read_excel(COMPLIANCE_FILE, sheet_name=CEGADATOK_SHEET)
-    df = df[df["Ügyfél aktív"].astype(str).str.strip().str.lower() == "igen"]
-    if "Ügyfélkód" not in df.columns:
-        raise ValueError("A Cégadatok lapon nincs 'Ügyfélkód' oszlop.")
-    name_aliases = ["Cégnév", "Cég neve", "Ügyfél neve", "Partner neve", "Név"]
-    name_col = next((c for c in name_aliases if c in df.columns), None) or "Ügyfélkód"
-    df = df[["Ügyfélkód", name_col]].dropna(subset=["Ügyfélkód"])
-    df["Ügyfélkód"] = df["Ügyfélkód"].astype(str)
-    df[name_col] = df[name_col].astype(str)
-    return dict(zip(df["Ügyfélkód"], df[name_col]))
+    return dict(master_data.client_name_map(COMPLIANCE_FILE))
 
 
 def load_client_lang_map() -> dict[str, str]:
-    df = pd.read_excel(COMPLIANCE_FILE, sheet_name=CEGADATOK_SHEET)
-    df = df[df["Ügyfél aktív"].astype(str).str.strip().str.lower() == "igen"]
-
-    # ha nincs Nyelv oszlop, fallback = "magyar"
-    if "Nyelv" not in df.columns:
-        return {str(k): "magyar" for k in df["Ügyfélkód"].astype(str)}
-
-    df["Ügyfélkód"] = df["Ügyfélkód"].astype(str)
-    df["Nyelv"] = df["Nyelv"].astype(str).str.strip().str.lower()
-
-    return dict(zip(df["Ügyfélkód"], df["Nyelv"]))
+    return dict(master_data.client_lang_map(COMPLIANCE_FILE))
 
 # ---- FŐ FÜGGVÉNY ----
 def generate_szamlamelleklet(
-    selected_month: str, ordered_codes: list[str] | None = None
+    selected_month: str,
+    ordered_codes: list[str] | None = None,
+    facts: pd.DataFrame | None = None,
 ) -> str:
     """
     selected_month: 'januar'...'december' (ékezet nélkül)
     ordered_codes:  ha megadod, CSAK ezekre készül lap, ilyen sorrendben.
                     ha None, az ORDERED_CODES_DEFAULT lesz az alap (és csak azok, amelyek léteznek a Cégadatokban).
+    facts:          a hívó már betöltött ténytáblája (month_close); ekkor se
+                    summary fájl, se TS fájl nem kerül beolvasásra.
 
     A táblázat mostantól a 'Munka leírása' oszlop alapján gyűjt és összegez.
     """
@@ -285,6 +233,27 @@ def generate_szamlamelleklet(
         list(p.glob("timesheet_summary_*.xlsx")), key=lambda x: x.stat().st_mtime, reverse=True
     )
     used_summary = None
+    if facts is not None:
+        found = ts_facts.description_hours(facts, selected_month, set(description_summary))
+        for kod, items in found.items():
+            description_summary[kod].update(items)
+        used_summary = "ténytábla"
+        summary_candidates = []
+        logging.info("Használva: a hívó ténytáblája (memóriából)")
+    elif ts_facts.enabled():
+        # éves ténytábla: a summary fájl és a TS-ek bejárása helyett egy lekérdezés
+        try:
+            store = ts_facts.update(FOLDER_PATH)
+            found = ts_facts.description_hours(
+                store["facts"], selected_month, set(description_summary)
+            )
+            for kod, items in found.items():
+                description_summary[kod].update(items)
+            used_summary = "ténytábla"
+            summary_candidates = []
+            logging.info("Használva: éves ténytábla")
+        except Exception as e:
+            logging.exception(f"Ténytábla lekérdezés sikertelen, visszalépés: {e}")
     if summary_candidates:
         for cand in summary_candidates:
             try:
@@ -338,34 +307,40 @@ def generate_szamlamelleklet(
 
     # If we didn't find/consume a valid summary, fall back to scanning individual TS files
     if used_summary is None:
+        ts_files = [
+            f for f in os.listdir(FOLDER_PATH) if f.endswith(".xlsx") and "TS" in f and not f.startswith("~$")
+        ]
+        progress.start("generate_szamlamelleklet", total=len(ts_files))
         for file in os.listdir(FOLDER_PATH):
             if file.endswith(".xlsx") and "TS" in file and not file.startswith("~$"):
                 path = os.path.join(FOLDER_PATH, file)
+                # lapnév-index: hónap lap nélküli fájlt meg sem nyitunk
+                if not has_month_sheet(path, selected_month):
+                    logging.info(f"Kihagyva (nincs megfelelő hónap sheet): {file}")
+                    progress.file_skipped(file, "nincs hónap lap")
+                    continue
                 logging.info(f"Feldolgozás: {file}")
+                progress.file_started(file)
                 try:
-                    xls = pd.ExcelFile(path)
+                    xls_sheets = sheet_names(path)
                 except Exception as e:
                     logging.exception(f"Nem nyitható: {file} — {e}")
+                    progress.file_failed(file, str(e))
                     continue
 
-                for sheet in xls.sheet_names:
+                for sheet in xls_sheets:
                     if remove_accents(str(sheet).lower()) != selected_month:
                         continue
                     try:
-                        # Először megpróbáljuk közvetlenül a várt oszlopokkal
-                        try:
-                            df = pd.read_excel(
-                                xls,
-                                sheet_name=sheet,
-                                usecols=[CLIENT_COL, DESCRIPTION_ALIASES[0], HOURS_COL],
-                                nrows=MAX_ROWS_PER_SHEET,
-                            )
+                        # A lapot a közös cache-ből kérjük (ügyfélkód, óra + leírás alias-ok)
+                        df = read_sheet(path, sheet, nrows=MAX_ROWS_PER_SHEET)
+                        # Először a várt oszlopokkal
+                        expected = [CLIENT_COL, DESCRIPTION_ALIASES[0], HOURS_COL]
+                        if all(c in df.columns for c in expected):
+                            df = df[expected].copy()
                             desc_col = DESCRIPTION_ALIASES[0]
-                        except Exception:
-                            # Ha a pontos "Munka leírása" nincs, beolvassuk szélesen és kiválasztunk egy alias-t
-                            df = pd.read_excel(
-                                xls, sheet_name=sheet, nrows=MAX_ROWS_PER_SHEET
-                            )
+                        else:
+                            # Ha a pontos "Munka leírása" nincs, kiválasztunk egy alias-t
                             # normalizált név-térkép
                             cols_norm = {
                                 c: remove_accents(str(c)).lower().strip()
@@ -421,6 +396,9 @@ def generate_szamlamelleklet(
                         description_summary[kod][desc] = (
                             description_summary[kod].get(desc, 0.0) + hrs
                         )
+                progress.file_finished(file)
+    else:
+        progress.start("generate_szamlamelleklet", total=0)
 
     # 3) kimeneti excel — egyoszlopos layout, logó bal felül
     # ensure we don't overwrite an existing file for the same month
@@ -451,6 +429,8 @@ def generate_szamlamelleklet(
 
         # Logó bal felül + padding
         place_logo_top_left(ws)
+        # oszlopszélességek: a kiírt értékekből (6. sortól), nem a kész lap celláiból
+        plan = WidthPlan()
 
         # Fejléc egy oszlopban (C)
         ws["C6"].value = client_name_map.get(kod, kod)
@@ -469,10 +449,12 @@ def generate_szamlamelleklet(
         ws["C13"].value = bp["text"]
         for a in ("C10", "C11", "C12", "C13"):
             ws[a].alignment = Alignment(horizontal="left", wrap_text=True)
+        plan.add(3, [ws[a].value for a in ("C6", "C10", "C11", "C12", "C13")])
 
         # Tábla (C–D) — mostantól a 'Munka leírása' értékekkel
         ws["C16"].value = bp["task_header"]
         ws["D16"].value = bp["hours_header"]
+        plan.add(3, bp["task_header"]).add(4, bp["hours_header"])
         for cell in (ws["C16"], ws["D16"]):
             cell.font = Font(bold=True)
             cell.fill = HEADER_FILL
@@ -482,7 +464,10 @@ def generate_szamlamelleklet(
         row = 17
         total = 0.0
 
-        for desc, hrs in sorted(items.items(), key=lambda x: str(x[0]).lower()):
+        tasks = sorted(items.items(), key=lambda x: str(x[0]).lower())
+        plan.add(3, [str(desc) for desc, _ in tasks])
+        plan.add(4, [round(float(hrs), 2) for _, hrs in tasks])
+        for desc, hrs in tasks:
             ws.cell(row=row, column=3, value=str(desc)).alignment = Alignment(
                 wrap_text=True
             )
@@ -504,6 +489,8 @@ def generate_szamlamelleklet(
 
         # Összeg képlet
         sum_formula = f"=SUM(D{first_task_row}:D{last_task_row})"
+        plan.add(3, list(labels))
+        plan.add(4, [sum_formula, 0, 0, f"=D{row}-D{row+1}+D{row+2}"])
 
         # Sor 1: Felhasznált órák
         cell = ws.cell(row=row, column=3, value=labels[0])
@@ -545,10 +532,11 @@ def generate_szamlamelleklet(
         last_row = row + 3
         for r in range(6, last_row + 1):
             ws.row_dimensions[r].height = None
-        autosize_columns(ws, min_col=1, max_col=7, min_row=6, max_row=last_row)
+        plan.apply(ws, min_col=1, max_col=7, floor=10, cap=90)
 
     wb.save(out_name)
     logging.info(f"Kész: {out_name}")
+    progress.output(out_name)
     return out_name
 
 
@@ -566,4 +554,5 @@ if __name__ == "__main__":
         print("Kész:", generate_szamlamelleklet(month, ordered_codes=codes))
     except Exception as e:
         print("Hiba:", e)
+        progress.error(str(e))
         sys.exit(1)
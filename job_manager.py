@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+Feladatkezelő a GUI futtatásaihoz: sor, erőforrásonkénti párhuzamossági
+korlát, megszakítás és időkorlát a gyerekfolyamatok takarításával.
+
+Eddig minden gomb saját daemon szálat indított egy al-folyamattal: semmi nem
+akadályozta, hogy két összesítés, vagy egy TS reset és egy összesítés
+egyszerre nyúljon ugyanazokhoz a fájlokhoz, és egy beakadt Excel (COM) hívást
+nem lehetett leállítani.
+
+- Minden feladat megadja, milyen erőforrást használ és hogyan:
+  {"ts_folder": "read", "master": "read"}. Olvasóból erőforrásonként legfeljebb
+  caps[név] fut egyszerre, az írás ("write") kizárólagos.
+- A sor FIFO: egy várakozó feladatot a később beküldött, vele ütköző feladat
+  nem előzhet meg (az író nem éhezik ki), a nem ütközők viszont elindulnak.
+- A futó feladat a folyamatait (Popen / meleg worker job) és az általuk
+  indított külső folyamatok pid-jét (pl. EXCEL.EXE) a Job-hoz köti;
+  megszakításkor és időtúllépéskor ezek a teljes folyamatfájukkal együtt
+  leállnak (psutil, ha van; különben taskkill /T, illetve folyamatcsoport).
+- Állapotok: queued, running, done, failed, cancelled, timeout.
+
+Usage:
+    jobs = JobManager(caps={"ts_folder": 2}, on_change=lambda: ...)
+    def run(job):
+        proc = start_script(cmd)
+        job.attach(proc)
+        ...
+        return proc.wait() == 0
+    job = jobs.submit("Összesítés", run, {"ts_folder": "read"}, timeout=1800)
+    jobs.cancel(job.id)
+"""
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+
+try:  # teljes folyamatfa leállítás; nélküle taskkill / folyamatcsoport
+    import psutil
+except Exception:  # pragma: no cover
+    psutil = None
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMEOUT = "timeout"
+FINISHED_STATES = (DONE, FAILED, CANCELLED, TIMEOUT)
+
+READ = "read"
+WRITE = "write"
+
+DEFAULT_CAPS = {"ts_folder": 2, "master": 4}
+KEEP_FINISHED = 50  # ennyi befejezett feladat marad a listában
+
+# új folyamatcsoport a gyereknek, hogy a fája egyben leállítható legyen
+if os.name == "nt":
+    POPEN_GROUP_KWARGS = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    POPEN_GROUP_KWARGS = {"start_new_session": True}
+
+
+def kill_tree(pid: int):
+    """A folyamat és minden leszármazottja leállítása (ami már nem fut, kimarad)."""
+    if not pid:
+        return
+    if psutil is not None:
+        try:
+            parent = psutil.Process(pid)
+            procs = parent.children(recursive=True) + [parent]
+        except psutil.Error:
+            return
+        for p in procs:
+            try:
+                p.kill()
+            except psutil.Error:
+                pass
+        psutil.wait_procs(procs, timeout=3)
+        return
+    if os.name == "nt":
+        subprocess.run(
+            ["taskkill", "/F", "/T", "/PID", str(pid)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        return
+    try:
+        pgid = os.getpgid(pid)
+    except OSError:
+        return
+    try:
+        if pgid != os.getpgid(0):  # saját csoportunkat soha
+            os.killpg(pgid, signal.SIGKILL)
+        else:
+            os.kill(pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+class Job:
+    """Egy beküldött feladat állapota; a run(job) ebből köti be a folyamatait."""
+
+    def __init__(self, job_id: int, title: str, run, resources: dict, timeout: float | None):
+        self.id = job_id
+        self.title = title
+        self.run = run
+        self.resources = dict(resources or {})
+        self.timeout = timeout
+        self.state = QUEUED
+        self.error: str | None = None
+        self.submitted = time.time()
+        self.started: float | None = None
+        self.finished: float | None = None
+        self._procs: list = []
+        self._pids: list[int] = []
+        self._stop = threading.Event()
+        self._stop_reason: str | None = None
+        self._lock = threading.Lock()
+
+    # --- a run(job) oldaláról ---
+    @property
+    def stopping(self) -> bool:
+        """Kérték-e a leállítást (megszakítás vagy időtúllépés)."""
+        return self._stop.is_set()
+
+    @property
+    def stop_reason(self) -> str | None:
+        """CANCELLED vagy TIMEOUT, ha kérték a leállítást."""
+        return self._stop_reason
+
+    def attach(self, proc):
+        """Folyamat (Popen vagy WarmJob) hozzákötése; leállításkor kill_tree-vel áll le."""
+        with self._lock:
+            self._procs.append(proc)
+        if self.stopping:
+            self._kill(proc)
+
+    def add_pid(self, pid: int):
+        """Külső folyamat (pl. az Excel COM szerver) pid-je, ami nem a gyerekünk."""
+        with self._lock:
+            self._pids.append(int(pid))
+        if self.stopping:
+            kill_tree(int(pid))
+
+    # --- a kezelő oldaláról ---
+    def _kill(self, proc):
+        try:
+            if hasattr(proc, "kill_tree"):
+                proc.kill_tree()  # meleg worker job: a worker folyamatot állítja le
+            elif getattr(proc, "poll", lambda: 0)() is None:
+                kill_tree(proc.pid)
+        except Exception as e:
+            logging.warning(f"Folyamat leállítása sikertelen: {e}")
+
+    def _request_stop(self, reason: str):
+        with self._lock:
+            if self._stop.is_set():
+                return
+            self._stop_reason = reason
+            self._stop.set()
+            procs, pids = list(self._procs), list(self._pids)
+        for proc in procs:
+            self._kill(proc)
+        for pid in pids:
+            kill_tree(pid)
+
+    def duration(self) -> float | None:
+        if self.started is None:
+            return None
+        return (self.finished or time.time()) - self.started
+
+
+class JobManager:
+    def __init__(self, caps: dict | None = None, on_change=None, keep_finished: int = KEEP_FINISHED):
+        self.caps = {**DEFAULT_CAPS, **(caps or {})}
+        self.on_change = on_change
+        self.keep_finished = keep_finished
+        self._jobs: list[Job] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    # --- nyilvános ---
+    def submit(self, title: str, run, resources: dict | None = None, timeout: float | None = None) -> Job:
+        """Feladat a sorba; run(job) → True / None = siker, False = hiba (kivétel = hiba)."""
+        with self._lock:
+            job = Job(next(self._ids), title, run, resources, timeout or None)
+            self._jobs.append(job)
+        self._changed()
+        self._dispatch()
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        """Várakozó feladat kivétele a sorból, futó leállítása (folyamatfával)."""
+        with self._lock:
+            job = self._find(job_id)
+            if job is None or job.state in FINISHED_STATES:
+                return False
+            if job.state == QUEUED:
+                job.state = CANCELLED
+                job.finished = time.time()
+                queued = True
+            else:
+                queued = False
+        if queued:
+            self._changed()
+            self._dispatch()
+        else:
+            job._request_stop(CANCELLED)
+        return True
+
+    def jobs(self) -> list[Job]:
+        with self._lock:
+            return list(self._jobs)
+
+    def active(self) -> list[Job]:
+        return [j for j in self.jobs() if j.state in (QUEUED, RUNNING)]
+
+    def cancel_all(self):
+        for job in self.active():
+            self.cancel(job.id)
+
+    # --- ütemezés ---
+    def _find(self, job_id: int) -> Job | None:
+        return next((j for j in self._jobs if j.id == job_id), None)
+
+    def _fits(self, job: Job, usage: dict) -> bool:
+        for name, mode in job.resources.items():
+            readers, writer = usage.get(name, (0, False))
+            if writer:
+                return False
+            if mode == WRITE and readers:
+                return False
+            if mode != WRITE and readers >= self.caps.get(name, 1):
+                return False
+        return True
+
+    @staticmethod
+    def _use(job: Job, usage: dict):
+        for name, mode in job.resources.items():
+            readers, writer = usage.get(name, (0, False))
+            usage[name] = (readers + (mode != WRITE), writer or mode == WRITE)
+
+    def _dispatch(self):
+        started = []
+        with self._lock:
+            usage: dict = {}
+            for job in self._jobs:
+                if job.state == RUNNING:
+                    self._use(job, usage)
+            # a várakozók sorrendben "lefoglalják" az erőforrást: a később
+            # jövő ütköző feladat nem előzheti meg őket
+            waiting: dict = {}
+            for job in self._jobs:
+                if job.state != QUEUED:
+                    continue
+                if self._fits(job, usage) and self._fits(job, waiting):
+                    job.state = RUNNING
+                    job.started = time.time()
+                    self._use(job, usage)
+                    started.append(job)
+                else:
+                    self._use(job, waiting)
+        for job in started:
+            threading.Thread(target=self._run, args=(job,), daemon=True).start()
+        if started:
+            self._changed()
+
+    def _run(self, job: Job):
+        timer = None
+        if job.timeout:
+            timer = threading.Timer(job.timeout, job._request_stop, args=(TIMEOUT,))
+            timer.daemon = True
+            timer.start()
+        ok, error = False, None
+        try:
+            ok = job.run(job) is not False
+        except Exception as e:
+            error = str(e)
+            logging.exception(f"Feladat hiba ({job.title}): {e}")
+        finally:
+            if timer is not None:
+                timer.cancel()
+        with self._lock:
+            job.finished = time.time()
+            job.error = error
+            if job.stopping:
+                job.state = job._stop_reason or CANCELLED
+            else:
+                job.state = DONE if ok and error is None else FAILED
+            self._prune()
+        self._changed()
+        self._dispatch()
+
+    def _prune(self):
+        finished = [j for j in self._jobs if j.state in FINISHED_STATES]
+        drop = {j.id for j in finished[: max(0, len(finished) - self.keep_finished)]}
+        if drop:
+            self._jobs = [j for j in self._jobs if j.id not in drop]
+
+    def _changed(self):
+        if self.on_change is not None:
+            try:
+                self.on_change()
+            except Exception:
+                pass
+
+
+__all__ = [
+    "CANCELLED",
+    "DONE",
+    "FAILED",
+    "FINISHED_STATES",
+    "POPEN_GROUP_KWARGS",
+    "QUEUED",
+    "READ",
+    "RUNNING",
+    "TIMEOUT",
+    "WRITE",
+    "Job",
+    "JobManager",
+    "kill_tree",
+]
@@ -1,5 +1,10 @@
 # main.py
 # -*- coding: utf-8 -*-
+import time
+
+# indulási idő mérése: a fázisok ehhez képest (STARTUP_PHASES)
+STARTUP_T0 = time.perf_counter()
+
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 import subprocess
@@ -7,14 +12,13 @@ import datetime
 import threading
 import sys
 import queue
+from collections import deque
 import re
 from pathlib import Path
 import tkinter as tk  # Listboxhoz
 from tkinter import filedialog, messagebox
 import os
-import time
 from typing import Optional, Dict, Any, List
-from PIL import Image, ImageTk
 import json
 import shutil
 import smtplib
@@ -22,6 +26,24 @@ from email.message import EmailMessage
 
 # === Beállítások külön modulban ===
 from settings import SETTINGS, save_settings, DEFAULT_SETTINGS, CONFIG_PATH
+from sheet_index import filter_month_files, norm_sheet_name
+# könnyű modul (nincs pandas / naplóbeállítás): az ablak előtt is betölthető
+from ts_constants import ORDERED_CODES_DEFAULT, COMPLIANCE_FILE, remove_accents
+import progress
+from artifact_index import ArtifactIndex
+from job_manager import (
+    CANCELLED,
+    DONE,
+    FAILED,
+    QUEUED,
+    READ,
+    RUNNING,
+    TIMEOUT,
+    WRITE,
+    JobManager,
+    POPEN_GROUP_KWARGS,
+)
+from worker_server import WarmWorker
 
 # ===========================
 #  ÁLLANDÓK / SEGÉDFÜGGVÉNYEK
@@ -29,19 +51,15 @@ from settings import SETTINGS, save_settings, DEFAULT_SETTINGS, CONFIG_PATH
 
 APP_TITLE = "Ecovis Timesheet Tool"
 
-# --- a kódlista betöltéséhez/ALAPÉRTELMEZETT listához használjuk a generátor segédfüggvényeit
-try:
-    from generate_szamlamelleklet import (
-        load_client_name_map,
-        ORDERED_CODES_DEFAULT,
-        remove_accents,
-    )
-except Exception:
-    load_client_name_map = None
-    ORDERED_CODES_DEFAULT = []
+LOGO_FILE = "ecovis_logo.png"
+LOGO_SIZE = (400, 60)
+
+# indulási fázisok (mp a folyamat indulásától): imports, window, shown, background
+STARTUP_PHASES: Dict[str, float] = {"imports": time.perf_counter() - STARTUP_T0}
 
-    def remove_accents(s: str) -> str:
-        return s
+
+def mark_startup(phase: str):
+    STARTUP_PHASES[phase] = time.perf_counter() - STARTUP_T0
 
 
 # ⚙️ Config
@@ -72,6 +90,14 @@ ICON_ERR = "❌"
 
 # ---- Thread-safe UI pipeline
 ui_queue: "queue.Queue[tuple[str, str]]" = queue.Queue()
+# napló nézet: ennyi sor marad (a régebbiek kiesnek), és egy pump kör
+# legfeljebb ennyi ideig dolgozik — a maradék a következő körre jut
+LOG_MAX_ROWS = 2000
+PUMP_BUDGET_S = 0.03
+PUMP_INTERVAL_MS = 100
+log_rows: "deque[str]" = deque()  # a nézet sorainak azonosítói, legrégebbi elöl
+log_pending: "deque[tuple[str, str]]" = deque(maxlen=LOG_MAX_ROWS)
+LEVEL_STYLES = {"ok": "success", "warn": "warning", "err": "danger"}
 details_buffer: list[str] = []
 
 # --- ügyfélkód-választás állapota
@@ -92,6 +118,22 @@ SUMMARY_RE = re.compile(
 )
 ERROR_RE = re.compile(r"(❌|hiba)", re.IGNORECASE)
 
+# Havi zárás lépései (month_close.py "step" eseményei) és az állapotuk felirata
+MONTH_CLOSE_STEPS = [
+    ("dropdowns", "Legördülők frissítése"),
+    ("ingest", "TS fájlok beolvasása"),
+    ("summary", "Összesített idők"),
+    ("validate", "Ügyfélkód–Projekt párellenőrzés"),
+    ("invoice", "Számlamelléklet"),
+]
+STEP_STATE_LABELS = {
+    "pending": ("⏸ vár", SECONDARY),
+    "running": ("⏳ fut…", INFO),
+    "done": ("✅ kész", SUCCESS),
+    "failed": ("❌ hiba", DANGER),
+    "skipped": ("⏭ kihagyva", WARNING),
+}
+
 # Lazított minta: bármely sor, amiben "Kész" és ".xlsx" szerepel
 OUTPUT_LINE_RE = re.compile(r"Kész.*?\.xlsx", re.IGNORECASE)
 FILEPATH_XLSX_RE = re.compile(
@@ -125,6 +167,11 @@ def output_root() -> Path:
     return p if p.exists() else ts_root()
 
 
+def master_data_path() -> Path:
+    """A törzsadat (Compliance) munkafüzet a TS mappában."""
+    return ts_root() / COMPLIANCE_FILE
+
+
 def reports_root() -> Path:
     r = output_root() / "reports"
     r.mkdir(parents=True, exist_ok=True)
@@ -140,8 +187,8 @@ def backup_root() -> Optional[Path]:
 
 def parse_and_emit(line: str, _title: str):
     text = line.strip()
-    if not text:
-        return
+    if not text or progress.parse(text) is not None:
+        return  # haladás-eseménysor: a hívó dolgozza fel
     limit_push(details_buffer, text)
 
     m = FILE_RE.search(text)
@@ -215,16 +262,40 @@ def list_ts_files() -> list[Path]:
     return files
 
 
-def latest_of(globs: list[str]) -> Optional[Path]:
-    """Visszaadja a legutóbb módosított fájlt a megadott globok közül (TS mappában vagy Output mappában)."""
-    candidates: list[Path] = []
-    for base in [output_root(), ts_root()]:
-        for g in globs:
-            candidates.extend(base.glob(g))
-    candidates = [c for c in candidates if not c.name.startswith("~$")]
-    if not candidates:
+def list_ts_files_for_month(month: str) -> list[Path]:
+    """Csak azok a TS fájlok, amelyekben van a hónap lapja ("Teljes év": bármely hónap).
+
+    A zip-szintű lapnév-indexet használja, munkafüzetet nem nyit meg.
+    """
+    files = list_ts_files()
+    month_norm = norm_sheet_name(month)
+    try:
+        return filter_month_files(
+            files, None if month_norm == "teljes ev" else month_norm
+        )
+    except Exception:
+        return files
+
+
+# Kimenetek indexe (mappánként név → mtime, a settings.json mellett): a
+# dashboard nem globol/stat-ol minden frissítéskor, csak ha a mappa változott
+artifacts = ArtifactIndex(CONFIG_PATH.with_name("artifact_index.json"))
+
+
+def latest_artifact(kind: str) -> Optional[tuple[Path, float]]:
+    """A legújabb kimenet (summary / invoice / invalid) az Output és a TS mappában: (útvonal, mtime)."""
+    try:
+        return artifacts.latest(kind, [output_root(), ts_root()])
+    except Exception:
         return None
-    return max(candidates, key=lambda p: p.stat().st_mtime)
+
+
+def record_artifact(path: Optional[Path]):
+    if path is not None:
+        try:
+            artifacts.record(path)
+        except Exception:
+            pass
 
 
 def fmt_ts(ts: float) -> str:
@@ -244,6 +315,90 @@ def maybe_beep():
 #            RUNNER
 # ===========================
 
+# Meleg worker: egyszer induló folyamat előtöltött pandas / openpyxl /
+# törzsadatokkal; a szkriptek ebben futnak, ha szabad (különben új folyamat).
+# A feladaton kívüli kimenete (előtöltési hiba, összeomlás) a GUI naplójába megy.
+warm_worker = WarmWorker(on_output=lambda line: post("warn", line))
+
+
+# Feladatkezelő: sor + erőforrás-korlát (TS mappa, törzsadat), megszakítás, időkorlát
+SCRIPT_RESOURCES = {
+    "timesheet_summary.py": {"ts_folder": READ, "master": READ},
+    "validate_pairs.py": {"ts_folder": READ, "master": READ},
+    "generate_szamlamelleklet.py": {"ts_folder": READ, "master": READ},
+    "update_dropdowns.py": {"ts_folder": WRITE, "master": READ},
+    "reset_timesheets.py": {"ts_folder": WRITE},
+    "month_close.py": {"ts_folder": WRITE, "master": READ},
+}
+JOB_STATE_LABELS = {
+    QUEUED: "⏸ sorban",
+    RUNNING: "⏳ fut",
+    DONE: "✅ kész",
+    FAILED: "❌ hiba",
+    CANCELLED: "⛔ megszakítva",
+    TIMEOUT: "⌛ időtúllépés",
+}
+
+jobs = JobManager(
+    caps={"ts_folder": int(SETTINGS.get("max_parallel_readers", 2) or 1)},
+    on_change=lambda: app.after(0, refresh_jobs_view),
+)
+
+
+def script_resources(cmd: list[str]) -> dict:
+    script = next((Path(c).name for c in cmd if str(c).endswith(".py")), "")
+    # ismeretlen szkript: óvatosan, kizárólagosan
+    return SCRIPT_RESOURCES.get(script, {"ts_folder": WRITE, "master": READ})
+
+
+def job_timeout() -> float | None:
+    minutes = float(SETTINGS.get("job_timeout_min", 0) or 0)
+    return minutes * 60 if minutes > 0 else None
+
+
+def submit_job(title: str, run, resources: dict):
+    job = jobs.submit(title, run, resources, timeout=job_timeout())
+    if job.state == QUEUED:
+        post("info", f"⏸ {title}: sorba állítva (egy másik feladat használja a fájlokat)")
+    return job
+
+
+def start_warm_worker():
+    if SETTINGS.get("warm_worker_enabled", True):
+        threading.Thread(
+            target=warm_worker.start, args=(str(ts_root()),), daemon=True
+        ).start()
+
+
+def start_script(cmd: list[str], extra_env: dict | None = None):
+    """Szkript indítása a TS mappában; stdout soronként olvasható, wait() → rc.
+
+    A meleg worker-ben fut, ha az áll és szabad; egyébként (indulás közben,
+    párhuzamos futásnál, kikapcsolt beállításnál) a megszokott Popen úton.
+    A haladás-események (progress.py) mindig be vannak kapcsolva.
+    """
+    extra_env = {
+        # update_dropdowns motor (közvetlenül vagy a havi zárás alatt)
+        "TS_DROPDOWN_ENGINE": str(SETTINGS.get("dropdown_engine") or "xlwings"),
+        **(extra_env or {}),
+        progress.ENV_FLAG: "1",
+    }
+    if SETTINGS.get("warm_worker_enabled", True) and cmd and cmd[0] == sys.executable:
+        job = warm_worker.try_submit(cmd[1:], cwd=str(ts_root()), env=extra_env)
+        if job is not None:
+            return job
+    return subprocess.Popen(
+        cmd,
+        cwd=str(ts_root()),
+        env={**os.environ, **extra_env},
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        **POPEN_GROUP_KWARGS,  # megszakításkor a teljes folyamatfa leállítható
+    )
+
 
 def run_task(
     cmd: list[str],
@@ -253,15 +408,21 @@ def run_task(
     expects_output_file: bool = False,
     progressable: bool = True,  # ha True, i/N számlálót mutat
     expected_globs: list[str] | None = None,  # futás utáni fallback kereséshez
+    month: str | None = None,  # ha adott, csak a hónap lapot tartalmazó fájlok számítanak
 ):
-    def worker():
+    def worker(job):
         global details_buffer, last_run_duration_s
         details_buffer = []
 
         post("info", f"{ICON_RUNNING} {title_for_dialog} elindult…")
 
         # progress init a főszálon
-        total = len(list_ts_files()) if progressable else 0
+        if not progressable:
+            total = 0
+        elif month:
+            total = len(list_ts_files_for_month(month))
+        else:
+            total = len(list_ts_files())
 
         def init_progress():
             if progressable and total > 0:
@@ -276,10 +437,49 @@ def run_task(
 
         processed = 0
         output_path: Path | None = None
+        structured = False  # jött-e haladás-esemény (akkor nincs regex / glob találgatás)
+
+        def show_progress():
+            if progressbar["mode"] == "indeterminate":
+                progressbar.stop()
+                progressbar.configure(
+                    mode="determinate", maximum=max(1, total), value=0
+                )
+            progressbar["value"] = min(processed, int(progressbar["maximum"]))
+            if total > 0:
+                pb_counter_label.config(text=f"{min(processed, total)}/{total}")
+            else:
+                pb_counter_label.config(text=str(processed))
+
+        def handle_event(ev: dict):
+            nonlocal structured, total, processed, output_path
+            structured = True
+            kind = ev.get("event")
+            if kind == "start" and progressable and ev.get("total"):
+                total = int(ev["total"])
+                app.after(0, show_progress)
+            elif kind == "file":
+                status = ev.get("status")
+                if status == "started":
+                    post("info", f"{ICON_FILE} Fájl: {ev.get('file')}")
+                elif status in progress.FILE_DONE_STATES:
+                    if status == "failed":
+                        post("err", f"{ICON_ERR} Hiba: {ev.get('file')}")
+                    if progressable:
+                        processed += 1
+                        app.after(0, show_progress)
+            elif kind == "output" and expects_output_file and ev.get("path"):
+                cand = Path(ev["path"])
+                # a script TS mappából fut
+                output_path = (ts_root() / cand) if not cand.is_absolute() else cand
+            elif kind == "error":
+                post("err", f"{ICON_ERR} {ev.get('message', '')}")
+            elif kind == "process" and ev.get("pid"):
+                job.add_pid(ev["pid"])  # pl. EXCEL.EXE: megszakításkor ez is leáll
 
         def try_capture_output_path(line: str):
             nonlocal output_path
-            if not expects_output_file:
+            if not expects_output_file or structured:
                 return
             if OUTPUT_LINE_RE.search(line):
                 for m in FILEPATH_XLSX_RE.findall(line):
@@ -291,48 +491,48 @@ def run_task(
         fs_started_at = time.time()  # fájlrendszer "óra" a fallbackhez
         t0 = time.perf_counter()
         try:
-            # Subprocess-t a TS mappában futtatjuk
-            proc = subprocess.Popen(
-                cmd,
-                cwd=str(ts_root()),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-            )
+            # a TS mappában futtatjuk (meleg worker vagy új folyamat)
+            proc = start_script(cmd)
+            job.attach(proc)
             assert proc.stdout is not None
             for line in proc.stdout:
+                ev = progress.parse(line)
+                if ev is not None:
+                    handle_event(ev)
+                    continue
                 parse_and_emit(line, title_for_dialog)
                 try_capture_output_path(line)
 
-                # determinált progress léptetés a „Feldolgozás:” sorokra
-                if progressable and FILE_RE.search(line):
+                # régi szkript (nincs esemény): progress a „Feldolgozás:” sorokra
+                if progressable and not structured and FILE_RE.search(line):
                     processed += 1
+                    app.after(0, show_progress)
+
+            rc = proc.wait()
+            last_run_duration_s = max(0.0, time.perf_counter() - t0)
 
-                    def step():
+            if job.stopping:
+                # megszakítás / időtúllépés: nincs kimenet-keresés, nincs hiba-popup
+                reason = "időtúllépés" if job.stop_reason == TIMEOUT else "megszakítva"
+                post("warn", f"⛔ {title_for_dialog}: {reason}")
+
+                def stopped():
+                    try:
                         if progressbar["mode"] == "indeterminate":
                             progressbar.stop()
-                            progressbar.configure(
-                                mode="determinate", maximum=max(1, total), value=0
-                            )
-                        progressbar["value"] = min(
-                            processed, int(progressbar["maximum"])
-                        )
-                        if total > 0:
-                            pb_counter_label.config(
-                                text=f"{min(processed, total)}/{total}"
-                            )
-                        else:
-                            pb_counter_label.config(text=str(processed))
-
-                    app.after(0, step)
+                    except Exception:
+                        pass
+                    status_label.config(
+                        text=f"⛔ {title_for_dialog} — {reason} — {last_run_duration_s:.1f}s"
+                    )
 
-            rc = proc.wait()
-            last_run_duration_s = max(0.0, time.perf_counter() - t0)
+                app.after(0, stopped)
+                app.after(0, refresh_dashboard)
+                start_warm_worker()  # ha a meleg worker-ben futott, újraindul
+                return False
 
-            # ---- Fallback: ha nem találtunk fájlnevet a logból, de várunk kimenetet
-            if rc == 0 and expects_output_file and output_path is None:
+            # ---- Fallback: ha se esemény, se logsor nem adta a fájlnevet, de várunk kimenetet
+            if rc == 0 and expects_output_file and output_path is None and not structured:
                 globs = list(expected_globs or [])
                 # végső tartalék: típusszerinti minta
                 if (
@@ -401,6 +601,8 @@ def run_task(
                     except Exception as e:
                         post("warn", f"{ICON_WARN} Backup nem sikerült: {e}")
 
+                record_artifact(output_path)
+
             def finish(success: bool):
                 try:
                     if progressbar["mode"] == "indeterminate":
@@ -454,8 +656,9 @@ def run_task(
 
         # művelet vége: dashboard frissítése
         app.after(0, refresh_dashboard)
+        return rc == 0
 
-    threading.Thread(target=worker, daemon=True).start()
+    submit_job(title_for_dialog, worker, script_resources(cmd))
 
 
 def show_result_dialog(success: bool, title: str, output_path: Path | None):
@@ -584,9 +787,9 @@ def show_details_window():
 def open_client_code_selector():
     global all_client_codes_sorted, selected_client_codes
     try:
-        if load_client_name_map is None:
-            raise RuntimeError("A generate_szamlamelleklet modul nem érhető el.")
-        name_map = load_client_name_map()
+        import master_data  # késleltetett: pandas (induláskor a háttérszál tölti be)
+
+        name_map = master_data.client_name_map(master_data_path())
         all_client_codes_sorted = sorted(name_map.keys(), key=remove_accents)
     except Exception as e:
         post("err", f"{ICON_ERR} Hiba az ügyfélkódok betöltésekor: {e}")
@@ -723,6 +926,7 @@ def aggregate_hours():
             f"timesheet_summary_{selected_month}.xlsx",
             "timesheet_summary_*.xlsx",
         ],
+        month=selected_month,
     )
 
 
@@ -765,6 +969,7 @@ def generate_szamlamelleklet():
             f"szamlamelleklet_{selected_month}.xlsx",
             "szamlamelleklet_*.xlsx",
         ],
+        month=selected_month,
     )
 
 
@@ -778,6 +983,7 @@ def validate_pairs():
         expects_output_file=True,
         progressable=True,
         expected_globs=[f"invalid_parok_{selected_month}.xlsx", "invalid_parok_*.xlsx"],
+        month=selected_month,
     )
 
 
@@ -789,8 +995,10 @@ def reset_timesheets():
         messagebox.showinfo("TS reset", "Nem található TS fájl a mappában.")
         return
 
+    backend = SETTINGS.get("reset_archive_backend", "folder")
+    target = "az archív tárba (.ts_archive)" if backend == "store" else "az archív mappába"
     msg = (
-        f"{len(ts_files)} TS fájl archiválásra kerül az archív mappába,\n"
+        f"{len(ts_files)} TS fájl archiválásra kerül {target},\n"
         f"és ugyanennyi üres példány jön létre azonos névvel és beállításokkal.\n\n"
         f"Folytatod?"
     )
@@ -798,7 +1006,7 @@ def reset_timesheets():
         return
 
     run_task(
-        [sys.executable, "reset_timesheets.py"],
+        [sys.executable, "reset_timesheets.py", "--archive-backend", backend],
         "TS reset — archiválás és üres fájlok létrehozása",
         reset_progress,
         reset_info,
@@ -813,7 +1021,7 @@ def reset_timesheets():
 
 
 def month_close_pipeline():
-    """Egygombos havi zárás: update -> summary -> validate -> invoice"""
+    """Egygombos havi zárás (month_close.py): update -> beolvasás -> {summary, validate, invoice}"""
     selected_month = month_var.get() or current_month
 
     # Pre-flight
@@ -846,10 +1054,21 @@ def month_close_pipeline():
     )
     title.pack(anchor=W)
 
-    step_lbl = tb.Label(frm, text="Előkészítés…", font=("Segoe UI", 11))
-    step_lbl.pack(anchor=W, pady=(8, 6))
-
-    pbar = tb.Progressbar(frm, mode="determinate", maximum=4, value=0, bootstyle=INFO)
+    # lépésenkénti állapot (a month_close.py "step" eseményeiből)
+    steps_frm = tb.Frame(frm)
+    steps_frm.pack(fill=X, pady=(8, 6))
+    step_state_lbls: Dict[str, Any] = {}
+    for name, label in MONTH_CLOSE_STEPS:
+        r = tb.Frame(steps_frm)
+        r.pack(fill=X, pady=1)
+        tb.Label(r, text=label, width=34, anchor=W, font=("Segoe UI", 11)).pack(side=LEFT)
+        st = tb.Label(r, text=STEP_STATE_LABELS["pending"][0], bootstyle=SECONDARY)
+        st.pack(side=LEFT, padx=(6, 0))
+        step_state_lbls[name] = st
+
+    pbar = tb.Progressbar(
+        frm, mode="determinate", maximum=len(MONTH_CLOSE_STEPS), value=0, bootstyle=INFO
+    )
     pbar.pack(fill=X)
 
     log_hint = tb.Label(
@@ -857,156 +1076,115 @@ def month_close_pipeline():
     )
     log_hint.pack(anchor=W, pady=(8, 0))
 
+    job_ref: Dict[str, Any] = {}
+    tb.Button(
+        frm,
+        text="⛔ Megszakítás",
+        bootstyle=(DANGER, OUTLINE),
+        command=lambda: job_ref and jobs.cancel(job_ref["job"].id),
+    ).pack(anchor=E, pady=(8, 0))
+
     results: Dict[str, Optional[Path]] = {
         "summary": None,
         "validate": None,
         "invoice": None,
     }
-
-    def run_step(
-        cmd: List[str], title_for_dialog: str, expected_globs: List[str] | None
-    ) -> tuple[bool, Optional[Path]]:
-        nonlocal step_lbl, pbar
-        app.after(0, lambda: step_lbl.config(text=title_for_dialog))
+    states: Dict[str, str] = {name: "pending" for name, _ in MONTH_CLOSE_STEPS}
+
+    def set_state(name: str, state: str):
+        states[name] = state
+        text, style = STEP_STATE_LABELS.get(state, (state, SECONDARY))
+        finished = sum(st in ("done", "failed", "skipped") for st in states.values())
+
+        def apply():
+            if name in step_state_lbls:
+                step_state_lbls[name].config(text=text, bootstyle=style)
+            pbar.configure(value=finished)
+
+        app.after(0, apply)
+
+    def collect_output(name: str, raw: str):
+        path = Path(raw.strip())
+        path = (ts_root() / path) if not path.is_absolute() else path
+        dest_dir = output_root()
+        if dest_dir and path.exists() and path.parent != dest_dir:
+            try:
+                dest_dir.mkdir(parents=True, exist_ok=True)
+                dest = dest_dir / path.name
+                shutil.copy2(str(path), str(dest))
+                path = dest
+            except Exception as e:
+                post("warn", f"{ICON_WARN} Nem sikerült az output mappába másolni: {e}")
+        results[name] = path
+        record_artifact(path)
+
+    def worker(job):
+        month = month_var.get() or current_month
+        title_for_dialog = f"Havi zárás — hónap: {month}"
         post("info", f"{ICON_RUNNING} {title_for_dialog}…")
-
-        output_path: Optional[Path] = None
-        fs_started_at = time.time()
-
-        def try_capture_output_path(line: str):
-            nonlocal output_path
-            if OUTPUT_LINE_RE.search(line):
-                for m in FILEPATH_XLSX_RE.findall(line):
-                    cand = Path(m)
-                    cand_abs = (ts_root() / cand) if not cand.is_absolute() else cand
-                    output_path = cand_abs
-
+        cmd = [
+            sys.executable,
+            "month_close.py",
+            month,
+            *([c for c in (selected_client_codes or [])] or []),
+        ]
         try:
-            proc = subprocess.Popen(
-                cmd,
-                cwd=str(ts_root()),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-            )
+            proc = start_script(cmd)
+            job.attach(proc)
             assert proc.stdout is not None
             for line in proc.stdout:
-                parse_and_emit(line, title_for_dialog)
-                try_capture_output_path(line)
+                ev = progress.parse(line)
+                if ev is None:
+                    parse_and_emit(line, title_for_dialog)
+                    continue
+                if ev.get("event") == "process" and ev.get("pid"):
+                    job.add_pid(ev["pid"])
+                    continue
+                if ev.get("event") != "step":
+                    continue  # a lépések saját (fájl, kimenet) eseményei
+                name, state, output = ev.get("name"), ev.get("state"), ev.get("output")
+                set_state(name, state)
+                label = dict(MONTH_CLOSE_STEPS).get(name, name)
+                if state == "done":
+                    post("ok", f"{ICON_OK} Kész: {label}")
+                    if output and name in results:
+                        collect_output(name, output)
+                elif state == "failed":
+                    post("err", f"{ICON_ERR} Hiba: {label}")
+                elif state == "skipped":
+                    post("warn", f"{ICON_WARN} Kihagyva: {label}")
             rc = proc.wait()
-            if rc != 0:
-                post("err", f"{ICON_ERR} Hiba: {title_for_dialog} (rc={rc})")
-                return False, None
-
-            if output_path is None and expected_globs:
-                candidates: list[Path] = []
-                for base in [output_root(), ts_root()]:
-                    for g in expected_globs:
-                        candidates.extend(
-                            p for p in base.glob(g) if not p.name.startswith("~$")
-                        )
-                recent = [
-                    c for c in candidates if c.stat().st_mtime >= fs_started_at - 1.0
-                ] or candidates
-                if recent:
-                    output_path = max(recent, key=lambda p: p.stat().st_mtime)
-
-            if output_path is not None:
-                dest_dir = output_root()
-                if dest_dir and output_path.parent != dest_dir:
-                    try:
-                        dest_dir.mkdir(parents=True, exist_ok=True)
-                        dest = dest_dir / output_path.name
-                        shutil.copy2(str(output_path), str(dest))
-                        output_path = dest
-                    except Exception as e:
-                        post(
-                            "warn",
-                            f"{ICON_WARN} Nem sikerült az output mappába másolni: {e}",
-                        )
-
-            post("ok", f"{ICON_OK} Kész: {title_for_dialog}")
-            return True, output_path
         except Exception as e:
             post("err", f"{ICON_ERR} Kivétel: {title_for_dialog}: {e}")
-            return False, None
-
-    def worker():
-        ok, _ = run_step(
-            [sys.executable, "update_dropdowns.py"], "Legördülők frissítése", None
-        )
-        app.after(0, lambda: pbar.configure(value=1))
-        if not ok:
-            app.after(
-                0,
-                lambda: (
-                    dlg.destroy(),
-                    messagebox.showerror(
-                        "Havi zárás", "Megakadt: Legördülők frissítése."
-                    ),
-                ),
-            )
-            return
+            rc = -1
 
-        month = month_var.get() or current_month
-        ok, summary_file = run_step(
-            [sys.executable, "timesheet_summary.py", month],
-            f"Összesített idők — hónap: {month}",
-            [f"timesheet_summary_{month}.xlsx", "timesheet_summary_*.xlsx"],
-        )
-        results["summary"] = summary_file
-        app.after(0, lambda: pbar.configure(value=2))
-        if not ok:
-            app.after(
-                0,
-                lambda: (
-                    dlg.destroy(),
-                    messagebox.showerror("Havi zárás", "Megakadt: Összesített idők."),
-                ),
-            )
-            return
-
-        ok, validate_file = run_step(
-            [sys.executable, "validate_pairs.py", month],
-            f"Ügyfélkód–Projekt párellenőrzés — hónap: {month}",
-            [f"invalid_parok_{month}.xlsx", "invalid_parok_*.xlsx"],
-        )
-        results["validate"] = validate_file
-        app.after(0, lambda: pbar.configure(value=3))
-        if not ok:
-            app.after(
-                0,
-                lambda: (
-                    dlg.destroy(),
-                    messagebox.showerror("Havi zárás", "Megakadt: Párellenőrzés."),
-                ),
-            )
-            return
+        if job.stopping:
+            reason = "időtúllépés" if job.stop_reason == TIMEOUT else "megszakítva"
+            post("warn", f"⛔ {title_for_dialog}: {reason}")
+            app.after(0, lambda: (dlg.destroy(), refresh_dashboard()))
+            start_warm_worker()
+            return False
 
-        cmd = [
-            sys.executable,
-            "generate_szamlamelleklet.py",
-            month,
-            *([c for c in (selected_client_codes or [])] or []),
+        # "skipped" önmagában nem hiba (pl. számlamelléklet "Teljes év"-re); ha
+        # egy lépés elhasalt, a miatta kihagyottakat is felsoroljuk
+        failed = [
+            dict(MONTH_CLOSE_STEPS)[n]
+            for n, st in states.items()
+            if st not in ("done", "skipped") or (st == "skipped" and rc != 0)
         ]
-        ok, invoice_file = run_step(
-            cmd,
-            f"Számlamelléklet — hónap: {month}",
-            [f"szamlamelleklet_{month}.xlsx", "szamlamelleklet_*.xlsx"],
-        )
-        results["invoice"] = invoice_file
-        app.after(0, lambda: pbar.configure(value=4))
-        if not ok:
+        if rc != 0 or failed:
             app.after(
                 0,
                 lambda: (
                     dlg.destroy(),
-                    messagebox.showerror("Havi zárás", "Megakadt: Számlamelléklet."),
+                    messagebox.showerror(
+                        "Havi zárás",
+                        "Megakadt: " + (", ".join(failed) or f"rc={rc}") + ".",
+                    ),
+                    refresh_dashboard(),
                 ),
             )
-            return
+            return False
 
         def show_summary():
             dlg.destroy()
@@ -1059,7 +1237,9 @@ def month_close_pipeline():
         app.after(0, show_summary)
         app.after(0, refresh_dashboard)
 
-    threading.Thread(target=worker, daemon=True).start()
+    job_ref["job"] = submit_job(
+        f"Havi zárás — {selected_month}", worker, SCRIPT_RESOURCES["month_close.py"]
+    )
 
 
 # ===========================
@@ -1072,27 +1252,27 @@ def refresh_dashboard():
     ts_val.config(text=str(len(ts_files)))
     ts_sub.config(text=("Nincs TS fájl" if not ts_files else str(ts_root())))
 
-    latest_summary = latest_of(["timesheet_summary_*.xlsx"])
+    latest_summary = latest_artifact("summary")
     if latest_summary:
-        m = latest_summary.stat().st_mtime
+        latest_summary, m = latest_summary
         sum_val.config(text=ellipsize_middle(latest_summary.name, 24))
         sum_sub.config(text=f"Módosítva: {fmt_ts(m)}")
     else:
         sum_val.config(text="—")
         sum_sub.config(text="Még nincs összesítés")
 
-    latest_invoice = latest_of(["szamlamelleklet_*.xlsx"])
+    latest_invoice = latest_artifact("invoice")
     if latest_invoice:
-        m = latest_invoice.stat().st_mtime
+        latest_invoice, m = latest_invoice
         inv_val.config(text=ellipsize_middle(latest_invoice.name, 24))
         inv_sub.config(text=f"Módosítva: {fmt_ts(m)}")
     else:
         inv_val.config(text="—")
         inv_sub.config(text="Még nincs számlamelléklet")
 
-    latest_invalid = latest_of(["invalid_parok_*.xlsx"])
+    latest_invalid = latest_artifact("invalid")
     if latest_invalid:
-        m = latest_invalid.stat().st_mtime
+        latest_invalid, m = latest_invalid
         val_val.config(text=ellipsize_middle(latest_invalid.name, 24))
         val_sub.config(text=f"Módosítva: {fmt_ts(m)}")
     else:
@@ -1240,49 +1420,56 @@ def send_email(
 def weekly_report_now():
     """Kézi indítás: heti riport (summary + validate), email küldés csatolmányokkal, számlamelléklet nélkül."""
 
-    def worker():
+    def worker(job):
         month = month_var.get() or current_month
         post("info", "📧 Heti riport: indítás…")
+        # a riport szkriptjei az éves ténytáblából dolgoznak (ts_facts)
+        env = {"TS_FACTS": "1"}
+
+        def run_step(script: str, title: str) -> Optional[Path]:
+            """A szkript futtatása; a kimenete az "output" eseményből."""
+            output = None
+            proc = start_script([sys.executable, script, month], env)
+            job.attach(proc)
+            for line in proc.stdout:
+                ev = progress.parse(line)
+                if ev is None:
+                    parse_and_emit(line, title)
+                elif ev.get("event") == "output" and ev.get("path"):
+                    output = Path(ev["path"])
+                    output = output if output.is_absolute() else ts_root() / output
+            proc.wait()
+            return output
 
         # 1) Összesített idők
+        summary = None
         try:
-            proc = subprocess.Popen(
-                [sys.executable, "timesheet_summary.py", month],
-                cwd=str(ts_root()),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-            )
-            out = proc.communicate()[0]
-            for line in out.splitlines():
-                parse_and_emit(line, "Riport: Összesített idők")
+            summary = run_step("timesheet_summary.py", "Riport: Összesített idők")
         except Exception as e:
             post("err", f"{ICON_ERR} Riport: összesítés hiba: {e}")
 
-        summary = latest_of(
-            [f"timesheet_summary_{month}.xlsx", "timesheet_summary_*.xlsx"]
-        )
+        if job.stopping:
+            post("warn", "⛔ Heti riport: megszakítva")
+            start_warm_worker()
+            return False
+
+        if summary is None:
+            summary = (latest_artifact("summary") or (None,))[0]
 
         # 2) Párellenőrzés
+        invalid = None
         try:
-            proc = subprocess.Popen(
-                [sys.executable, "validate_pairs.py", month],
-                cwd=str(ts_root()),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-            )
-            out = proc.communicate()[0]
-            for line in out.splitlines():
-                parse_and_emit(line, "Riport: Párellenőrzés")
+            invalid = run_step("validate_pairs.py", "Riport: Párellenőrzés")
         except Exception as e:
             post("err", f"{ICON_ERR} Riport: párellenőrzés hiba: {e}")
 
-        invalid = latest_of([f"invalid_parok_{month}.xlsx", "invalid_parok_*.xlsx"])
+        if job.stopping:
+            post("warn", "⛔ Heti riport: megszakítva")
+            start_warm_worker()
+            return False
+
+        if invalid is None:
+            invalid = (latest_artifact("invalid") or (None,))[0]
 
         # Másolás az output mappába és csatolmányok listája
         attachments: List[Path] = []
@@ -1297,6 +1484,7 @@ def weekly_report_now():
                         p = dest
                 except Exception:
                     pass
+                record_artifact(p)
             if p and p.exists() and not p.name.startswith("~$"):
                 attachments.append(p)
 
@@ -1320,9 +1508,9 @@ def weekly_report_now():
             pass
 
         # (email küldés része továbbra is kikommentezve – jelenlegi viselkedés megőrizve)
-        refresh_dashboard()
+        app.after(0, refresh_dashboard)
 
-    threading.Thread(target=worker, daemon=True).start()
+    submit_job("Heti riport", worker, SCRIPT_RESOURCES["validate_pairs.py"])
 
 
 def weekly_report_tick():
@@ -1355,22 +1543,32 @@ def weekly_report_tick():
 
 
 def pump_ui():
+    """A sorban álló üzenetek kötegelt kiírása (időkeret, gyűrűpuffer, egy görgetés)."""
+    # a sor ürítése olcsó; a nézetbe úgysem férő régi üzenetek kiesnek
     try:
         while True:
-            level, msg = ui_queue.get_nowait()
-            if level == "ok":
-                style = "success"
-            elif level == "warn":
-                style = "warning"
-            elif level == "err":
-                style = "danger"
-            else:
-                style = "info"
-            log_list.insert("", "end", values=(msg,), tags=(style,))
-            log_list.see(log_list.get_children()[-1])
+            log_pending.append(ui_queue.get_nowait())
     except queue.Empty:
         pass
-    app.after(100, pump_ui)
+
+    deadline = time.perf_counter() + PUMP_BUDGET_S
+    inserted = 0
+    while log_pending:
+        level, msg = log_pending.popleft()
+        iid = log_list.insert(
+            "", "end", values=(msg,), tags=(LEVEL_STYLES.get(level, "info"),)
+        )
+        log_rows.append(iid)
+        inserted += 1
+        if inserted % 32 == 0 and time.perf_counter() >= deadline:
+            break
+    if len(log_rows) > LOG_MAX_ROWS:
+        log_list.delete(*[log_rows.popleft() for _ in range(len(log_rows) - LOG_MAX_ROWS)])
+    if inserted:
+        log_list.see(log_rows[-1])
+
+    # ha maradt kiírandó, a Tk saját eseményei után azonnal folytatjuk
+    app.after(1 if log_pending else PUMP_INTERVAL_MS, pump_ui)
 
 
 # ===========================
@@ -1403,16 +1601,13 @@ def choose_dir(field: tk.Entry):
         field.delete(0, tk.END)
         field.insert(0, path)
 
-from generate_szamlamelleklet import load_active_clients
-
 def _load_all_client_codes_sorted() -> List[str]:
     """Összes ismert ügyfélkód (ha elérhető), abc szerint ékezetlenítve."""
     try:
-        if load_client_name_map is None:
-            return []
-        name_map = load_client_name_map()
-        active_set = set(load_active_clients())
-        name_map = {k: v for k, v in name_map.items() if k in active_set}
+        import master_data  # késleltetett: pandas
+
+        # a név-térkép már csak aktív ügyfeleket tartalmaz
+        name_map = master_data.client_name_map(master_data_path())
         return sorted(name_map.keys(), key=remove_accents)
     except Exception:
         return []
@@ -1442,11 +1637,13 @@ def _initial_default_codes_for_settings_ui(all_codes: List[str]) -> List[str]:
 
 
 def settings_save():
+    prev_ts_folder = str(ts_root())
     SETTINGS["language"] = lang_var.get()
     SETTINGS["ts_folder"] = ts_folder_var.get().strip() or str(Path.cwd())
     SETTINGS["output_folder"] = output_folder_var.get().strip()
     SETTINGS["backup_enabled"] = backup_enabled_var.get()
     SETTINGS["backup_folder"] = backup_folder_var.get().strip()
+    SETTINGS["reset_archive_backend"] = reset_archive_var.get()
     # default ügyfélkódok: listbox tartalma -> csv
     codes = default_codes_listbox.get(0, tk.END)
     SETTINGS["default_client_codes"] = ",".join(codes)
@@ -1465,6 +1662,8 @@ def settings_save():
 
     save_settings(SETTINGS)
     refresh_dashboard()
+    if str(ts_root()) != prev_ts_folder:
+        start_warm_worker()  # a régi TS mappából importált modulok ne maradjanak
     messagebox.showinfo(
         "Beállítások", "Mentve. (Egyes változások csak újraindítás után teljesek.)"
     )
@@ -1496,16 +1695,9 @@ notebook.add(home_tab, text="Főoldal")
 content_frame = tb.Frame(home_tab, padding=50)
 content_frame.pack(fill=BOTH, expand=True)
 
-# --- Logo betöltése
-try:
-    logo_img = Image.open("ecovis_logo.png")
-    logo_img = logo_img.resize((400, 60), Image.LANCZOS)  # szépen átméretezve
-    logo_tk = ImageTk.PhotoImage(logo_img)
-    logo_label = tb.Label(content_frame, image=logo_tk)
-    logo_label.image = logo_tk  # referenciát tartani kell!
-    logo_label.pack(pady=(0, 20))
-except Exception as e:
-    print(f"Nem sikerült betölteni a logót: {e}")
+# --- Logo: helyőrző; a képet a háttérbetöltés teszi be (load_startup_data)
+logo_label = tb.Label(content_frame, text="", font=("Segoe UI", 28))
+logo_label.pack(pady=(0, 20))
 
 title_label = tb.Label(
     content_frame,
@@ -1674,6 +1866,75 @@ szamla_progress, szamla_info = mk_pb(pb_row, SECONDARY)
 # ÚJ: TS reset progress bar
 reset_progress, reset_info = mk_pb(pb_row, DANGER)
 
+# Feladatok (sor, futó, befejezett) + megszakítás
+jobs_card = tb.Labelframe(content_frame, text="Feladatok", padding=10)
+jobs_card.pack(fill=X, pady=(0, 10))
+
+jobs_list = tb.Treeview(
+    jobs_card,
+    columns=("id", "title", "state", "time"),
+    show="headings",
+    height=4,
+    bootstyle=SECONDARY,
+)
+for col, text, width in (
+    ("id", "#", 40),
+    ("title", "Feladat", 600),
+    ("state", "Állapot", 140),
+    ("time", "Idő", 80),
+):
+    jobs_list.heading(col, text=text)
+    jobs_list.column(col, width=width, anchor=W)
+jobs_list.pack(side=LEFT, fill=X, expand=True)
+
+
+def cancel_selected_job():
+    for iid in jobs_list.selection():
+        jobs.cancel(int(iid))
+
+
+tb.Button(
+    jobs_card,
+    text="⛔ Megszakítás",
+    bootstyle=(DANGER, OUTLINE),
+    command=cancel_selected_job,
+).pack(side=LEFT, padx=(10, 0), anchor=N)
+
+
+def refresh_jobs_view():
+    global jobs_tick_pending
+    selected = set(jobs_list.selection())
+    jobs_list.delete(*jobs_list.get_children())
+    for job in reversed(jobs.jobs()):  # legújabb felül
+        secs = job.duration()
+        jobs_list.insert(
+            "",
+            END,
+            iid=str(job.id),
+            values=(
+                job.id,
+                job.title,
+                JOB_STATE_LABELS.get(job.state, job.state),
+                f"{secs:.1f} s" if secs is not None else "—",
+            ),
+        )
+    keep = [iid for iid in selected if jobs_list.exists(iid)]
+    if keep:
+        jobs_list.selection_set(keep)
+    if not jobs_tick_pending and jobs.active():
+        jobs_tick_pending = True
+        app.after(1000, _tick_jobs_view)  # futó feladatok ideje
+
+
+jobs_tick_pending = False
+
+
+def _tick_jobs_view():
+    global jobs_tick_pending
+    jobs_tick_pending = False
+    refresh_jobs_view()
+
+
 # Log panel
 log_card = tb.Labelframe(
     content_frame, text="Futás közben történt események", padding=10
@@ -1819,13 +2080,27 @@ tb.Checkbutton(
     bootstyle="round-toggle",
 ).grid(row=3, column=1, sticky=W, padx=4, pady=4)
 
+tb.Label(path_group, text="TS reset archívum:").grid(
+    row=4, column=0, sticky=W, padx=4, pady=4
+)
+reset_archive_var = tk.StringVar(value=SETTINGS.get("reset_archive_backend", "folder"))
+tb.Combobox(
+    path_group,
+    textvariable=reset_archive_var,
+    values=["folder", "store"],
+    state="readonly",
+    width=12,
+).grid(row=4, column=1, sticky=W, padx=4, pady=4)
+
 # Ügyfélkódok – ÚJ LISTAKEZELŐ UI
 codes_group = tb.Labelframe(
     set_frame, text="👥 Ügyfélkódok (alapértelmezett lista)", padding=12
 )
 codes_group.pack(fill=X, pady=8)
 
-all_codes_available = _load_all_client_codes_sorted()
+# a master lista a háttérből érkezik (apply_client_codes); addig a mentett /
+# alap lista szűretlenül látszik, a "Hozzáadás" szabad beírást enged
+all_codes_available: List[str] = []
 initial_defaults = _initial_default_codes_for_settings_ui(all_codes_available)
 
 # bal: listbox a kiválasztott alapértelmezett kódokkal
@@ -2032,8 +2307,77 @@ tb.Button(exit_frame, text="Kilépés", bootstyle=DANGER, command=app.destroy).p
     pady=6, ipadx=10, ipady=6
 )
 
+# ===========================
+#   HÁTTÉRBETÖLTÉS (indulás)
+# ===========================
+# Az ablak előbb megjelenik; a logó (PIL) és a törzsadat / ügyfélkódok
+# (pandas + Compliance munkafüzet) háttérszálon töltődik, helyőrzőkkel.
+
+
+def apply_logo(img):
+    from PIL import ImageTk  # a PhotoImage a Tk szálon készül
+
+    logo_tk = ImageTk.PhotoImage(img)
+    logo_label.config(image=logo_tk, text="")
+    logo_label.image = logo_tk  # referenciát tartani kell!
+
+
+def apply_client_codes(codes: List[str]):
+    global all_codes_available
+    all_codes_available = codes
+    add_combo.configure(values=codes)
+    # a listát csak akkor szűrjük, ha a felhasználó még nem nyúlt hozzá
+    current = list(default_codes_listbox.get(0, tk.END))
+    if codes and current == sorted(initial_defaults, key=remove_accents):
+        default_codes_listbox.delete(0, tk.END)
+        for code in sorted(_initial_default_codes_for_settings_ui(codes), key=remove_accents):
+            default_codes_listbox.insert(tk.END, code)
+
+
+def load_startup_data():
+    try:
+        from PIL import Image
+
+        img = Image.open(LOGO_FILE).resize(LOGO_SIZE, Image.LANCZOS)
+        app.after(0, lambda: apply_logo(img))
+    except Exception as e:
+        post("warn", f"{ICON_WARN} Nem sikerült betölteni a logót: {e}")
+    codes = _load_all_client_codes_sorted()
+    app.after(0, lambda: apply_client_codes(codes))
+    mark_startup("background")
+    app.after(0, report_startup)
+
+
+def report_startup():
+    """Indulási idők: napló + logs/startup.jsonl; TS_STARTUP_EXIT=1 esetén kilépés (benchmark)."""
+    phases = {k: round(v, 3) for k, v in STARTUP_PHASES.items()}
+    post(
+        "info",
+        f"Indulás: ablak {phases.get('shown', 0):.2f} s, adatok {phases.get('background', 0):.2f} s "
+        f"(importok {phases.get('imports', 0):.2f} s)",
+    )
+    try:
+        Path("logs").mkdir(exist_ok=True)
+        rec = {"at": datetime.datetime.now().isoformat(timespec="seconds"), **phases}
+        with open(Path("logs") / "startup.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec) + "\n")
+    except Exception:
+        pass
+    if os.environ.get("TS_STARTUP_EXIT") == "1":
+        print(json.dumps(phases), flush=True)
+        app.destroy()
+
+
+def on_window_shown():
+    mark_startup("shown")
+    threading.Thread(target=load_startup_data, daemon=True).start()
+
+
 # Start UI pump + időzítők
+mark_startup("window")
+app.after_idle(on_window_shown)
 app.after(100, pump_ui)
+app.after(500, start_warm_worker)
 app.after(150, refresh_dashboard)
 
 
@@ -2053,3 +2397,5 @@ app.after(1000, reminder_tick)
 app.after(2000, weekly_report_tick)  # ütemezett heti riport
 
 app.mainloop()
+jobs.cancel_all()
+warm_worker.stop()
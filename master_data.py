@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Törzsadatok (Ecovis Compliance Solution számlázási adatok) egyszeri betöltése.
+
+A Cégadatok és a TS kódok lapot folyamatonként egyszer olvassuk be, és
+normalizált, memóriában tartott struktúrákat adunk vissza:
+- active:       aktív ügyfélkódok (str, ahogy a Cégadatokban szerepelnek)
+- active_norm:  ugyanezek ékezet nélkül, kisbetűvel (párellenőrzéshez)
+- name_map:     aktív ügyfélkód → cégnév (név oszlop alias-okkal)
+- lang_map:     aktív ügyfélkód → nyelv (kisbetű; ha nincs oszlop: "magyar")
+- allowed:      normalizált ügyfélkód → engedélyezett normalizált projektnevek
+- ts_codes / ts_projects: a TS kódok lap egyedi ügyfélkódjai / projektnevei
+
+Az eredmény a fájl (méret, mtime) szerint memoizált; ha a fájl változik,
+újraolvassuk. Opcionálisan snapshot is készül a fájl melletti
+.ts_cache/master/ alá, így a következő folyamatnak sem kell Excelt olvasnia.
+
+Usage:
+    import master_data
+    active = master_data.active_clients()
+    names = master_data.client_name_map()
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import unicodedata
+from pathlib import Path
+
+import pandas as pd
+
+from ts_constants import COMPLIANCE_FILE
+
+# --- Konfiguráció ---
+CEGADATOK_SHEET = "Cégadatok"
+TS_KODOK_SHEET = "TS kódok"
+NAME_ALIASES = ["Cégnév", "Cég neve", "Ügyfél neve", "Partner neve", "Név"]
+SNAPSHOT_SUBDIR = Path(".ts_cache") / "master"
+SNAPSHOT_VERSION = 1
+USE_SNAPSHOT = True  # a snapshot kikapcsolható (pl. hibakereséshez)
+
+# folyamaton belüli memo: abszolút útvonal → (ujjlenyomat, adatok)
+_MEMO: dict[str, tuple[tuple[int, int], dict]] = {}
+
+
+def norm(s) -> str:
+    """Ékezet nélkül, kisbetű, szóközök nélkül (NaN → "")."""
+    if not isinstance(s, str):
+        s = "" if pd.isna(s) else str(s)
+    nfkd = unicodedata.normalize("NFKD", s)
+    return "".join(c for c in nfkd if not unicodedata.combining(c)).strip().lower()
+
+
+def fingerprint(path: str | os.PathLike = COMPLIANCE_FILE) -> tuple[int, int]:
+    """(méret, mtime_ns) — a törzsadat-fájl egy változatát azonosítja."""
+    st = Path(path).stat()
+    return st.st_size, st.st_mtime_ns
+
+
+def _snapshot_path(p: Path) -> Path:
+    digest = hashlib.sha1(str(p).encode("utf-8")).hexdigest()[:16]
+    return p.parent / SNAPSHOT_SUBDIR / f"{digest}.pkl"
+
+
+def _read_snapshot(p: Path, fp: tuple[int, int]) -> dict | None:
+    snap = _snapshot_path(p)
+    try:
+        with open(snap, "rb") as f:
+            payload = pickle.load(f)
+        if payload.get("version") == SNAPSHOT_VERSION and payload.get("fp") == fp:
+            return payload["data"]
+    except Exception:
+        pass
+    return None
+
+
+def _write_snapshot(p: Path, fp: tuple[int, int], data: dict) -> None:
+    snap = _snapshot_path(p)
+    tmp = snap.with_name(f"{snap.name}.{os.getpid()}.tmp")
+    try:
+        snap.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": SNAPSHOT_VERSION, "fp": fp, "data": data}, f)
+        os.replace(tmp, snap)
+    except Exception as e:
+        logging.debug(f"Törzsadat snapshot írás sikertelen ({snap}): {e}")
+        try:
+            tmp.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def _parse(p: Path) -> dict:
+    """A két lap beolvasása (egy munkafüzet-megnyitással) és normalizálása."""
+    with pd.ExcelFile(p) as xls:
+        ceg = pd.read_excel(xls, sheet_name=CEGADATOK_SHEET)
+        kodok = pd.read_excel(xls, sheet_name=TS_KODOK_SHEET)
+
+    if "Ügyfélkód" not in ceg.columns:
+        raise ValueError("A Cégadatok lapon nincs 'Ügyfélkód' oszlop.")
+    act = ceg[ceg["Ügyfél aktív"].astype(str).str.strip().str.lower() == "igen"]
+    active = set(act["Ügyfélkód"].astype(str))
+
+    name_col = next((c for c in NAME_ALIASES if c in act.columns), None) or "Ügyfélkód"
+    codes = act["Ügyfélkód"].dropna().astype(str)
+    if name_col == "Ügyfélkód":  # nincs név oszlop: a kód a név
+        name_map = dict(zip(codes, codes))
+    else:
+        names = act.loc[act["Ügyfélkód"].notna(), name_col].astype(str)
+        name_map = dict(zip(codes, names))
+
+    if "Nyelv" in act.columns:
+        lang_map = dict(
+            zip(
+                act["Ügyfélkód"].astype(str),
+                act["Nyelv"].astype(str).str.strip().str.lower(),
+            )
+        )
+    else:
+        lang_map = {k: "magyar" for k in act["Ügyfélkód"].astype(str)}
+
+    pairs = kodok.dropna(subset=["Ügyfélkód", "Projekt neve"])
+    allowed: dict[str, set[str]] = {}
+    for kod, prj in zip(
+        pairs["Ügyfélkód"].astype(str).map(norm),
+        pairs["Projekt neve"].astype(str).map(norm),
+    ):
+        allowed.setdefault(kod, set()).add(prj)
+
+    return {
+        "active": active,
+        "active_norm": {norm(k) for k in active},
+        "name_map": name_map,
+        "lang_map": lang_map,
+        "allowed": allowed,
+        "allowed_rows": int(pairs.shape[0]),
+        "ts_codes": list(kodok["Ügyfélkód"].dropna().astype(str).unique()),
+        "ts_projects": list(kodok["Projekt neve"].dropna().astype(str).unique()),
+    }
+
+
+def load(path: str | os.PathLike = COMPLIANCE_FILE, snapshot: bool | None = None) -> dict:
+    """Az összes törzsadat-struktúra (memoizált; lásd a modul leírását).
+
+    A visszaadott struktúrák közösek — a hívó ne módosítsa őket.
+    """
+    p = Path(path).resolve()
+    fp = fingerprint(p)
+    hit = _MEMO.get(str(p))
+    if hit and hit[0] == fp:
+        return hit[1]
+
+    use_snapshot = USE_SNAPSHOT if snapshot is None else snapshot
+    data = _read_snapshot(p, fp) if use_snapshot else None
+    if data is None:
+        logging.info(f"Törzsadatok beolvasása: {p.name}")
+        data = _parse(p)
+        if use_snapshot:
+            _write_snapshot(p, fp, data)
+    _MEMO[str(p)] = (fp, data)
+    return data
+
+
+def active_clients(path: str | os.PathLike = COMPLIANCE_FILE) -> set[str]:
+    return load(path)["active"]
+
+
+def active_clients_norm(path: str | os.PathLike = COMPLIANCE_FILE) -> set[str]:
+    return load(path)["active_norm"]
+
+
+def client_name_map(path: str | os.PathLike = COMPLIANCE_FILE) -> dict[str, str]:
+    return load(path)["name_map"]
+
+
+def client_lang_map(path: str | os.PathLike = COMPLIANCE_FILE) -> dict[str, str]:
+    return load(path)["lang_map"]
+
+
+def allowed_pairs(path: str | os.PathLike = COMPLIANCE_FILE) -> dict[str, set[str]]:
+    return load(path)["allowed"]
+
+
+def ts_codes(path: str | os.PathLike = COMPLIANCE_FILE) -> list[str]:
+    return load(path)["ts_codes"]
+
+
+def ts_projects(path: str | os.PathLike = COMPLIANCE_FILE) -> list[str]:
+    return load(path)["ts_projects"]
+
+
+__all__ = [
+    "COMPLIANCE_FILE",
+    "CEGADATOK_SHEET",
+    "TS_KODOK_SHEET",
+    "norm",
+    "fingerprint",
+    "load",
+    "active_clients",
+    "active_clients_norm",
+    "client_name_map",
+    "client_lang_map",
+    "allowed_pairs",
+    "ts_codes",
+    "ts_projects",
+]
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Havi zárás függőségi gráfként: legördülők → beolvasás → {összesítés,
+párellenőrzés, számlamelléklet}.
+
+A korábbi GUI-folyamat a négy szkriptet szigorúan egymás után futtatta, és
+mindegyik újra beolvasta az összes TS fájlt; a számlamelléklet ráadásul "a
+legutóbbi timesheet_summary_*.xlsx"-ből dolgozott, ami más hónapé is lehetett.
+Itt:
+
+- a TS fájlokat egyetlen "ingest" lépés olvassa be (ts_facts.update — csak az
+  új/módosult fájlokat), a legördülő-frissítés után, hiszen az írja a TS-eket;
+- az összesítés és a párellenőrzés párhuzamos al-folyamatban fut, TS_FACTS=1
+  mellett: a már friss ténytáblát töltik be, TS fájlt nem olvasnak;
+- a számlamelléklet ebben a folyamatban, az ingest memóriában lévő
+  ténytáblájából készül (nincs summary fájl keresés).
+
+Egy hibás lépés csak a tőle függő lépéseket hagyja ki; a független lépések
+lefutnak. A lépések állapota "step" haladás-esemény (progress.py, TS_PROGRESS=1),
+a GUI ebből rajzolja a lépésenkénti állapotot:
+
+    @@ts-progress {"event": "step", "name": "summary", "state": "running"}
+    @@ts-progress {"event": "step", "name": "summary", "state": "done", "output": "timesheet_summary_….xlsx"}
+
+Állapotok: pending, running, done, failed, skipped. A lépések kimeneti fájlját
+az al-folyamatok "output" eseményéből vesszük.
+
+"Teljes év" esetén az összesítés és a párellenőrzés a saját éves argumentumát
+kapja (változatlanul továbbadva), a számlamelléklet pedig kimarad (skipped):
+az csak egy hónapra értelmezett.
+
+Usage:
+    python month_close.py januar               # alap ügyfélkód-lista
+    python month_close.py januar AXM KRT MES   # csak ezekre készül melléklet
+    python month_close.py "Teljes év"          # éves összesítés + ellenőrzés
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+import progress
+import ts_facts
+from ts_constants import HONAPOK, remove_accents
+
+# --- Konfiguráció ---
+FOLDER_PATH = "."
+LOG_DIR = Path("logs")
+
+STATE_PENDING = "pending"
+STATE_RUNNING = "running"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+STATE_SKIPPED = "skipped"
+
+YEAR_ARG = "teljes ev"  # a GUI "Teljes év" opciója, ékezetmentesítve
+
+
+class StepSkipped(Exception):
+    """A lépés ebben a futásban nem értelmezett (nem hiba): "skipped" állapot."""
+
+
+def setup_logging() -> Path:
+    LOG_DIR.mkdir(exist_ok=True)
+    log_file = LOG_DIR / f"month_close_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[
+            logging.FileHandler(log_file, encoding="utf-8"),
+            logging.StreamHandler(sys.stdout),
+        ],
+    )
+    return log_file
+
+
+def emit_state(name: str, state: str, output: str | None = None):
+    progress.step(name, state, output)
+
+
+# -------------------------
+# Gráf futtatás
+# -------------------------
+def step(name: str, title: str, run, deps=()) -> dict:
+    """Egy lépés: run(ctx) → kimeneti fájl (vagy None); kivétel = hiba."""
+    return {"name": name, "title": title, "run": run, "deps": tuple(deps)}
+
+
+def run_graph(steps: list[dict], ctx: dict, on_state=emit_state, max_workers: int = 4) -> dict:
+    """A lépések futtatása függőségi sorrendben, a független lépések párhuzamosan.
+
+    Visszaadja {név: {"state", "output", "seconds"}}. Hibás vagy kihagyott
+    (StepSkipped) lépés után a tőle (közvetve is) függő lépések is "skipped"
+    állapotba kerülnek.
+    """
+    by_name = {s["name"]: s for s in steps}
+    for s in steps:
+        missing = [d for d in s["deps"] if d not in by_name]
+        if missing:
+            raise ValueError(f"Ismeretlen függőség ({s['name']}): {', '.join(missing)}")
+
+    results = {s["name"]: {"state": STATE_PENDING, "output": None, "seconds": 0.0} for s in steps}
+    for s in steps:
+        on_state(s["name"], STATE_PENDING)
+
+    def run_one(s):
+        t0 = time.perf_counter()
+        try:
+            return s["run"](ctx), None, time.perf_counter() - t0
+        except StepSkipped as e:
+            logging.info(f"⏭ Kihagyva: {s['title']}: {e}")
+            return None, e, time.perf_counter() - t0
+        except Exception as e:
+            logging.exception(f"❌ Hiba: {s['title']}: {e}")
+            return None, e, time.perf_counter() - t0
+
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        while True:
+            for s in steps:
+                r = results[s["name"]]
+                if r["state"] != STATE_PENDING:
+                    continue
+                dep_states = [results[d]["state"] for d in s["deps"]]
+                if any(st in (STATE_FAILED, STATE_SKIPPED) for st in dep_states):
+                    r["state"] = STATE_SKIPPED
+                    logging.warning(f"⚠️ Kihagyva (függőség hibás): {s['title']}")
+                    on_state(s["name"], STATE_SKIPPED)
+                elif all(st == STATE_DONE for st in dep_states):
+                    r["state"] = STATE_RUNNING
+                    logging.info(f"▶ {s['title']}…")
+                    on_state(s["name"], STATE_RUNNING)
+                    running[ex.submit(run_one, s)] = s
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                s = running.pop(fut)
+                output, err, secs = fut.result()
+                r = results[s["name"]]
+                r["seconds"] = secs
+                if err is None:
+                    r["state"], r["output"] = STATE_DONE, output
+                    logging.info(f"✔ {s['title']} ({secs:.1f} s)")
+                elif isinstance(err, StepSkipped):
+                    r["state"] = STATE_SKIPPED
+                else:
+                    r["state"] = STATE_FAILED
+                on_state(s["name"], r["state"], r["output"])
+    return results
+
+
+# -------------------------
+# Lépések
+# -------------------------
+def run_script(argv: list[str], env: dict | None = None, capture: bool = True) -> str | None:
+    """Szkript al-folyamatban a TS mappában; a sorai a kimenetre mennek.
+
+    Visszaadja a szkript "output" eseményének fájlját; rc != 0 → hiba. A
+    gyerek eseménysorai csak akkor mennek tovább, ha nálunk is be van
+    kapcsolva a protokoll.
+    """
+    forward_events = progress.enabled()
+    proc = subprocess.Popen(
+        [sys.executable, *argv],
+        cwd=FOLDER_PATH,
+        env={**os.environ, **(env or {}), progress.ENV_FLAG: "1"},
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    output = None
+    for line in proc.stdout:
+        ev = progress.parse(line)
+        if ev is None or forward_events:
+            progress.write_line(line)
+        if capture and ev and ev["event"] == "output":
+            output = ev.get("path")
+    rc = proc.wait()
+    if rc != 0:
+        raise RuntimeError(f"{argv[0]} rc={rc}")
+    return output
+
+
+def step_dropdowns(ctx: dict):
+    run_script(["update_dropdowns.py"], capture=False)
+
+
+def step_ingest(ctx: dict):
+    # egyetlen beolvasás: csak az új/módosult TS fájlok lapjai
+    ctx["store"] = ts_facts.update(FOLDER_PATH)
+    logging.info(f"Ténytábla kész: {len(ctx['store']['facts'])} sor")
+
+
+def step_summary(ctx: dict):
+    # a nyers hónap-argumentum: "Teljes év"-et a szkript maga ismeri fel
+    return run_script(["timesheet_summary.py", ctx["month_arg"], "--facts"], {ts_facts.ENV_FLAG: "1"})
+
+
+def step_validate(ctx: dict):
+    return run_script(["validate_pairs.py", ctx["month_arg"]], {ts_facts.ENV_FLAG: "1"})
+
+
+def step_invoice(ctx: dict):
+    if ctx["month"] == YEAR_ARG:
+        raise StepSkipped("a számlamelléklet csak egy hónapra készül")
+
+    # késleltetett import: a modul betöltéskor naplót állít be
+    from generate_szamlamelleklet import generate_szamlamelleklet
+
+    return generate_szamlamelleklet(
+        ctx["month"], ordered_codes=ctx["codes"], facts=ctx["store"]["facts"]
+    )
+
+
+def build_steps() -> list[dict]:
+    return [
+        step("dropdowns", "Legördülők frissítése", step_dropdowns),
+        step("ingest", "TS fájlok beolvasása (ténytábla)", step_ingest, ["dropdowns"]),
+        step("summary", "Összesített idők", step_summary, ["ingest"]),
+        step("validate", "Ügyfélkód–Projekt párellenőrzés", step_validate, ["ingest"]),
+        step("invoice", "Számlamelléklet", step_invoice, ["ingest"]),
+    ]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Havi zárás (függőségi gráf)")
+    parser.add_argument("month", nargs="?", default=None, help="Hónap (pl. januar)")
+    parser.add_argument("codes", nargs="*", help="Ügyfélkódok a számlamelléklethez (alap: a szkript listája)")
+    parser.add_argument("--workers", type=int, default=4, help="Egyszerre futó lépések száma")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    log_file = setup_logging()
+    logging.info("▶ month_close started")
+    logging.info(f"Log file: {log_file.resolve()}")
+    args = parse_args(argv)
+
+    month_arg = args.month or HONAPOK[datetime.now().month - 1]
+    month = remove_accents(month_arg.lower()).strip()
+    ctx = {"month": month, "month_arg": month_arg, "codes": args.codes or None}
+    logging.info(f"Hónap: {month}")
+
+    t0 = time.perf_counter()
+    results = run_graph(build_steps(), ctx, max_workers=max(1, args.workers))
+    # a szándékos kihagyás (StepSkipped) nem hiba; a függőség miatti kihagyást
+    # a kiváltó hibás lépés már jelzi
+    failed = [n for n, r in results.items() if r["state"] == STATE_FAILED]
+    done = sum(r["state"] == STATE_DONE for r in results.values())
+    logging.info(
+        f"Havi zárás vége: {done}/{len(results)} lépés kész, "
+        f"{time.perf_counter() - t0:.1f} s"
+    )
+    return 1 if failed else 0
+
+
+__all__ = ["build_steps", "run_graph", "step"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Gépi feldolgozásra szánt haladás-események a szkriptek és a GUI között.
+
+A GUI eddig a szkriptek naplósoraiból reguláris kifejezésekkel találgatta a
+haladást ("Feldolgozás: …xlsx") és a kimeneti fájlt ("Kész …xlsx"), ennek
+hiányában pedig a futás óta módosult fájlokat kereste. Bekapcsolt protokoll
+mellett a szkriptek a naplósoraik mellé egy-egy JSON eseménysort is írnak a
+stdout-ra, egy jelölő előtaggal:
+
+    @@ts-progress {"event": "start", "script": "validate_pairs", "total": 5}
+    @@ts-progress {"event": "file", "file": "TS GP.xlsx", "status": "started"}
+    @@ts-progress {"event": "sheet", "file": "TS GP.xlsx", "sheet": "januar"}
+    @@ts-progress {"event": "file", "file": "TS GP.xlsx", "status": "finished", "rows": 12}
+    @@ts-progress {"event": "output", "path": "invalid_parok_januar_20250101_1200.xlsx"}
+    @@ts-progress {"event": "error", "message": "...", "file": "TS GP.xlsx"}
+    @@ts-progress {"event": "summary", "processed": 5, "skipped": 0, "errors": 0, "seconds": 1.2}
+    @@ts-progress {"event": "step", "name": "summary", "state": "done", "output": "..."}
+    @@ts-progress {"event": "process", "pid": 4242}
+
+A "process" esemény egy külső, nem gyerek folyamatot jelent (pl. a COM által
+indított EXCEL.EXE), amit a GUI megszakításkor a szkripttel együtt leállít.
+
+A "file" esemény status mezője: started, finished, skipped, failed — a
+finished / skipped / failed lépteti a haladást, a "start" total-ja a
+maximumot adja.
+
+Bekapcsolás: TS_PROGRESS=1 környezeti változó (a GUI így futtatja a
+szkripteket); nélküle a kimenet változatlan.
+
+Usage:
+    import progress
+    progress.start("validate_pairs", total=len(files))
+    progress.file_started(fname); ...; progress.file_finished(fname, rows=n)
+    progress.output(out_name)
+
+    ev = progress.parse(line)   # GUI oldalon: dict vagy None
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+
+# --- Konfiguráció ---
+ENV_FLAG = "TS_PROGRESS"
+MARKER = "@@ts-progress "
+
+FILE_STARTED = "started"
+FILE_FINISHED = "finished"
+FILE_SKIPPED = "skipped"
+FILE_FAILED = "failed"
+FILE_DONE_STATES = (FILE_FINISHED, FILE_SKIPPED, FILE_FAILED)
+
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    """Be van-e kapcsolva a protokoll (TS_PROGRESS=1)."""
+    return os.environ.get(ENV_FLAG, "").strip().lower() in ("1", "true", "yes", "igen")
+
+
+def write_line(line: str):
+    """Egy teljes sor a stdout-ra; több szálból is, sorok keveredése nélkül."""
+    with _lock:
+        sys.stdout.write(line.rstrip("\n") + "\n")
+        sys.stdout.flush()
+
+
+def emit(event: str, **data):
+    """Egy eseménysor a stdout-ra (ha a protokoll be van kapcsolva)."""
+    if not enabled():
+        return
+    payload = {"event": event, **{k: v for k, v in data.items() if v is not None}}
+    write_line(MARKER + json.dumps(payload, ensure_ascii=False, default=str))
+
+
+def start(script: str, total: int | None = None):
+    emit("start", script=script, total=total)
+
+
+def file_started(file: str):
+    emit("file", file=os.path.basename(str(file)), status=FILE_STARTED)
+
+
+def file_finished(file: str, rows: int | None = None):
+    emit("file", file=os.path.basename(str(file)), status=FILE_FINISHED, rows=rows)
+
+
+def file_skipped(file: str, reason: str | None = None):
+    emit("file", file=os.path.basename(str(file)), status=FILE_SKIPPED, reason=reason)
+
+
+def file_failed(file: str, message: str | None = None):
+    emit("file", file=os.path.basename(str(file)), status=FILE_FAILED, message=message)
+
+
+def sheet(file: str, sheet_name: str, rows: int | None = None):
+    emit("sheet", file=os.path.basename(str(file)), sheet=sheet_name, rows=rows)
+
+
+def output(path):
+    emit("output", path=str(path))
+
+
+def error(message: str, file: str | None = None):
+    emit("error", message=message, file=os.path.basename(str(file)) if file else None)
+
+
+def summary(**counts):
+    emit("summary", **counts)
+
+
+def step(name: str, state: str, output: str | None = None):
+    emit("step", name=name, state=state, output=output)
+
+
+def process(pid: int):
+    emit("process", pid=int(pid))
+
+
+def parse(line: str) -> dict | None:
+    """Egy kimeneti sorból az esemény (dict), vagy None, ha nem eseménysor."""
+    text = line.strip()
+    if not text.startswith(MARKER.strip()):
+        return None
+    try:
+        ev = json.loads(text[len(MARKER.strip()) :])
+    except ValueError:
+        return None
+    return ev if isinstance(ev, dict) and "event" in ev else None
+
+
+__all__ = [
+    "ENV_FLAG",
+    "MARKER",
+    "FILE_DONE_STATES",
+    "enabled",
+    "write_line",
+    "emit",
+    "start",
+    "file_started",
+    "file_finished",
+    "file_skipped",
+    "file_failed",
+    "sheet",
+    "output",
+    "error",
+    "summary",
+    "step",
+    "process",
+    "parse",
+]
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Write-only (streamelő) Excel kimenet a timesheet_summary és a validate_pairs
+riportjaihoz.
+
+A normál openpyxl Workbook minden cellát objektumként tart memóriában, az
+autosize pedig mentés előtt minden cellát újra bejár. Itt a lap csak egy
+"terv": néhány egyedi cella (banner, címkék, táblafejlécek — stílussal), a
+táblázatok adatai pedig a DataFrame oszloptömbjeiként; a mentés write_only
+munkafüzetbe soronként streameli őket. Az oszlopszélességek a tömbökből,
+vektorizáltan számolódnak, még a sorok kiírása előtt (write_only-nál a
+<cols> a sorok előtt kerül a fájlba).
+
+Megmarad: egyesített banner cellák, Excel Table objektumok, fejléc kitöltés,
+feltételes formázás. A cellák elrendezése (spacer sor, fejléc, adatsorok)
+megegyezik a korábbi ws.append alapú write_table-ével.
+
+Usage:
+    from report_writer import StreamingReport
+    rep = StreamingReport()
+    ws = rep.create_sheet("Összesítés")
+    ws.set(1, 1, "Cím", font=Font(bold=True))
+    ws.write_table(4, df, "Osszesites", header_style={...})
+    ws.autosize(min_row=4)
+    rep.save("out.xlsx")
+"""
+from __future__ import annotations
+
+import os
+import warnings
+from typing import Any
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter, range_boundaries
+from openpyxl.worksheet.table import Table, TableStyleInfo
+
+from width_plan import WidthPlan
+
+
+class StreamingSheet:
+    """Egy munkalap terve: egyedi cellák + DataFrame adatblokkok.
+
+    A sor/oszlop számozás 1-alapú, mint az openpyxl-ben; a max_row /
+    max_column ugyanúgy nő, mint egy normál munkalapon, így a
+    "ws.max_row + 2" típusú elrendezés változatlanul használható.
+    """
+
+    def __init__(self, title: str):
+        self.title = title
+        self._cells: dict[int, dict[int, tuple[Any, dict]]] = {}
+        self._blocks: list[dict] = []  # {"first", "last", "cols": [ndarray, ...]}
+        self._tables: list[tuple[str, str, str, list[str]]] = []
+        self._merged: list[str] = []
+        self._conditional: list[tuple[str, Any]] = []
+        self._widths: dict[int, float] = {}
+        self.max_row = 0
+        self.max_column = 0
+
+    # --- cellák ---
+    def set(self, row: int, col: int, value, **style):
+        """Egy cella értéke (+ opcionális font / fill / alignment / border)."""
+        self._cells.setdefault(row, {})[col] = (value, style)
+        self.max_row = max(self.max_row, row)
+        self.max_column = max(self.max_column, col)
+
+    def value(self, row: int, col: int):
+        return self._cells.get(row, {}).get(col, (None, None))[0]
+
+    def append(self, values: list):
+        """Sor a lap végére (mint a Worksheet.append)."""
+        row = self.max_row + 1
+        for j, v in enumerate(values, start=1):
+            self.set(row, j, v)
+        self.max_row = row
+
+    def merge(self, ref: str):
+        # mint a normál lapon: az egyesített tartomány is beleszámít a méretbe
+        min_col, min_row, max_col, max_row = range_boundaries(ref)
+        self._merged.append(ref)
+        self.max_row = max(self.max_row, max_row)
+        self.max_column = max(self.max_column, max_col)
+
+    def add_conditional(self, ref: str, rule):
+        self._conditional.append((ref, rule))
+
+    # --- táblázat ---
+    def write_table(
+        self,
+        start_row: int,
+        df: pd.DataFrame,
+        table_name: str,
+        table_style: str = "TableStyleMedium9",
+        header_style: dict | None = None,
+        spacer: bool = True,
+    ):
+        """Szűrhető Excel-táblázat: spacer sor (a lap végére), fejléc a start_row
+        sorban, alatta az adatsorok közvetlenül a DataFrame oszlopaiból."""
+        headers = [str(h) for h in df.columns]
+        if spacer:
+            self.append([""] * len(headers))
+        for j, h in enumerate(headers, start=1):
+            self.set(start_row, j, h, **(header_style or {}))
+
+        first = self.max_row + 1
+        n = len(df.index)
+        if n:
+            self._blocks.append(
+                {
+                    "first": first,
+                    "last": first + n - 1,
+                    "cols": [df.iloc[:, j].to_numpy() for j in range(len(headers))],
+                }
+            )
+            self.max_row = first + n - 1
+            self.max_column = max(self.max_column, len(headers))
+
+        ref = f"A{start_row}:{get_column_letter(len(headers))}{self.max_row}"
+        self._tables.append((table_name, ref, table_style, headers))
+
+    def find_header(self, header_row: int, name: str) -> int | None:
+        """Az oszlop indexe a fejlécsorban (kisbetűs, szóköz-tűrő egyezés)."""
+        for col, (v, _) in sorted(self._cells.get(header_row, {}).items()):
+            if (str(v or "")).strip().lower() == name.lower():
+                return col
+        return None
+
+    # --- szélességek ---
+    def autosize(self, min_row: int = 1, min_col: int = 1, max_col: int | None = None, cap: int = 60):
+        """Oszlopszélesség = leghosszabb érték (str) + 2, legfeljebb cap; a min_row
+        feletti sorok (pl. banner) nem számítanak. Közös tervező (width_plan),
+        az adatblokkokon vektorizált."""
+        plan = WidthPlan()
+        for row, cells in self._cells.items():
+            if row >= min_row:
+                for col, (v, _) in cells.items():
+                    plan.add(col, v)
+        for block in self._blocks:
+            if block["last"] < min_row:
+                continue
+            skip = max(0, min_row - block["first"])
+            for j, arr in enumerate(block["cols"], start=1):
+                plan.add(j, arr[skip:])
+        max_col = self.max_column if max_col is None else max_col
+        self._widths.update(plan.widths(min_col=min_col, max_col=max_col, cap=cap))
+
+    # --- kiírás ---
+    def _rows(self, ws):
+        block_at = {b["first"]: b for b in self._blocks}
+        row = 1
+        while row <= self.max_row:
+            block = block_at.get(row)
+            if block is not None:
+                yield from zip(*block["cols"])
+                row = block["last"] + 1
+                continue
+            cells = self._cells.get(row)
+            if not cells:
+                yield ()
+            else:
+                out = [None] * max(cells)
+                for col, (v, style) in cells.items():
+                    if style:
+                        c = WriteOnlyCell(ws, value=v)
+                        for attr, s in style.items():
+                            setattr(c, attr, s)
+                        out[col - 1] = c
+                    else:
+                        out[col - 1] = v
+                yield out
+            row += 1
+
+    def _write(self, wb: Workbook):
+        ws = wb.create_sheet(self.title)
+        # write_only: a szélességek és a tail elemek a sorok előtt beállítandók
+        for col, w in self._widths.items():
+            ws.column_dimensions[get_column_letter(col)].width = w
+        for ref in self._merged:
+            ws.merged_cells.add(ref)
+        for ref, rule in self._conditional:
+            ws.conditional_formatting.add(ref, rule)
+        for name, ref, style, headers in self._tables:
+            table = Table(displayName=name, ref=ref)
+            table.tableStyleInfo = TableStyleInfo(
+                name=style, showRowStripes=True, showColumnStripes=False
+            )
+            table._initialise_columns()
+            for col, h in zip(table.tableColumns, headers):
+                col.name = h
+            with warnings.catch_warnings():
+                # az oszlopneveket fent kézzel adtuk meg, a write-only figyelmeztetés felesleges
+                warnings.simplefilter("ignore", UserWarning)
+                ws.add_table(table)
+        for values in self._rows(ws):
+            ws.append(list(values))
+
+
+class StreamingReport:
+    """Munkalap-tervek gyűjteménye; a save() write_only munkafüzetbe ír."""
+
+    def __init__(self):
+        self.sheets: list[StreamingSheet] = []
+
+    def create_sheet(self, title: str) -> StreamingSheet:
+        sheet = StreamingSheet(title)
+        self.sheets.append(sheet)
+        return sheet
+
+    def save(self, path: str | os.PathLike):
+        wb = Workbook(write_only=True)
+        for sheet in self.sheets:
+            sheet._write(wb)
+        wb.save(path)
+
+
+__all__ = ["StreamingReport", "StreamingSheet"]
@@ -4,11 +4,24 @@ TS reset tool
 - Minden TS *.xlsx fájlt archivál, majd ugyanazzal a névvel "üres" példányt hoz létre,
   megőrizve a formátumot és az érvényesítéseket.
 - A hónap-lapokon A2..X301 tartományt ürít (Y/Z segédoszlopok, validációk megmaradnak).
+- Alapból zip-szinten, openpyxl betöltés/mentés nélkül (ts_zip_reset): csak a
+  hónap-lapok XML-je íródik újra, a stílusok, validációk, Y/Z oszlopok bájtra
+  azonosak; a fájlok folyamatkészletben párhuzamosan készülnek. A korábbi
+  openpyxl út --engine openpyxl kapcsolóval (és tartalékként) elérhető.
 
 Usage:
     python reset_timesheets.py
     python reset_timesheets.py --dry-run
     python reset_timesheets.py --folder . --max-rows 300 --clear-until-col X
+    python reset_timesheets.py --engine openpyxl --workers 1
+    python reset_timesheets.py --archive-backend store
+
+Archív (--archive-backend, a GUI-ból a reset_archive_backend beállítás):
+  folder (alap): archived_ts_YYYYMMDD_HHMMSS mappa, a fájlok áthelyezve.
+  store:         tartalom-címzett, tömörített tár (.ts_archive, ts_archive
+                 modul), resetenként egy manifest; a változatlan munkafüzet
+                 nem tárolódik újra. Visszaállítás:
+                 python ts_archive.py restore <esemény> --to <mappa>
 """
 from __future__ import annotations
 
@@ -17,6 +30,9 @@ import logging
 import os
 import shutil
 import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
 import unicodedata
@@ -24,10 +40,16 @@ import unicodedata
 from openpyxl import load_workbook
 from openpyxl.utils import column_index_from_string
 
+import progress
+import ts_archive
+from ts_zip_reset import ZipResetError, reset_workbook
+
 # --- Konfiguráció (alapértékek) ---
 DEFAULT_FOLDER = "."
 DEFAULT_MAX_ROWS = 300  # projekt konvenció (scripts is 300 sorral dolgoznak)
 DEFAULT_CLEAR_UNTIL_COL = "X"  # Y/Z segédoszlopok meghagyása (drop-down források)
+ENGINES = ("zip", "openpyxl")
+ARCHIVE_BACKENDS = ("folder", "store")
 
 # Magyar hónapok (ékezet nélkül) – a projekttel konzisztensen
 HONAPOK = [
@@ -88,6 +110,57 @@ def create_blank_from_archived(
     wb.save(new_path)
 
 
+def reset_one(
+    archived_path: Path, new_path: Path, max_rows: int, clear_until_col_letter: str, engine: str
+) -> dict:
+    """Egy üres példány létrehozása (worker folyamatban is futhat).
+
+    A naplósorokat visszaadja ((szint, üzenet) párok) — a fő folyamat írja ki.
+    """
+    res = {"file": new_path.name, "ok": False, "log": []}
+    log = res["log"]
+    try:
+        if engine == "zip":
+            try:
+                n = reset_workbook(archived_path, new_path, max_rows, clear_until_col_letter)
+                log.append((logging.INFO, f"   ✔ Új üres fájl létrehozva: {new_path.name} ({n} hónap lap, zip)"))
+                res["ok"] = True
+                return res
+            except ZipResetError as e:
+                log.append((logging.WARNING, f"   ⚠️ Zip ürítés nem lehetséges ({e}), openpyxl-lel: {new_path.name}"))
+        create_blank_from_archived(archived_path, new_path, max_rows, clear_until_col_letter)
+        log.append((logging.INFO, f"   ✔ Új üres fájl létrehozva: {new_path.name}"))
+        res["ok"] = True
+    except Exception as e:
+        log.append((logging.ERROR, f"❌ Hiba: {new_path.name} — {e}\n{traceback.format_exc()}"))
+    return res
+
+
+def iter_resets(jobs: list[tuple[Path, Path]], max_rows: int, clear_until_col: str, engine: str, workers: int):
+    """Eredmények a jobs sorrendjében (párhuzamosan, ha workers > 1)."""
+    workers = max(1, min(workers, len(jobs)))
+    if workers == 1:
+        for arch, new in jobs:
+            yield reset_one(arch, new, max_rows, clear_until_col, engine)
+        return
+
+    done = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futures = [
+                ex.submit(reset_one, arch, new, max_rows, clear_until_col, engine)
+                for arch, new in jobs
+            ]
+            for fut in futures:
+                res = fut.result()
+                done += 1
+                yield res
+    except (BrokenProcessPool, OSError) as e:
+        logging.warning(f"⚠️ Párhuzamos feldolgozás megszakadt ({e}), folytatás sorosan")
+        for arch, new in jobs[done:]:
+            yield reset_one(arch, new, max_rows, clear_until_col, engine)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Reset TS workbooks safely.")
     parser.add_argument(
@@ -110,6 +183,24 @@ def main():
     parser.add_argument(
         "--dry-run", action="store_true", help="Csak listáz, nem módosít"
     )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="zip",
+        help="zip (alap: csak a hónap-lapok XML-je íródik újra) vagy openpyxl (teljes betöltés/mentés)",
+    )
+    parser.add_argument(
+        "--archive-backend",
+        choices=ARCHIVE_BACKENDS,
+        default="folder",
+        help="folder: archived_ts_* mappa (alap); store: tömörített, tartalom-címzett tár (.ts_archive)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Párhuzamos folyamatok száma (1 = soros)",
+    )
     args = parser.parse_args()
 
     folder = Path(args.folder).resolve()
@@ -134,11 +225,16 @@ def main():
     logging.info(f"Folder: {folder}")
     logging.info(f"Log file: {log_file}")
 
+    ts_files = [p for p in folder.iterdir() if p.is_file() and is_ts_file(p.name)]
+    store = args.archive_backend == "store"
+
     # Cél archív mappa
-    archive_dir = make_archive_dir(folder)
-    logging.info(f"Archive dir: {archive_dir}")
+    if store:
+        logging.info(f"Archive store: {folder / ts_archive.ARCHIVE_DIR}")
+    else:
+        archive_dir = make_archive_dir(folder)
+        logging.info(f"Archive dir: {archive_dir}")
 
-    ts_files = [p for p in folder.iterdir() if p.is_file() and is_ts_file(p.name)]
     if not ts_files:
         logging.info("Nincs feldolgozható TS fájl.")
         return
@@ -146,6 +242,35 @@ def main():
     moved = 0
     created = 0
     errors = 0
+    progress.start("reset_timesheets", total=len(ts_files))
+
+    jobs: list[tuple[Path, Path]] = []
+    if store:
+        # 1) Egy reset esemény a tárban (hiba esetén semmit nem ürítünk)
+        if args.dry_run:
+            for src in ts_files:
+                logging.info(f"🔧 Feldolgozás: {src.name}")
+                logging.info("   ↪ DRY-RUN: archive -> store")
+                logging.info(f"   ↪ DRY-RUN: recreate blank -> {src.name}")
+                progress.file_finished(src.name)
+            moved = created = len(ts_files)
+        else:
+            try:
+                event, manifest = ts_archive.archive_files(folder, ts_files)
+            except Exception as e:
+                logging.exception(f"❌ Archiválás sikertelen, a reset elmarad: {e}")
+                progress.error(f"Archiválás sikertelen, a reset elmarad: {e}")
+                errors += 1
+                ts_files = []
+            else:
+                moved = len(ts_files)
+                logging.info(
+                    f"   ✔ Archiválva: {event} esemény — {manifest['new_objects']} új, "
+                    f"{manifest['reused_objects']} változatlan munkafüzet"
+                )
+                # 2) az üres példány helyben, az eredeti fájlból készül
+                jobs = [(src, src) for src in ts_files]
+        ts_files = []
 
     for src in ts_files:
         try:
@@ -157,27 +282,39 @@ def main():
                 logging.info(f"   ↪ DRY-RUN: recreate blank -> {src.name}")
                 moved += 1
                 created += 1
+                progress.file_finished(src.name)
                 continue
 
             # 1) Átmozgatás archívba
             shutil.move(str(src), str(dst_arch))
             moved += 1
             logging.info(f"   ✔ Áthelyezve: {dst_arch}")
-
-            # 2) Üres példány létrehozása (azonos szerkezet/validációk)
-            create_blank_from_archived(dst_arch, src, max_rows, clear_until_col)
-            created += 1
-            logging.info(f"   ✔ Új üres fájl létrehozva: {src.name}")
+            jobs.append((dst_arch, src))
 
         except Exception as e:
             errors += 1
             logging.exception(f"❌ Hiba: {src.name} — {e}")
+            progress.file_failed(src.name, str(e))
+
+    # 2) Üres példányok létrehozása (azonos szerkezet/validációk), párhuzamosan
+    if jobs:
+        logging.info(f"Üres példányok: {len(jobs)} fájl, motor: {args.engine}, {args.workers} worker")
+    for res in iter_resets(jobs, max_rows, clear_until_col, args.engine, args.workers):
+        for level, msg in res["log"]:
+            logging.log(level, msg)
+        if res["ok"]:
+            created += 1
+            progress.file_finished(res["file"])
+        else:
+            errors += 1
+            progress.file_failed(res["file"])
 
     logging.info("📊 Összegzés:")
-    logging.info(f"   ➜ Áthelyezett fájlok: {moved}")
+    logging.info(f"   ➜ {'Archivált' if store else 'Áthelyezett'} fájlok: {moved}")
     logging.info(f"   ➜ Létrehozott üres fájlok: {created}")
     logging.info(f"   ➜ Hibák: {errors}")
     logging.info("✅ reset_timesheets finished")
+    progress.summary(processed=created, archived=moved, errors=errors)
 
 
 if __name__ == "__main__":
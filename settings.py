@@ -22,12 +22,17 @@ DEFAULT_SETTINGS = {
     "output_folder": "",  # üres => TS mappa
     "backup_enabled": False,
     "backup_folder": "",
+    "reset_archive_backend": "folder",  # folder | store (.ts_archive, tartalom-címzett)
     "default_client_codes": "",  # "ABC123,XYZ987"
     "remember_last_selection": True,
     "auto_open_output_on_success": False,
     "auto_open_details_on_error": True,
     "popup_autoclose_sec": 0,  # 0 => nem zárja automatikusan
     "sound_enabled": True,
+    "warm_worker_enabled": True,  # szkriptek futtatása a meleg worker folyamatban
+    "dropdown_engine": "xlwings",  # xlwings (Excel) | openpyxl (Excel nélkül, lásd update_dropdowns.py)
+    "job_timeout_min": 30,  # futó feladat időkorlátja (0 => nincs)
+    "max_parallel_readers": 2,  # egyszerre olvasó feladatok a TS mappán
     # Napi emlékeztető
     "daily_reminder_enabled": False,
     "daily_reminder_time": "18:00",  # HH:MM
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Könnyű lapnév-index a TS munkafüzetekhez.
+
+A lapneveket közvetlenül az xlsx zip xl/workbook.xml bejegyzéséből olvassuk
+(se openpyxl, se pandas, a lapokhoz hozzá sem nyúlunk), és mappánként egy
+JSON indexben tartjuk: fájlnév → (méret, mtime, lapnevek, normalizált
+lapnevek). Így a szkriptek és a GUI munkafüzet-megnyitás nélkül tudják, hogy
+egy TS fájlban van-e egyáltalán a keresett hónap lapja.
+
+Az index a TS mappa .ts_cache/sheet_index.json fájlja (a sheet-cache mellett).
+
+Usage:
+    from sheet_index import filter_month_files, has_month_sheet
+    files = filter_month_files(paths, "januar")   # None = teljes év
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import posixpath
+import xml.etree.ElementTree as ET
+import zipfile
+from pathlib import Path
+from typing import Iterable
+
+from ts_constants import HONAPOK, remove_accents
+
+# --- Konfiguráció ---
+INDEX_PATH = Path(".ts_cache") / "sheet_index.json"  # a TS mappához képest
+INDEX_VERSION = 1
+
+
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+# folyamaton belüli memo: index útvonal → (index mtime_ns, adat)
+_LOADED: dict[str, tuple[int, dict]] = {}
+
+
+def norm_sheet_name(s) -> str:
+    """Ékezet nélkül, kisbetű, környezeti szóközök nélkül (mint a szkriptekben)."""
+    return remove_accents(s or "").strip().lower()
+
+
+def _workbook_part(zf: zipfile.ZipFile) -> str:
+    """A workbook XML útvonala (szinte mindig xl/workbook.xml)."""
+    if "xl/workbook.xml" in zf.NameToInfo:
+        return "xl/workbook.xml"
+    root = ET.fromstring(zf.read("_rels/.rels"))
+    for rel in root.iter(f"{{{_PKG_REL_NS}}}Relationship"):
+        if rel.get("Type", "").endswith("/officeDocument"):
+            return posixpath.normpath(rel.get("Target", "").lstrip("/"))
+    raise KeyError("Nincs workbook rész a munkafüzetben")
+
+
+def probe_sheet_names(path: str | os.PathLike) -> list[str]:
+    """Lapnevek a zip workbook.xml-jéből, munkafüzet-betöltés nélkül."""
+    with zipfile.ZipFile(path) as zf:
+        root = ET.fromstring(zf.read(_workbook_part(zf)))
+    names = []
+    for el in root.iter():
+        # <sheets><sheet name=".." r:id=".."/></sheets> — névtértől függetlenül
+        if el.tag.rsplit("}", 1)[-1] == "sheet" and el.get("name") is not None:
+            names.append(el.get("name"))
+    return names
+
+
+def _index_file(folder: Path) -> Path:
+    return folder / INDEX_PATH
+
+
+def _load(index_file: Path) -> dict:
+    key = str(index_file)
+    try:
+        mtime = index_file.stat().st_mtime_ns
+    except OSError:
+        return {"version": INDEX_VERSION, "files": {}}
+    cached = _LOADED.get(key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        data = json.loads(index_file.read_text(encoding="utf-8"))
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError("index verzió eltér")
+    except Exception:
+        data = {"version": INDEX_VERSION, "files": {}}
+    _LOADED[key] = (mtime, data)
+    return data
+
+
+def _save(index_file: Path, data: dict) -> None:
+    index_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = index_file.with_name(f"{index_file.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, index_file)
+        _LOADED[str(index_file)] = (index_file.stat().st_mtime_ns, data)
+    except Exception as e:
+        logging.debug(f"Lapnév-index írás sikertelen ({index_file}): {e}")
+        try:
+            tmp.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def _lookup(data: dict, p: Path) -> tuple[dict, bool]:
+    """(index bejegyzés, frissült-e); a zip-et csak elavult bejegyzésnél olvassuk."""
+    st = p.stat()
+    entry = data["files"].get(p.name)
+    if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+        return entry, False
+    names = probe_sheet_names(p)
+    entry = {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sheets": names,
+        "norm": [norm_sheet_name(n) for n in names],
+    }
+    data["files"][p.name] = entry
+    return entry, True
+
+
+def sheet_names(path: str | os.PathLike) -> list[str]:
+    """A munkafüzet lapnevei (indexből, ha a fájl nem változott)."""
+    p = Path(path).resolve()
+    index_file = _index_file(p.parent)
+    data = _load(index_file)
+    entry, changed = _lookup(data, p)
+    if changed:
+        _save(index_file, data)
+    return list(entry["sheets"])
+
+
+def _matches(norm_names: Iterable[str], month_norm: str | None) -> bool:
+    if month_norm is None:  # teljes év: bármely hónap-lap
+        return any(n in HONAPOK for n in norm_names)
+    return month_norm in norm_names
+
+
+def has_month_sheet(path: str | os.PathLike, month_norm: str | None) -> bool:
+    """Van-e a fájlban a hónap lapja (month_norm=None: bármely hónap-lap).
+
+    Ha a zip nem olvasható, True — a hibát a tényleges feldolgozás jelezze.
+    """
+    try:
+        p = Path(path).resolve()
+        index_file = _index_file(p.parent)
+        data = _load(index_file)
+        entry, changed = _lookup(data, p)
+        if changed:
+            _save(index_file, data)
+    except Exception:
+        return True
+    return _matches(entry["norm"], month_norm)
+
+
+def filter_month_files(
+    paths: Iterable[str | os.PathLike], month_norm: str | None
+) -> list:
+    """Csak azok a fájlok (eredeti sorrendben/típusban), amelyekben lehet a hónap lapja.
+
+    Mappánként egyszer tölti be és legfeljebb egyszer írja vissza az indexet;
+    a már nem létező fájlok bejegyzéseit eldobja.
+    """
+    paths = list(paths)
+    by_folder: dict[Path, list[tuple[int, Path]]] = {}
+    for i, raw in enumerate(paths):
+        p = Path(raw).resolve()
+        by_folder.setdefault(p.parent, []).append((i, p))
+
+    keep: set[int] = set()
+    for folder, items in by_folder.items():
+        index_file = _index_file(folder)
+        data = _load(index_file)
+        dirty = False
+        for i, p in items:
+            try:
+                entry, changed = _lookup(data, p)
+            except Exception:
+                keep.add(i)  # nem olvasható zip: a szkript jelezze a hibát
+                continue
+            dirty |= changed
+            if _matches(entry["norm"], month_norm):
+                keep.add(i)
+        present = {name for name in data["files"] if (folder / name).exists()}
+        if present != set(data["files"]):
+            data["files"] = {k: v for k, v in data["files"].items() if k in present}
+            dirty = True
+        if dirty:
+            _save(index_file, data)
+    return [raw for i, raw in enumerate(paths) if i in keep]
+
+
+__all__ = [
+    "INDEX_PATH",
+    "norm_sheet_name",
+    "probe_sheet_names",
+    "sheet_names",
+    "has_month_sheet",
+    "filter_month_files",
+]
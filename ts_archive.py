@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Tartalom-címzett, tömörített archívum a reset_timesheets-hez.
+
+A "folder" archívum minden resetnél egy új archived_ts_YYYYMMDD_HHMMSS
+mappát hoz létre az összes munkafüzet teljes másolatával, a TS mappában. Itt
+a munkafüzetek a tartalmuk sha256 hash-e szerint, gzip-pel tömörítve egyszer
+kerülnek a tárba; egy reset esemény csak egy kis manifest (fájlnév → hash).
+Változatlan munkafüzet két reset között nem foglal újra helyet, a TS mappában
+pedig csak egy rejtett .ts_archive mappa van.
+
+Szerkezet (a TS mappához képest):
+    .ts_archive/objects/ab/abcdef….xlsx.gz   tartalom (hash szerint)
+    .ts_archive/events/<esemény>.json        manifest resetenként
+
+Usage:
+    from ts_archive import archive_files, restore_event
+    event, manifest = archive_files(folder, paths)   # event: "20250101_120000"
+    restore_event(folder, event, dest=folder / "visszaallitott")
+
+    python ts_archive.py list
+    python ts_archive.py restore 20250101_120000 --to visszaallitott
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+# --- Konfiguráció ---
+ARCHIVE_DIR = Path(".ts_archive")  # a TS mappához képest
+MANIFEST_VERSION = 1
+_CHUNK = 1 << 20
+
+
+def _root(folder) -> Path:
+    return Path(folder) / ARCHIVE_DIR
+
+
+def _object_path(folder, digest: str) -> Path:
+    return _root(folder) / "objects" / digest[:2] / f"{digest}.xlsx.gz"
+
+
+def _events_dir(folder) -> Path:
+    return _root(folder) / "events"
+
+
+def file_digest(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _store_object(folder, path: Path, digest: str) -> bool:
+    """A fájl tömörített tárolása, ha még nincs a tárban. True = új objektum."""
+    obj = _object_path(folder, digest)
+    if obj.exists():
+        return False
+    obj.parent.mkdir(parents=True, exist_ok=True)
+    tmp = obj.with_name(f"{obj.name}.{os.getpid()}.tmp")
+    try:
+        with open(path, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, _CHUNK)
+        os.replace(tmp, obj)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return True
+
+
+def _new_event_id(folder) -> str:
+    base = datetime.now().strftime("%Y%m%d_%H%M%S")
+    event, n = base, 1
+    while (_events_dir(folder) / f"{event}.json").exists():
+        n += 1
+        event = f"{base}_{n}"
+    return event
+
+
+def archive_files(folder, paths, note: str = "reset") -> tuple[str, dict]:
+    """A fájlok tárolása egy új eseményként.
+
+    Visszaadja (esemény azonosító, manifest). A manifest "new_objects" /
+    "reused_objects" mezője mutatja, mennyi tartalom volt valóban új.
+    """
+    folder = Path(folder)
+    files = []
+    new_objects = 0
+    for p in paths:
+        p = Path(p)
+        digest = file_digest(p)
+        if _store_object(folder, p, digest):
+            new_objects += 1
+        st = p.stat()
+        files.append({"name": p.name, "sha256": digest, "size": st.st_size, "mtime": st.st_mtime})
+
+    event = _new_event_id(folder)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "event": event,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "note": note,
+        "files": files,
+        "new_objects": new_objects,
+        "reused_objects": len(files) - new_objects,
+    }
+    _events_dir(folder).mkdir(parents=True, exist_ok=True)
+    target = _events_dir(folder) / f"{event}.json"
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, target)
+    return event, manifest
+
+
+def load_manifest(folder, event: str) -> dict:
+    return json.loads((_events_dir(folder) / f"{event}.json").read_text(encoding="utf-8"))
+
+
+def list_events(folder) -> list[dict]:
+    """Az események manifestjei időrendben."""
+    d = _events_dir(folder)
+    if not d.exists():
+        return []
+    out = []
+    for p in sorted(d.glob("*.json")):
+        try:
+            out.append(json.loads(p.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return out
+
+
+def restore_event(folder, event: str, dest=None, names=None, overwrite: bool = False) -> list[Path]:
+    """Egy esemény munkafüzeteinek visszaállítása dest-be (alap: a TS mappa).
+
+    names: csak ezek a fájlnevek; meglévő fájlt csak overwrite=True írja felül.
+    """
+    folder = Path(folder)
+    dest = Path(dest) if dest is not None else folder
+    dest.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(folder, event)
+    restored = []
+    for entry in manifest["files"]:
+        if names and entry["name"] not in names:
+            continue
+        target = dest / entry["name"]
+        if target.exists() and not overwrite:
+            raise FileExistsError(f"Már létezik: {target}")
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        try:
+            with gzip.open(_object_path(folder, entry["sha256"]), "rb") as src, open(tmp, "wb") as dst:
+                shutil.copyfileobj(src, dst, _CHUNK)
+            if file_digest(tmp) != entry["sha256"]:
+                raise ValueError(f"Sérült archív objektum: {entry['name']}")
+            os.replace(tmp, target)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        restored.append(target)
+    return restored
+
+
+def store_size(folder) -> int:
+    """A tárolt objektumok összmérete (bájt)."""
+    d = _root(folder) / "objects"
+    return sum(p.stat().st_size for p in d.rglob("*.xlsx.gz")) if d.exists() else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TS archívum (.ts_archive) kezelése")
+    parser.add_argument("--folder", "-f", default=".", help="TS mappa (default: .)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="Reset események listája")
+    rp = sub.add_parser("restore", help="Egy esemény munkafüzeteinek visszaállítása")
+    rp.add_argument("event")
+    rp.add_argument("--to", default=None, help="Célmappa (alap: a TS mappa)")
+    rp.add_argument("--file", action="append", default=None, help="Csak ez a fájl (többször is megadható)")
+    rp.add_argument("--overwrite", action="store_true", help="Meglévő fájlok felülírása")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "list":
+        for m in list_events(args.folder):
+            print(
+                f"{m['event']}  {m['created']}  {len(m['files'])} fájl "
+                f"({m.get('new_objects', 0)} új, {m.get('reused_objects', 0)} változatlan)"
+            )
+        print(f"Tár mérete: {store_size(args.folder) / 1024:.1f} KB")
+    else:
+        for p in restore_event(args.folder, args.event, args.to, args.file, args.overwrite):
+            print(f"✔ Visszaállítva: {p}")
+
+
+__all__ = [
+    "ARCHIVE_DIR",
+    "archive_files",
+    "list_events",
+    "load_manifest",
+    "restore_event",
+    "store_size",
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Közös, lemezre mentett cache a TS munkafüzetek beolvasott lapjaihoz.
+
+- Kulcs: (abszolút útvonal, fájlméret, mtime, lapnév) — ha a TS fájl nem
+  változott, a lapot nem olvassuk újra Excelből, bármelyik szkript kéri.
+- Cache-miss esetén a ts_reader streamelő olvasója tölti be a lapot: csak a
+  kért oszlopok (alapból Ügyfélkód, Projekt neve, Időráfordítás (óra) + a
+  leírás oszlop) kerülnek be, nyersen (dtype=object). Így a
+  timesheet_summary / validate_pairs / generate_szamlamelleklet ugyanazt a
+  bejegyzést használhatja; a további szűrés/típuskonverzió a hívó dolga.
+- A lapneveket a sheet_index adja (csak a zip workbook.xml-jét olvassa).
+- A cache a futtatási mappában (= TS mappa) lévő .ts_cache/ alatt él.
+
+Usage:
+    from ts_cache import sheet_names, read_sheet, read_sheets
+    for s in sheet_names(path):
+        df = read_sheet(path, s)
+    frames = read_sheets(path, ["januar", "februar"])  # egy megnyitással
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Sequence
+
+import pandas as pd
+
+import sheet_index
+from ts_reader import (
+    MAX_ROWS_PER_SHEET,
+    TS_COLUMNS,
+    read_month_sheet,
+    read_month_sheets,
+)
+
+# --- Konfiguráció ---
+CACHE_DIR = Path(".ts_cache") / "sheets"
+
+
+def fingerprint(path: str | os.PathLike) -> tuple[str, int, int]:
+    """(abszolút útvonal, méret, mtime_ns) — ez azonosítja a fájl egy változatát."""
+    p = Path(path).resolve()
+    st = p.stat()
+    return str(p), st.st_size, st.st_mtime_ns
+
+
+def _digest(s: str) -> str:
+    return hashlib.sha1(s.encode("utf-8")).hexdigest()[:16]
+
+
+def _entry_path(fp: tuple[str, int, int], kind: str) -> Path:
+    path_s, size, mtime = fp
+    return CACHE_DIR / f"{_digest(path_s)}_{size}_{mtime}_{_digest(kind)}"
+
+
+def _prune_stale(fp: tuple[str, int, int]) -> None:
+    """Ugyanannak a fájlnak a régi (más méret/mtime) bejegyzéseit töröljük."""
+    path_s, size, mtime = fp
+    prefix = _digest(path_s)
+    current = f"{prefix}_{size}_{mtime}_"
+    try:
+        for old in CACHE_DIR.glob(f"{prefix}_*"):
+            if not old.name.startswith(current):
+                old.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def _atomic_write(target: Path, write) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, target)
+    except Exception as e:
+        logging.debug(f"Cache írás sikertelen ({target.name}): {e}")
+        try:
+            tmp.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def _sheet_entry(
+    fp: tuple[str, int, int], sheet: str, nrows: int, columns: Sequence[str]
+) -> Path:
+    kind = "\x00".join([sheet, str(nrows), *columns])
+    return _entry_path(fp, kind).with_suffix(".pkl")
+
+
+def sheet_names(path: str | os.PathLike) -> list[str]:
+    """A munkafüzet lapnevei — a zip-szintű lapnév-indexből (sheet_index)."""
+    return sheet_index.sheet_names(path)
+
+
+def read_sheet(
+    path: str | os.PathLike,
+    sheet: str,
+    nrows: int = MAX_ROWS_PER_SHEET,
+    columns: Sequence[str] = TS_COLUMNS,
+) -> pd.DataFrame:
+    """Egy lap kért oszlopai (+ leírás oszlop) nyersen; módosítható másolatot ad vissza.
+
+    A hiányzó oszlopok egyszerűen kimaradnak — a kötelező oszlopok ellenőrzése
+    a hívó feladata.
+    """
+    fp = fingerprint(path)
+    entry = _sheet_entry(fp, sheet, nrows, columns)
+    if entry.exists():
+        try:
+            return pd.read_pickle(entry)
+        except Exception:
+            pass
+
+    df = read_month_sheet(path, sheet, columns=columns, nrows=nrows)
+    _prune_stale(fp)
+    _atomic_write(entry, lambda p: df.to_pickle(p))
+    return df.copy()
+
+
+def read_sheets(
+    path: str | os.PathLike,
+    sheets: Sequence[str],
+    nrows: int = MAX_ROWS_PER_SHEET,
+    columns: Sequence[str] = TS_COLUMNS,
+) -> dict[str, pd.DataFrame]:
+    """Több lap egyszerre ({lapnév: DataFrame}, a sheets sorrendjében).
+
+    A cache-ben lévő lapok onnan jönnek, a hiányzókat egyetlen
+    munkafüzet-megnyitással olvassuk be (teljes év: 12 lap, 1 megnyitás).
+    """
+    fp = fingerprint(path)
+    out: dict[str, pd.DataFrame] = {}
+    missing: list[str] = []
+    for sheet in sheets:
+        entry = _sheet_entry(fp, sheet, nrows, columns)
+        if entry.exists():
+            try:
+                out[sheet] = pd.read_pickle(entry)
+                continue
+            except Exception:
+                pass
+        missing.append(sheet)
+
+    if missing:
+        fresh = read_month_sheets(path, missing, columns=columns, nrows=nrows)
+        _prune_stale(fp)
+        for sheet, df in fresh.items():
+            _atomic_write(
+                _sheet_entry(fp, sheet, nrows, columns), lambda p, df=df: df.to_pickle(p)
+            )
+            out[sheet] = df.copy()
+    return {sheet: out[sheet] for sheet in sheets}
+
+
+def clear_cache() -> None:
+    """Teljes cache ürítése (pl. hibakereséshez)."""
+    if CACHE_DIR.exists():
+        for p in CACHE_DIR.iterdir():
+            p.unlink(missing_ok=True)
+
+
+__all__ = [
+    "CACHE_DIR",
+    "fingerprint",
+    "sheet_names",
+    "read_sheet",
+    "read_sheets",
+    "clear_cache",
+]
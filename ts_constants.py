@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Közös állandók és segédfüggvények a GUI-nak és a szkripteknek.
+
+Szándékosan könnyű modul: csak a standard könyvtárat importálja, nem állít be
+naplózást és nem nyit fájlt, így a main.py az ablak megjelenése előtt is
+betöltheti (a generate_szamlamelleklet / master_data importja pandas-t és
+openpyxl-t húzna be, és log fájlt nyitna).
+
+Usage:
+    from ts_constants import ORDERED_CODES_DEFAULT, COMPLIANCE_FILE, HONAPOK, remove_accents
+"""
+from __future__ import annotations
+
+import unicodedata
+
+# --- Konfiguráció ---
+COMPLIANCE_FILE = "Ecovis Compliance Solution számlázási adatok_2025.xlsx"
+
+# A hónap-lapok nevei (ékezet nélkül, kisbetűvel — így normalizálva hasonlítjuk)
+HONAPOK = [
+    "januar",
+    "februar",
+    "marcius",
+    "aprilis",
+    "majus",
+    "junius",
+    "julius",
+    "augusztus",
+    "szeptember",
+    "oktober",
+    "november",
+    "december",
+]
+
+# ➤ Alapértelmezett számlamelléklet-kódlista (sorrend számít)
+ORDERED_CODES_DEFAULT = [
+    "AUC",
+    "AXM",
+    "BRD",
+    "HÖG",
+    "ITP",
+    "JIS",
+    "KKE",
+    "KLU",
+    "KRT",
+    "LUT",
+    "MES",
+    "NUM",
+    "OLD",
+    "PCO",
+    "PRM",
+    "RAP",
+    "ROC",
+    "SCH",
+    "SPA",
+    "TLA",
+    "VAB",
+    "ZAP",
+]
+
+
+def remove_accents(s: str) -> str:
+    nfkd = unicodedata.normalize("NFKD", str(s))
+    return "".join(c for c in nfkd if not unicodedata.combining(c))
+
+
+__all__ = ["COMPLIANCE_FILE", "HONAPOK", "ORDERED_CODES_DEFAULT", "remove_accents"]
@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+"""
+Éves, oszlopos TS ténytábla: minden TS sor egyszer beolvasva, lemezen tartva.
+
+Egy sor = egy TS bejegyzés (ahol az Ügyfélkód vagy a Projekt neve ki van
+töltve), oszlopai:
+    Hónap, Lap, Dolgozó, Forrás fájl, Sor (Excel sorszám), Ügyfélkód,
+    Projekt neve, Munka leírása, Óra, Dátum
+A dimenziók (Hónap, Lap, Dolgozó, Forrás fájl, Ügyfélkód, Projekt neve)
+kategória típusúak, így az év összes sora is kis memóriában elfér. Az értékek
+nyersek (az Óra szám, ha nem szám: NaN; a leírás hiányozhat), a szűrés a
+lekérdezések dolga: summary_records / validation_frames / description_hours.
+
+Tárolás a TS mappa .ts_cache/facts/ alatt: Parquet, ha van pyarrow, különben
+pickle; mellette manifest.json a fájlok ujjlenyomatával és lapjaik
+állapotával. Az update() csak az új/módosult fájlokat olvassa újra (a közös
+sheet-cache-en át), az eltűnt fájlok sorait eldobja.
+
+Bekapcsolás: TS_FACTS=1 környezeti változó (a timesheet_summary-nál --facts
+is), ekkor az összesítés, a párellenőrzés és a számlamelléklet is ebből
+dolgozik; a heti riport így futtatja őket.
+
+Usage:
+    import ts_facts
+    store = ts_facts.update(".")
+    df = ts_facts.summary_records(store["facts"], "januar", active_clients)
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from ts_cache import fingerprint, read_sheets, sheet_names
+from ts_ingest import HONAPOK, RECORD_COLUMNS, find_description_column, is_ts_file, norm_header
+from ts_reader import MAX_ROWS_PER_SHEET, TS_COLUMNS
+
+try:  # Parquet csak pyarrow-val; nélküle pickle
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except Exception:  # pragma: no cover
+    HAS_PYARROW = False
+
+# --- Konfiguráció ---
+FACTS_SUBDIR = Path(".ts_cache") / "facts"  # a TS mappához képest
+FACTS_VERSION = 1
+ENV_FLAG = "TS_FACTS"
+
+FACT_COLUMNS = [
+    "Hónap",
+    "Lap",
+    "Dolgozó",
+    "Forrás fájl",
+    "Sor",
+    "Ügyfélkód",
+    "Projekt neve",
+    "Munka leírása",
+    "Óra",
+    "Dátum",
+]
+CATEGORY_COLUMNS = ["Hónap", "Lap", "Dolgozó", "Forrás fájl", "Ügyfélkód", "Projekt neve"]
+DATE_COLUMNS = ["Időpont", "Dátum"]  # a TS dátum oszlopa (sablontól függően)
+SOURCE_COLUMNS = [*TS_COLUMNS, *DATE_COLUMNS]
+
+
+def enabled() -> bool:
+    """Be van-e kapcsolva a ténytábla (TS_FACTS=1)."""
+    return os.environ.get(ENV_FLAG, "").strip().lower() in ("1", "true", "yes", "igen")
+
+
+def _store_dir(folder: str | os.PathLike) -> Path:
+    return Path(folder) / FACTS_SUBDIR
+
+
+def _data_file(folder: str | os.PathLike) -> Path:
+    return _store_dir(folder) / ("facts.parquet" if HAS_PYARROW else "facts.pkl")
+
+
+def _empty() -> pd.DataFrame:
+    return _categorize(pd.DataFrame({c: pd.Series(dtype=object) for c in FACT_COLUMNS}))
+
+
+def _categorize(df: pd.DataFrame) -> pd.DataFrame:
+    """Egységes típusok (concat után a kategóriák újraépülnek)."""
+    df = df[FACT_COLUMNS].reset_index(drop=True)
+    for c in CATEGORY_COLUMNS:
+        df[c] = df[c].astype(object).astype("category")
+    df["Sor"] = df["Sor"].astype("int32")
+    df["Óra"] = df["Óra"].astype("float64")
+    df["Dátum"] = pd.to_datetime(df["Dátum"], errors="coerce")
+    df["Munka leírása"] = df["Munka leírása"].astype(object)
+    return df
+
+
+def _load_manifest(folder) -> dict:
+    try:
+        data = json.loads((_store_dir(folder) / "manifest.json").read_text(encoding="utf-8"))
+        if data.get("version") == FACTS_VERSION and data.get("backend") == _data_file(folder).suffix:
+            return data
+    except Exception:
+        pass
+    return {"version": FACTS_VERSION, "backend": _data_file(folder).suffix, "files": {}}
+
+
+def _load_facts(folder) -> pd.DataFrame | None:
+    path = _data_file(folder)
+    if not path.exists():
+        return None
+    try:
+        if HAS_PYARROW:
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+    except Exception as e:
+        logging.warning(f"Ténytábla nem olvasható ({path.name}), újraépítés: {e}")
+        return None
+
+
+def _atomic(target: Path, write) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, target)
+    except Exception as e:
+        logging.debug(f"Ténytábla írás sikertelen ({target.name}): {e}")
+        try:
+            tmp.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def _save(folder, facts: pd.DataFrame, manifest: dict) -> None:
+    if HAS_PYARROW:
+        _atomic(_data_file(folder), lambda p: facts.to_parquet(p, index=False))
+    else:
+        _atomic(_data_file(folder), lambda p: facts.to_pickle(p))
+    _atomic(
+        _store_dir(folder) / "manifest.json",
+        lambda p: p.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8"),
+    )
+
+
+def _sheet_rows(df: pd.DataFrame, file: str, sheet: str, month: str) -> tuple[pd.DataFrame | None, dict]:
+    """Egy hónap-lap ténysorai + a lap állapota (a timesheet_summary számlálóihoz)."""
+    needed = ["Ügyfélkód", "Projekt neve", "Időráfordítás (óra)"]
+    cols = list(df.columns)
+    status = {"month": month, "missing": [c for c in needed if c not in cols]}
+    na = df.isna()
+    if na.to_numpy().all():
+        status["status"] = "empty"
+        return None, status
+    if status["missing"]:
+        status["status"] = "missing"
+    elif not (~na[needed].any(axis=1)).any():
+        status["status"] = "no_rows"
+    else:
+        status["status"] = "ok"
+
+    def col(name):
+        return df[name] if name in cols else pd.Series(float("nan"), index=df.index, dtype=object)
+
+    kod, prj = col("Ügyfélkód"), col("Projekt neve")
+    keep = (kod.notna() | prj.notna()).to_numpy()
+    if not keep.any():
+        return None, status
+    desc_col = find_description_column(cols)
+    date_col = next((c for c in DATE_COLUMNS if c in cols), None)
+    sub = df[keep]
+    rows = pd.DataFrame(
+        {
+            "Hónap": month,
+            "Lap": sheet,
+            "Dolgozó": file.replace(".xlsx", ""),
+            "Forrás fájl": file,
+            "Sor": sub.index + 2,
+            # ugyanaz a str konverzió, mint a szkriptekben (NaN marad NaN)
+            "Ügyfélkód": kod[keep].map(lambda v: v if pd.isna(v) else str(v)),
+            "Projekt neve": prj[keep].map(lambda v: v if pd.isna(v) else str(v)),
+            "Munka leírása": (
+                sub[desc_col].map(lambda v: v if pd.isna(v) else str(v))
+                if desc_col
+                else float("nan")
+            ),
+            "Óra": pd.to_numeric(col("Időráfordítás (óra)")[keep], errors="coerce"),
+            "Dátum": pd.to_datetime(sub[date_col], errors="coerce") if date_col else pd.NaT,
+        },
+        columns=FACT_COLUMNS,
+    )
+    return rows, status
+
+
+def _file_rows(folder, file: str) -> tuple[list[pd.DataFrame], dict]:
+    path = os.path.join(folder, file)
+    fp = fingerprint(path)
+    entry = {"size": fp[1], "mtime_ns": fp[2], "sheet_count": 0, "sheets": {}, "error": None}
+    frames: list[pd.DataFrame] = []
+    try:
+        names = sheet_names(path)
+        entry["sheet_count"] = len(names)
+        months = [(s, norm_header(s)) for s in names if norm_header(s) in HONAPOK]
+        data = read_sheets(
+            path, [s for s, _ in months], nrows=MAX_ROWS_PER_SHEET, columns=SOURCE_COLUMNS
+        ) if months else {}
+    except Exception as e:
+        logging.exception(f"❌ Ténytábla: nem olvasható {file} — {e}")
+        entry["error"] = str(e)
+        return frames, entry
+    for sheet, month in months:
+        rows, status = _sheet_rows(data[sheet], file, sheet, month)
+        entry["sheets"][sheet] = status
+        if rows is not None:
+            frames.append(rows)
+    return frames, entry
+
+
+def update(folder: str | os.PathLike = ".", rebuild: bool = False) -> dict:
+    """A ténytábla frissítése és betöltése: {"facts": DataFrame, "files": manifest}.
+
+    Csak az új vagy módosult TS fájlok lapjait olvassuk be; a változatlan
+    fájlok sorai a tárolt táblából jönnek.
+    """
+    folder = str(folder)
+    manifest = {"version": FACTS_VERSION, "backend": _data_file(folder).suffix, "files": {}}
+    facts = None
+    if not rebuild:
+        manifest = _load_manifest(folder)
+        facts = _load_facts(folder)
+    if facts is None:
+        manifest["files"] = {}
+        facts = _empty()
+
+    files = sorted(f for f in os.listdir(folder) if is_ts_file(f))
+    known = manifest["files"]
+    stale = []
+    for f in files:
+        st = os.stat(os.path.join(folder, f))
+        e = known.get(f)
+        if not e or e["size"] != st.st_size or e["mtime_ns"] != st.st_mtime_ns or e.get("error"):
+            stale.append(f)
+    removed = [f for f in known if f not in files]
+    if not stale and not removed:
+        return {"facts": facts, "files": known}
+
+    drop = set(stale) | set(removed)
+    frames = [facts[~facts["Forrás fájl"].astype(object).isin(drop)]]
+    for f in removed:
+        known.pop(f, None)
+    for f in stale:
+        logging.info(f"🔧 Ténytábla frissítés: {f}")
+        rows, entry = _file_rows(folder, f)
+        frames.extend(rows)
+        known[f] = entry
+    facts = _categorize(pd.concat(frames, ignore_index=True))
+    facts = facts.sort_values(["Forrás fájl", "Lap", "Sor"], key=_order_key, kind="stable")
+    facts = facts.reset_index(drop=True)
+    manifest["files"] = {f: known[f] for f in files if f in known}
+    _save(folder, facts, manifest)
+    logging.info(f"Ténytábla: {len(facts)} sor, {len(stale)} fájl frissítve, {len(removed)} eltávolítva")
+    return {"facts": facts, "files": manifest["files"]}
+
+
+def _order_key(s: pd.Series) -> pd.Series:
+    """Fájlnév szerint, a lapok a munkafüzetbeli (hónap) sorrendben."""
+    if s.name == "Lap":
+        return s.astype(object).map(lambda v: HONAPOK.index(norm_header(v)))
+    return s.astype(object) if s.dtype == "category" else s
+
+
+def _month_mask(facts: pd.DataFrame, month_norm: str | None) -> pd.Series:
+    if month_norm is None:
+        return pd.Series(True, index=facts.index)
+    return (facts["Hónap"] == month_norm).to_numpy()
+
+
+def summary_records(
+    facts: pd.DataFrame, month_norm: str | None, active_clients: set[str]
+) -> pd.DataFrame:
+    """A timesheet_summary df_long-ja (RECORD_COLUMNS) a ténytáblából.
+
+    Ugyanaz a szűrés, mint a ts_ingest-ben: komplett sor, számszerű óra,
+    aktív ügyfél; a leírás hiánya "".
+    """
+    sub = facts[_month_mask(facts, month_norm)]
+    keep = (
+        sub["Ügyfélkód"].notna()
+        & sub["Projekt neve"].notna()
+        & sub["Óra"].notna()
+        & sub["Ügyfélkód"].astype(object).isin(active_clients)
+    )
+    sub = sub[keep]
+    return pd.DataFrame(
+        {
+            "Ügyfélkód": sub["Ügyfélkód"].astype(object),
+            "Projekt neve": sub["Projekt neve"].astype(object),
+            "Munka leírása": sub["Munka leírása"].fillna("").astype(object),
+            "Dolgozó": sub["Dolgozó"].astype(object),
+            "Forrás fájl": sub["Forrás fájl"].astype(object),
+            "Óra": sub["Óra"].round(2),
+            "Hónap": sub["Hónap"].astype(object),
+        },
+        columns=RECORD_COLUMNS,
+    ).reset_index(drop=True)
+
+
+def sheet_counts(files: dict, month_norm: str | None) -> dict:
+    """A timesheet_summary futási számlálói a manifestből (Excel megnyitás nélkül)."""
+    out = dict.fromkeys(
+        ["processed_files", "skipped_files", "processed_sheets", "skipped_sheets", "errors"], 0
+    )
+    for entry in files.values():
+        if entry.get("error"):
+            out["errors"] += 1
+            continue
+        targets = [
+            s for s in entry["sheets"].values() if month_norm is None or s["month"] == month_norm
+        ]
+        if not targets:
+            out["skipped_files"] += 1
+            out["skipped_sheets"] += entry["sheet_count"]
+            continue
+        out["processed_files"] += 1
+        out["skipped_sheets"] += entry["sheet_count"] - len(targets)
+        for s in targets:
+            out["processed_sheets" if s["status"] == "ok" else "skipped_sheets"] += 1
+    return out
+
+
+def validation_frames(store: dict, month_norm: str | None):
+    """(fájl, lap, df | hibaüzenet) hármasok a validate_pairs.validate_sheet-hez.
+
+    A df oszlopai Ügyfélkód, Projekt neve (str / NaN), indexe Excel sor - 2;
+    hiányzó oszlopnál a df helyén a validate_file-lal egyező hibaüzenet áll.
+    """
+    facts = store["facts"]
+    sub = facts[_month_mask(facts, month_norm)]
+    groups = {
+        key: g
+        for key, g in sub.groupby(["Forrás fájl", "Lap"], observed=True, sort=False)
+    }
+    for file, entry in store["files"].items():
+        for sheet, status in entry["sheets"].items():
+            if month_norm is not None and status["month"] != month_norm:
+                continue
+            miss = [c for c in status["missing"] if c in ("Ügyfélkód", "Projekt neve")]
+            if miss:
+                yield file, sheet, f"Hiányzó oszlop(ok): {miss}"
+                continue
+            g = groups.get((file, sheet))
+            if g is None:  # üres lap / nincs kitöltött sor
+                yield file, sheet, pd.DataFrame(columns=["Ügyfélkód", "Projekt neve"])
+                continue
+            yield file, sheet, pd.DataFrame(
+                {
+                    "Ügyfélkód": g["Ügyfélkód"].astype(object).to_numpy(),
+                    "Projekt neve": g["Projekt neve"].astype(object).to_numpy(),
+                },
+                index=g["Sor"].to_numpy() - 2,
+            )
+
+
+def description_hours(
+    facts: pd.DataFrame, month_norm: str, codes: set[str]
+) -> dict[str, dict[str, float]]:
+    """Számlamelléklethez: ügyfélkód → {leírás → össz óra} (leírás nélküli sor kimarad)."""
+    sub = facts[_month_mask(facts, month_norm)]
+    sub = sub[
+        sub["Ügyfélkód"].astype(object).isin(codes)
+        & sub["Munka leírása"].notna()
+        & sub["Óra"].notna()
+    ]
+    out: dict[str, dict[str, float]] = {}
+    if sub.empty:
+        return out
+    grp = (
+        pd.DataFrame(
+            {
+                "kod": sub["Ügyfélkód"].astype(object),
+                "desc": sub["Munka leírása"].astype(str).str.strip(),
+                "ora": sub["Óra"],
+            }
+        )
+        .groupby(["kod", "desc"], sort=False)["ora"]
+        .sum()
+    )
+    for (kod, desc), hrs in grp.items():
+        out.setdefault(kod, {})[desc] = float(hrs)
+    return out
+
+
+__all__ = [
+    "FACT_COLUMNS",
+    "CATEGORY_COLUMNS",
+    "HAS_PYARROW",
+    "enabled",
+    "update",
+    "summary_records",
+    "sheet_counts",
+    "validation_frames",
+    "description_hours",
+]
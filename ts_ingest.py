@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+Egy TS fájl feldolgozása a timesheet_summary számára — külön modulban, hogy a
+ProcessPoolExecutor worker-ei (Windows-on spawn) a szkript újrafuttatása
+nélkül importálhassák.
+
+Teljes évnél a fájl összes hónap-lapja egyetlen munkafüzet-megnyitással
+olvasódik be; a rekordok hónappal címkézettek (RECORD_COLUMNS "Hónap").
+
+Az ingest_file() nem ír logot és nem nyúl közös állapothoz: egy tömör
+"batch"-et ad vissza (lapokként egy részösszeg DataFrame, számlálók, log
+sorok); a fő folyamat fájlsorrendben gyűjti, a darabokat a végén egyetlen
+pd.concat-tal fűzi össze, és naplóz.
+
+A lapok részösszegei (Ügyfélkód, Projekt neve, Munka leírása → Óra) a fájl
+ujjlenyomatával együtt mentődnek (ts_partials); újrafuttatáskor csak az új
+vagy módosult fájlok lapjait olvassuk be, a többi a mentett részösszeg.
+
+Usage:
+    from ts_ingest import ingest_file, RECORD_COLUMNS
+    batch = ingest_file("TS GP.xlsx", ".", "januar", active_clients)
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import traceback
+
+import numpy as np
+import pandas as pd
+
+from ts_cache import read_sheet, read_sheets, sheet_names
+from ts_constants import HONAPOK, remove_accents
+from ts_partials import active_key, load_entry, save_entry
+from ts_reader import MAX_ROWS_PER_SHEET
+
+# A DataFrame darabok oszlopai (= a df_long oszlopai)
+RECORD_COLUMNS = [
+    "Ügyfélkód",
+    "Projekt neve",
+    "Munka leírása",
+    "Dolgozó",
+    "Forrás fájl",
+    "Óra",
+    "Hónap",  # normalizált hónapnév (teljes évnél ez különíti el a hónapokat)
+]
+# A lapszintű részösszeg kulcsa (a többi oszlop egy lapon belül állandó)
+PARTIAL_KEYS = ["Ügyfélkód", "Projekt neve", "Munka leírása"]
+
+honap_regex = re.compile("^(" + "|".join(HONAPOK) + ")$", re.IGNORECASE)
+
+
+def norm_header(s: str) -> str:
+    """Oszlopnév normalizálás: ékezet nélkül, kisbetű, környezeti szóközök nélkül."""
+    return remove_accents((s or "")).strip().lower()
+
+
+def is_ts_file(name: str) -> bool:
+    return name.endswith(".xlsx") and "TS" in name and not name.startswith("~$")
+
+
+def find_description_column(columns: list[str]) -> str | None:
+    """
+    Megkeresi a 'munka leírása' oszlopot több alias alapján.
+    Visszaadja az eredeti oszlopnevet (nem normalizált), ha talál.
+    """
+    aliases = [
+        "munka leirasa",
+        "munka leírása",
+        "leiras",
+        "leírás",
+        "megjegyzes",
+        "megjegyzés",
+        "feladat leirasa",
+        "feladat leírása",
+        "feladat",
+        "tevékenység",
+        "tevekenyseg",
+        "munka",
+    ]
+    norm_map = {norm_header(c): c for c in columns}
+    for a in aliases:
+        if a in norm_map:
+            return norm_map[a]
+    return None
+
+
+def _new_batch(file: str) -> dict:
+    return {
+        "file": file,
+        "frames": [],  # lapokként egy-egy RECORD_COLUMNS oszlopú DataFrame
+        "had": False,  # volt-e releváns hónap sheet
+        "processed_sheets": 0,
+        "skipped_sheets": 0,
+        "errors": 0,
+        "log": [],  # (szint, üzenet) párok, a fő folyamat naplózza
+    }
+
+
+def _log_exception(batch: dict, msg: str):
+    """logging.exception megfelelője: az üzenet + traceback a batch-be kerül."""
+    batch["log"].append((logging.ERROR, f"{msg}\n{traceback.format_exc().rstrip()}"))
+
+
+def ingest_file(
+    file: str,
+    folder: str,
+    month_norm: str | None,
+    active_clients: set[str],
+    use_partials: bool = True,
+) -> dict:
+    """Egy TS fájl releváns hónap-lapjainak rekordjai + számlálók.
+
+    month_norm=None esetén minden hónap nevű lap (teljes év) feldolgozásra kerül.
+    A lapok lapszintű részösszegként kerülnek a batch-be; use_partials=False
+    esetén a mentett részösszegeket figyelmen kívül hagyjuk (és nem is írjuk).
+    """
+    batch = _new_batch(file)
+    log = batch["log"]
+    file_path = os.path.join(folder, file)
+    log.append((logging.INFO, f"🔧 Feldolgozás: {file}"))
+    try:
+        xls_sheets = sheet_names(file_path)
+    except Exception as e:
+        batch["errors"] += 1
+        _log_exception(batch, f"❌ Nem sikerült megnyitni: {file} — {e}")
+        return batch
+
+    # dolgozó (fájlnév)
+    person = file.replace(".xlsx", "")
+
+    # releváns hónap-lapok (teljes évnél mind a 12, egy menetben olvasva)
+    targets: list[tuple[str, str]] = []  # (lapnév, normalizált hónap)
+    for sheet in xls_sheets:
+        s_norm = norm_header(sheet)
+        if month_norm:
+            if s_norm != month_norm:
+                batch["skipped_sheets"] += 1
+                continue
+        else:
+            if not honap_regex.fullmatch(s_norm):
+                batch["skipped_sheets"] += 1
+                continue
+        targets.append((sheet, s_norm))
+
+    if not targets:
+        log.append((logging.INFO, f"⚠️ Kihagyva (nincs releváns hónap sheet): {file}"))
+        return batch
+    batch["had"] = True
+
+    # Változatlan fájl lapjai: a mentett részösszeg (ts_partials), nem olvassuk újra
+    try:
+        entry = (
+            load_entry(file_path, active_key(active_clients))
+            if use_partials
+            else None
+        )
+    except Exception:
+        entry = None
+    cached = entry["sheets"] if entry is not None else {}
+    need = [t[0] for t in targets if t[0] not in cached]
+
+    # Csak a szükséges oszlopok + a (változó nevű) leírás oszlop, streamelve
+    # — a közös cache-ből, ha a fájl azóta nem változott
+    frames = {}
+    if need:
+        try:
+            frames = read_sheets(file_path, need, nrows=MAX_ROWS_PER_SHEET)
+        except Exception:
+            frames = {}  # lapszintű hibakezelés lent, lapról lapra
+
+    hits = 0
+    dirty = False
+    for sheet, s_norm in targets:
+        log.append((logging.INFO, f"  ➔ Sheet: {sheet}"))
+        part = cached.get(sheet)
+        if part is not None and part["month"] == s_norm:
+            hits += 1
+        else:
+            df = frames.get(sheet)
+            if df is None:
+                try:
+                    df = read_sheet(file_path, sheet, nrows=MAX_ROWS_PER_SHEET)
+                except Exception as e:
+                    batch["errors"] += 1
+                    _log_exception(
+                        batch, f"    ❌ Hiba a sheet olvasásakor ({file}/{sheet}): {e}"
+                    )
+                    continue
+            part = _sheet_partial(file, df, person, s_norm, active_clients)
+            cached[sheet] = part
+            dirty = True
+        log.extend(part["log"])
+        batch["processed_sheets"] += part["processed"]
+        batch["skipped_sheets"] += part["skipped"]
+        if part["agg"] is not None:
+            batch["frames"].append(part["agg"])
+
+    if hits:
+        log.append(
+            (logging.INFO, f"  ➔ {hits} sheet részösszege változatlan, újraolvasás nélkül")
+        )
+    if dirty and entry is not None:
+        save_entry(file_path, entry)
+
+    return batch
+
+
+def _sheet_partial(
+    file: str, df: pd.DataFrame, person: str, month: str, active_clients: set[str]
+) -> dict:
+    """Egy hónap-lap eredménye mentésre kész formában: számlálók, log sorok és
+    a (Ügyfélkód, Projekt neve, Munka leírása) szerinti óraösszeg."""
+    tmp = _new_batch(file)
+    processed = _ingest_sheet(tmp, df, person, month, active_clients)
+    agg = None
+    if tmp["frames"]:
+        rows = tmp["frames"][0]
+        agg = (
+            rows.groupby(PARTIAL_KEYS, sort=False, dropna=False)["Óra"]
+            .sum()
+            .reset_index()
+        )
+        agg["Dolgozó"] = person
+        agg["Forrás fájl"] = file
+        agg["Hónap"] = month
+        agg = agg[RECORD_COLUMNS]
+    return {
+        "month": month,
+        "processed": processed,
+        "skipped": tmp["skipped_sheets"],
+        "log": tmp["log"],
+        "agg": agg,
+    }
+
+
+def _ingest_sheet(
+    batch: dict, df: pd.DataFrame, person: str, month: str, active_clients: set[str]
+) -> int:
+    """Egy hónap-lap sorai DataFrame darabként a batch-be; 1, ha a lap
+    feldolgozottnak számít (akkor is, ha egy sora sem került be)."""
+    log = batch["log"]
+    # egyetlen NaN-maszk a lapra (a korábbi két dropna helyett)
+    na = df.isna().to_numpy()
+    if na.all():
+        log.append((logging.INFO, "    ➔ Üres sheet, kihagyva"))
+        batch["skipped_sheets"] += 1
+        return 0
+
+    # Szükséges “kötelező” oszlopok
+    needed = ["Ügyfélkód", "Projekt neve", "Időráfordítás (óra)"]
+    cols = list(df.columns)
+    # Tudd meg a (változó nevű) leírás oszlopot
+    desc_col = find_description_column(cols)
+
+    # Ellenőrizd a kötelező oszlopokat
+    miss = [c for c in needed if c not in cols]
+    if miss:
+        log.append((logging.WARNING, f"    ➔ Hiányzó oszlop(ok): {miss}, kihagyva"))
+        batch["skipped_sheets"] += 1
+        return 0
+
+    # Csak komplett sorok (óra, ügyfélkód, projekt név)
+    complete = ~na[:, [cols.index(c) for c in needed]].any(axis=1)
+    if not complete.any():
+        batch["skipped_sheets"] += 1
+        return 0
+
+    # Vektorizált lépés: óra számmá (nem szám → NaN → kiesik), aktív ügyfél
+    # szűrés isin-nel, leírás NaN → ""
+    hours = pd.to_numeric(
+        df["Időráfordítás (óra)"].to_numpy()[complete], errors="coerce"
+    ).astype("float64")
+    kod = df["Ügyfélkód"].to_numpy()[complete].astype(str).astype(object)
+    keep = ~np.isnan(hours) & pd.Series(kod).isin(active_clients).to_numpy()
+    if not keep.any():
+        return 1
+    if desc_col is not None:
+        desc = df[desc_col].to_numpy()[complete][keep]
+        desc_na = na[complete, cols.index(desc_col)][keep]
+        desc = np.where(desc_na, "", desc).astype(str).astype(object)
+    else:
+        desc = ""
+    projekt = df["Projekt neve"].to_numpy()[complete][keep].astype(str).astype(object)
+
+    chunk = pd.DataFrame(
+        {
+            "Ügyfélkód": kod[keep],
+            "Projekt neve": projekt,
+            "Munka leírása": desc,
+            "Dolgozó": person,
+            "Forrás fájl": batch["file"],
+            "Óra": hours[keep].round(2),
+            "Hónap": month,
+        },
+        columns=RECORD_COLUMNS,
+    )
+    batch["frames"].append(chunk)
+    return 1
+
+
+__all__ = [
+    "RECORD_COLUMNS",
+    "HONAPOK",
+    "honap_regex",
+    "remove_accents",
+    "norm_header",
+    "is_ts_file",
+    "find_description_column",
+    "ingest_file",
+]
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Fájlonkénti, hónap-laponkénti részösszegek tárolása a timesheet_summary-hoz.
+
+Minden TS fájlhoz egy bejegyzés tartozik (.ts_cache/partials/ alatt), benne a
+fájl ujjlenyomata, az aktív ügyfélkör kulcsa, és lapnévenként a lap
+feldolgozásának eredménye: számlálók, log sorok és a részösszeg
+(Ügyfélkód, Projekt neve, Munka leírása → Óra, a dolgozóval és hónappal).
+Ha sem a fájl, sem az aktív ügyfelek nem változtak, az újrafuttatás a lapot
+nem olvassa újra, csak a részösszeget fűzi hozzá az összesítéshez.
+
+Usage:
+    from ts_partials import active_key, load_entry, save_entry
+    entry = load_entry(path, active_key(active_clients))
+    ...
+    save_entry(path, entry)
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+
+from ts_cache import fingerprint
+from ts_reader import MAX_ROWS_PER_SHEET
+
+# --- Konfiguráció ---
+PARTIALS_DIR = Path(".ts_cache") / "partials"
+PARTIALS_VERSION = 1
+
+
+def _digest(s: str) -> str:
+    return hashlib.sha1(s.encode("utf-8")).hexdigest()[:16]
+
+
+def active_key(active_clients: set[str]) -> str:
+    """Az aktív ügyfélkör kulcsa — ha a Cégadatok változik, a részösszegek elavulnak."""
+    return _digest("\x00".join(sorted(active_clients)))
+
+
+def _entry_path(fp: tuple[str, int, int]) -> Path:
+    return PARTIALS_DIR / f"{_digest(fp[0])}.pkl"
+
+
+def _new_entry(fp: tuple[str, int, int], akey: str) -> dict:
+    return {
+        "version": PARTIALS_VERSION,
+        "fp": fp,
+        "active_key": akey,
+        "max_rows": MAX_ROWS_PER_SHEET,
+        "sheets": {},  # lapnév → {"month", "processed", "skipped", "log", "agg"}
+    }
+
+
+def load_entry(path: str | os.PathLike, akey: str) -> dict:
+    """A fájl érvényes bejegyzése, vagy egy üres (ha nincs / elavult)."""
+    fp = fingerprint(path)
+    try:
+        with open(_entry_path(fp), "rb") as f:
+            entry = pickle.load(f)
+        if (
+            entry.get("version") == PARTIALS_VERSION
+            and tuple(entry.get("fp", ())) == fp
+            and entry.get("active_key") == akey
+            and entry.get("max_rows") == MAX_ROWS_PER_SHEET
+        ):
+            return entry
+    except Exception:
+        pass
+    return _new_entry(fp, akey)
+
+
+def save_entry(path: str | os.PathLike, entry: dict) -> None:
+    """Atomikus mentés; ha a fájl közben megváltozott, nem mentünk."""
+    try:
+        if fingerprint(path) != tuple(entry["fp"]):
+            return
+        target = _entry_path(entry["fp"])
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, target)
+    except Exception as e:
+        logging.debug(f"Részösszeg mentése sikertelen ({path}): {e}")
+
+
+def clear_partials() -> None:
+    """Összes részösszeg törlése (a következő futás mindent újraolvas)."""
+    if PARTIALS_DIR.exists():
+        for p in PARTIALS_DIR.iterdir():
+            p.unlink(missing_ok=True)
+
+
+__all__ = [
+    "PARTIALS_DIR",
+    "active_key",
+    "load_entry",
+    "save_entry",
+    "clear_partials",
+]
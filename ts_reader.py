@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+Streamelő (openpyxl read_only / values_only) olvasó a TS hónap-lapokhoz.
+
+A pd.ExcelFile + pd.read_excel(nrows=300) útvonal mind a 12 hónap-lapot
+megnyitja (load_workbook), és az egész lapot DataFrame-be tölti, a Y/Z
+segédoszlopokkal együtt. Ez az olvasó:
+- csak a kért lapot nyitja meg (a többi lap XML-jéhez hozzá sem nyúl),
+- csak a szükséges oszlopokat (Ügyfélkód, Projekt neve, Időráfordítás (óra) +
+  a leírás oszlop alias-ai) veszi ki a sorokból,
+- az utolsó ténylegesen kitöltött adatsornál megáll (a segédlisták miatti
+  "üres" sorokat levágja).
+
+Az eredmény DataFrame indexe a pandas-os sorindex (Excel sor = index + 2),
+az értékek pedig ugyanúgy konvertáltak, mint a read_excel-nél (egész float →
+int, üres / NA-szöveg / Excel hibaérték → NaN).
+
+A lapok egyenkénti megnyitása az openpyxl belső API-ját használja
+(ExcelReader, apply_stylesheet, ReadOnlyWorksheet), a req.txt-ben rögzített
+3.1.x verzióval tesztelve. Ha ezek egy másik verzióban hiányoznak vagy
+megváltoztak (ImportError / AttributeError / TypeError), az olvasó
+figyelmeztet, és a nyilvános load_workbook(read_only=True) útra vált — lassabb,
+de ugyanazt az eredményt adja.
+
+Usage:
+    from ts_reader import read_month_sheet
+    df = read_month_sheet("TS GP.xlsx", "januar")
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import unicodedata
+from contextlib import contextmanager
+from typing import Iterator, Sequence
+
+import pandas as pd
+from openpyxl import load_workbook
+
+# gyors út: az openpyxl belső API-ja (csak a kért lapot nyitja meg)
+try:
+    from openpyxl.reader.excel import ExcelReader
+    from openpyxl.styles.stylesheet import apply_stylesheet
+    from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+
+    _IMPORT_ERROR = None
+except ImportError as e:
+    # a figyelmeztetés az első megnyitáskor megy ki (importkor még nincs naplóbeállítás)
+    ExcelReader = apply_stylesheet = ReadOnlyWorksheet = None
+    _IMPORT_ERROR = e
+
+_FAST_PATH = True  # első hibánál (belső API eltérés) False, onnan load_workbook
+_FAST_PATH_ERRORS = (ImportError, AttributeError, TypeError)
+
+# --- Konfiguráció ---
+MAX_ROWS_PER_SHEET = 300  # projekt konvenció
+TS_COLUMNS = ["Ügyfélkód", "Projekt neve", "Időráfordítás (óra)"]
+
+# A "munka leírása" oszlop lehetséges nevei (normalizálva, mint a timesheet_summary-ban)
+DESCRIPTION_ALIASES = [
+    "munka leirasa",
+    "leiras",
+    "megjegyzes",
+    "feladat leirasa",
+    "feladat",
+    "tevekenyseg",
+    "munka",
+]
+
+# read_excel alapértelmezett NA szövegei + Excel hibaértékek
+_NA_STRINGS = {
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+}
+_EXCEL_ERRORS = {
+    "#NULL!",
+    "#DIV/0!",
+    "#VALUE!",
+    "#REF!",
+    "#NAME?",
+    "#NUM!",
+    "#N/A",
+    "#GETTING_DATA",
+}
+
+
+def _norm(s) -> str:
+    nfkd = unicodedata.normalize("NFKD", str(s or ""))
+    return "".join(c for c in nfkd if not unicodedata.combining(c)).strip().lower()
+
+
+def _convert(v):
+    """Cellaérték konverzió a pandas openpyxl-olvasójával egyezően."""
+    if v is None:
+        return math.nan
+    if isinstance(v, str):
+        return math.nan if (v in _NA_STRINGS or v in _EXCEL_ERRORS) else v
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return v
+
+
+def _pick_columns(
+    header: Sequence, columns: Sequence[str], with_description: bool
+) -> list[tuple[int, str]]:
+    """(0-alapú oszlopindex, fejlécnév) párok; duplikált fejlécnél az első nyer."""
+    picked: dict[str, int] = {}
+    wanted = set(columns)
+    for i, h in enumerate(header):
+        if h is None:
+            continue
+        name = str(h)
+        if name in picked:
+            continue
+        if name in wanted or (with_description and _norm(name) in DESCRIPTION_ALIASES):
+            picked[name] = i
+    return sorted(((i, n) for n, i in picked.items()), key=lambda x: x[0])
+
+
+def _disable_fast_path(e: Exception):
+    global _FAST_PATH
+    if _FAST_PATH:
+        _FAST_PATH = False
+        logging.warning(
+            f"ts_reader: openpyxl belső API hiba ({type(e).__name__}: {e}), "
+            "load_workbook(read_only=True) útvonalra váltunk"
+        )
+
+
+class _Book:
+    """Megnyitott munkafüzet: gyors út (belső API) vagy nyilvános read_only.
+
+    A gyors út a load_workbook(read_only=True)-val szemben nem példányosít
+    minden lapot (és nem olvassa ki mindegyik dimenzióját): csak a
+    workbook.xml-t olvassuk, a lapot a hívó nyitja meg név szerint (sheet()).
+    sheets: {lapnév: XML útvonal} (a nyilvános úton az érték None).
+    """
+
+    def __init__(self, path: str | os.PathLike, with_cells: bool = True):
+        self.path = path
+        self.with_cells = with_cells
+        self.sheets: dict[str, str | None] = {}
+        self._reader = None
+        self._wb = None
+        if _FAST_PATH:
+            try:
+                self._open_fast()
+            except _FAST_PATH_ERRORS as e:
+                self._close()
+                _disable_fast_path(e)
+        if self._reader is None:
+            self._open_public()
+
+    def _open_fast(self):
+        if _IMPORT_ERROR is not None:
+            raise _IMPORT_ERROR
+        self._reader = reader = ExcelReader(
+            self.path, read_only=True, keep_vba=False, data_only=True, keep_links=False
+        )
+        reader.read_manifest()
+        if self.with_cells:
+            reader.read_strings()
+        reader.read_workbook()
+        if self.with_cells:
+            apply_stylesheet(reader.archive, reader.wb)  # dátumformátumokhoz kell
+        self.sheets = {sh.name: rel.target for sh, rel in reader.parser.find_sheets()}
+
+    def _open_public(self):
+        self._wb = load_workbook(self.path, read_only=True, data_only=True, keep_links=False)
+        self.sheets = {name: None for name in self._wb.sheetnames}
+
+    def sheet(self, name: str):
+        if name not in self.sheets:
+            raise KeyError(f"Worksheet {name} does not exist.")
+        if self._reader is not None:
+            reader = self._reader
+            try:
+                return ReadOnlyWorksheet(reader.wb, name, self.sheets[name], reader.shared_strings)
+            except _FAST_PATH_ERRORS as e:
+                self._close()
+                _disable_fast_path(e)
+                self._open_public()
+        return self._wb[name]
+
+    def _close(self):
+        if self._reader is not None:
+            archive = getattr(self._reader, "archive", None)
+            if archive is not None:
+                archive.close()
+            self._reader = None
+        if self._wb is not None:
+            self._wb.close()
+            self._wb = None
+
+
+@contextmanager
+def _open_book(path: str | os.PathLike, with_cells: bool = True) -> Iterator[_Book]:
+    book = _Book(path, with_cells)
+    try:
+        yield book
+    finally:
+        book._close()
+
+
+def _iter_ws_rows(
+    ws, columns: Sequence[str], nrows: int, with_description: bool
+) -> Iterator[tuple[int, dict]]:
+    header_row = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+    picked = _pick_columns(header_row, columns, with_description)
+    yield 1, {n: n for _, n in picked}
+    if not picked:
+        return
+    max_col = picked[-1][0] + 1
+    for r_idx, row in enumerate(
+        ws.iter_rows(min_row=2, max_row=nrows + 1, max_col=max_col, values_only=True),
+        start=2,
+    ):
+        yield r_idx, {
+            n: _convert(row[i] if i < len(row) else None) for i, n in picked
+        }
+
+
+def _frame_from_rows(it: Iterator[tuple[int, dict]]) -> pd.DataFrame:
+    _, header = next(it)
+    names = list(header)
+    data: list[list] = []
+    last_used = 0
+    for r_idx, values in it:
+        row = [values[n] for n in names]
+        data.append(row)
+        if any(not (isinstance(v, float) and math.isnan(v)) for v in row):
+            last_used = len(data)
+    data = data[:last_used]  # záró üres sorok levágása
+    return pd.DataFrame(data, columns=names, index=range(len(data)), dtype=object)
+
+
+def iter_month_rows(
+    path: str | os.PathLike,
+    sheet: str,
+    columns: Sequence[str] = TS_COLUMNS,
+    nrows: int = MAX_ROWS_PER_SHEET,
+    with_description: bool = True,
+) -> Iterator[tuple[int, dict]]:
+    """(Excel sorszám, {oszlop: érték}) párokat ad a lap adatsoraira.
+
+    Az első elem a fejlécből kiválasztott oszlopnevek listája (sorszám 1).
+    """
+    with _open_book(path) as book:
+        ws = book.sheet(sheet)
+        yield from _iter_ws_rows(ws, columns, nrows, with_description)
+
+
+def read_month_sheet(
+    path: str | os.PathLike,
+    sheet: str,
+    columns: Sequence[str] = TS_COLUMNS,
+    nrows: int = MAX_ROWS_PER_SHEET,
+    with_description: bool = True,
+) -> pd.DataFrame:
+    """A lap szükséges oszlopai DataFrame-ben (index = Excel sor - 2)."""
+    return _frame_from_rows(iter_month_rows(path, sheet, columns, nrows, with_description))
+
+
+def read_month_sheets(
+    path: str | os.PathLike,
+    sheets: Sequence[str],
+    columns: Sequence[str] = TS_COLUMNS,
+    nrows: int = MAX_ROWS_PER_SHEET,
+    with_description: bool = True,
+) -> dict[str, pd.DataFrame]:
+    """Több hónap-lap egyetlen megnyitással (teljes év): {lapnév: DataFrame}.
+
+    A zip, a shared strings és a stílusok egyszer töltődnek be, a lapok
+    egymás után streamelődnek; ismeretlen lapnévnél KeyError.
+    """
+    out: dict[str, pd.DataFrame] = {}
+    with _open_book(path) as book:
+        for sheet in sheets:
+            ws = book.sheet(sheet)
+            out[sheet] = _frame_from_rows(
+                _iter_ws_rows(ws, columns, nrows, with_description)
+            )
+    return out
+
+
+def workbook_sheet_names(path: str | os.PathLike) -> list[str]:
+    """Lapnevek a workbook.xml-ből (lapok, cellák beolvasása nélkül)."""
+    with _open_book(path, with_cells=False) as book:
+        return list(book.sheets)
+
+
+__all__ = [
+    "MAX_ROWS_PER_SHEET",
+    "TS_COLUMNS",
+    "DESCRIPTION_ALIASES",
+    "iter_month_rows",
+    "read_month_sheet",
+    "read_month_sheets",
+    "workbook_sheet_names",
+]
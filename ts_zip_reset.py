@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Zip-szintű (openpyxl nélküli) hónap-lap ürítés a reset_timesheets-hez.
+
+A load_workbook + cell.value = None + save út minden lapot, stílust,
+validációt objektummá épít, majd az egészet újraírja. Itt a munkafüzet zip
+bejegyzéseit részenként másoljuk át egy új zip-be; csak a hónap-lapok XML-je
+változik, és abban is csak a <sheetData>:
+
+- a 2..max_rows sor, A..clear_until_col oszlop celláiból eltűnik az érték
+  (<v>, <f>, <is>, t=...), a cella stílusa (s=...) megmarad — stílus nélküli
+  cella egyszerűen kimarad, ahogy az openpyxl is tenné;
+- minden más (fejléc, Y/Z segédoszlopok, <sheetData> utáni validációk,
+  feltételes formázás, oszlopszélességek, rajzok, többi lap) bájtra azonos.
+
+A calcChain.xml (képlet-számítási sorrend) kikerül, hiszen törölt
+képletcellákra mutathatna; az Excel megnyitáskor újraépíti (az openpyxl sem
+menti). A sharedStrings.xml változatlan: a már nem hivatkozott szövegeket az
+Excel a következő mentéskor elhagyja.
+
+Ha egy törölt cella megosztott képlet (shared formula) "mestere", amire a
+tartományon kívüli cella is hivatkozik, a lap nem üríthető így —
+ZipResetError, a hívó ilyenkor openpyxl-lel dolgozik.
+
+Usage:
+    from ts_zip_reset import reset_workbook
+    n = reset_workbook("archív/TS GP.xlsx", "TS GP.xlsx", max_rows=300, clear_until_col="X")
+"""
+from __future__ import annotations
+
+import os
+import posixpath
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+from ts_constants import HONAPOK, remove_accents
+
+
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_CALC_CHAIN_TYPE = "/calcChain"
+
+# <row ...>...</row> / <row .../> és <c ...>...</c> / <c .../> (opcionális névtér előtaggal)
+_ROW_RE = re.compile(rb"<((?:\w+:)?)row\b([^>]*?)(?:/>|>(.*?)</\1row>)", re.S)
+_CELL_RE = re.compile(rb"<((?:\w+:)?)c\b([^>]*?)(?:/>|>(.*?)</\1c>)", re.S)
+_F_RE = re.compile(rb"<(?:\w+:)?f\b([^>]*)", re.S)
+_SHEETDATA_RE = re.compile(rb"<((?:\w+:)?)sheetData\b[^>]*?(?:/>|>(.*?)</\1sheetData>)", re.S)
+_R_ATTR = re.compile(rb'\br="([^"]*)"')
+_S_ATTR = re.compile(rb'\bs="([^"]*)"')
+_T_SHARED = re.compile(rb'\bt="shared"')
+_SI_ATTR = re.compile(rb'\bsi="([^"]*)"')
+_REF_ATTR = re.compile(rb'\bref="')
+_COORD_RE = re.compile(rb"([A-Z]+)(\d+)")
+
+
+class ZipResetError(Exception):
+    """A lap nem üríthető zip-szinten (pl. megosztott képlet a határon)."""
+
+
+def _norm(s) -> str:
+    return remove_accents(s or "").strip().lower()
+
+
+# -------------------------
+# Munkafüzet szerkezet (workbook.xml + rels)
+# -------------------------
+def _workbook_part(zf: zipfile.ZipFile) -> str:
+    if "xl/workbook.xml" in zf.NameToInfo:
+        return "xl/workbook.xml"
+    root = ET.fromstring(zf.read("_rels/.rels"))
+    for rel in root.iter(f"{{{_PKG_REL_NS}}}Relationship"):
+        if rel.get("Type", "").endswith("/officeDocument"):
+            return posixpath.normpath(rel.get("Target", "").lstrip("/"))
+    raise KeyError("Nincs workbook rész a munkafüzetben")
+
+
+def _rels_part(part: str) -> str:
+    d, f = posixpath.split(part)
+    return posixpath.join(d, "_rels", f + ".rels")
+
+
+def _resolve(base_part: str, target: str) -> str:
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(posixpath.dirname(base_part), target))
+
+
+def month_sheet_parts(zf: zipfile.ZipFile, months=HONAPOK) -> dict[str, str]:
+    """{lap XML útvonal: lapnév} a hónap-lapokra."""
+    wb_part = _workbook_part(zf)
+    rels = ET.fromstring(zf.read(_rels_part(wb_part)))
+    targets = {
+        rel.get("Id"): _resolve(wb_part, rel.get("Target", ""))
+        for rel in rels.iter(f"{{{_PKG_REL_NS}}}Relationship")
+    }
+    wanted = set(months)
+    out = {}
+    for el in ET.fromstring(zf.read(wb_part)).iter():
+        if el.tag.rsplit("}", 1)[-1] != "sheet":
+            continue
+        name = el.get("name")
+        rid = el.get(f"{{{_REL_NS}}}id")
+        if name is not None and _norm(name) in wanted and rid in targets:
+            out[targets[rid]] = name
+    return out
+
+
+# -------------------------
+# Lap XML ürítés
+# -------------------------
+def _shared_si(content: bytes | None) -> tuple[bytes | None, bool]:
+    """(si, mester-e) egy cella <f t="shared"> eleméből, ha van."""
+    if not content:
+        return None, False
+    m = _F_RE.search(content)
+    if not m or not _T_SHARED.search(m.group(1)):
+        return None, False
+    si = _SI_ATTR.search(m.group(1))
+    return (si.group(1) if si else None), bool(_REF_ATTR.search(m.group(1)))
+
+
+def clear_sheet_xml(data: bytes, max_rows: int, max_col: int) -> bytes:
+    """A 2..max_rows sor 1..max_col oszlopának értékei nélkül (stílus marad)."""
+    m = _SHEETDATA_RE.search(data)
+    if not m or m.group(2) is None:
+        return data  # üres lap (<sheetData/>)
+
+    cleared_masters: set[bytes] = set()
+    kept_shared: set[bytes] = set()
+
+    def rewrite_row(rm: re.Match) -> bytes:
+        prefix, attrs, content = rm.group(1), rm.group(2), rm.group(3)
+        r = _R_ATTR.search(attrs)
+        row = int(r.group(1)) if r else rewrite_row.next_row
+        rewrite_row.next_row = row + 1
+        if content is None or not (2 <= row <= max_rows):
+            if content:
+                for cm in _CELL_RE.finditer(content):
+                    si, _ = _shared_si(cm.group(3))
+                    if si is not None:
+                        kept_shared.add(si)
+            return rm.group(0)
+
+        out = []
+        col = 0
+        for cm in _CELL_RE.finditer(content):
+            cprefix, cattrs, ccontent = cm.group(1), cm.group(2), cm.group(3)
+            ref = _R_ATTR.search(cattrs)
+            if ref:
+                cref = _COORD_RE.fullmatch(ref.group(1))
+                col = column_index_from_string(cref.group(1).decode()) if cref else col + 1
+            else:
+                col += 1
+            si, master = _shared_si(ccontent)
+            coord = f"{get_column_letter(col)}{row}".encode()
+            if col > max_col:
+                if si is not None:
+                    kept_shared.add(si)
+                if ref:
+                    out.append(cm.group(0))
+                else:  # implicit pozíció: explicit r kell, ha előtte cella kimaradt
+                    head = b"<" + cprefix + b"c"
+                    out.append(head + b' r="' + coord + b'"' + cm.group(0)[len(head) :])
+                continue
+            if si is not None and master:
+                cleared_masters.add(si)
+            s = _S_ATTR.search(cattrs)
+            if s:
+                out.append(b"<" + cprefix + b'c r="' + coord + b'" s="' + s.group(1) + b'"/>')
+        return b"<" + prefix + b"row" + attrs + b">" + b"".join(out) + b"</" + prefix + b"row>"
+
+    rewrite_row.next_row = 1
+    body = _ROW_RE.sub(rewrite_row, m.group(2))
+    if cleared_masters & kept_shared:
+        raise ZipResetError("megosztott képlet mestere a törölt tartományban")
+    return data[: m.start(2)] + body + data[m.end(2) :]
+
+
+# -------------------------
+# calcChain eltávolítás
+# -------------------------
+def _drop_calc_chain_rel(data: bytes) -> bytes:
+    return re.sub(
+        rb"<(?:\w+:)?Relationship\b[^>]*Type=\"[^\"]*" + re.escape(_CALC_CHAIN_TYPE.encode()) + rb"\"[^>]*/>",
+        b"",
+        data,
+    )
+
+
+def _drop_calc_chain_override(data: bytes, part: str) -> bytes:
+    return re.sub(
+        rb"<(?:\w+:)?Override\b[^>]*PartName=\"/" + re.escape(part.encode()) + rb"\"[^>]*/>",
+        b"",
+        data,
+    )
+
+
+def reset_workbook(
+    src: str | os.PathLike,
+    dst: str | os.PathLike,
+    max_rows: int,
+    clear_until_col: str,
+    months=HONAPOK,
+) -> int:
+    """src → dst másolat a hónap-lapok A2:{col}{max_rows} értékei nélkül.
+
+    Visszaadja az ürített lapok számát. dst-t atomikusan cseréli (tmp + replace).
+    """
+    max_col = column_index_from_string(clear_until_col)
+    dst = os.fspath(dst)
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    try:
+        with zipfile.ZipFile(src) as zin:
+            parts = month_sheet_parts(zin, months)
+            wb_part = _workbook_part(zin)
+            wb_rels = _rels_part(wb_part)
+            calc_chain = posixpath.join(posixpath.dirname(wb_part), "calcChain.xml")
+            has_chain = calc_chain in zin.NameToInfo
+            with zipfile.ZipFile(tmp, "w") as zout:
+                for info in zin.infolist():
+                    name = info.filename
+                    if has_chain and name == calc_chain:
+                        continue
+                    data = zin.read(info)
+                    if name in parts:
+                        data = clear_sheet_xml(data, max_rows, max_col)
+                    elif has_chain and name == wb_rels:
+                        data = _drop_calc_chain_rel(data)
+                    elif has_chain and name == "[Content_Types].xml":
+                        data = _drop_calc_chain_override(data, calc_chain)
+                    # az eredeti ZipInfo: név, dátum, tömörítés változatlan
+                    zout.writestr(info, data)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return len(parts)
+
+
+__all__ = ["ZipResetError", "clear_sheet_xml", "month_sheet_parts", "reset_workbook"]
@@ -1,6 +1,37 @@
 # -*- coding: utf-8 -*-
-import xlwings as xw
-import pandas as pd
+# update_dropdowns.py — Y/Z segédlisták + D/E legördülők frissítése a TS fájlokban
+#
+# Két motor:
+#   xlwings (alap):  az Excel COM alapú út (asztali Excel kell hozzá), sorosan,
+#                    egyetlen saját App példányban; a munkafüzet minden eleme
+#                    (alakzatok, képek, megjegyzések, x14 validációk) megmarad.
+#   openpyxl:        Excel nélkül, közvetlenül a fájlba írja a listákat és a
+#                    D2:D301 / E2:E301 lista-validációkat, folyamatkészletben
+#                    (ProcessPool). Teljes openpyxl betöltés/mentés: ami az
+#                    openpyxl modelljébe nem fér (alakzatok, képek, x14
+#                    kiterjesztések), elveszik — csak kifejezett választásra
+#                    (pl. Excel nélküli batch gépen).
+#
+# A motor: --engine, ennek hiányában a TS_DROPDOWN_ENGINE környezeti változó
+# (a GUI a "dropdown_engine" beállításból adja), különben xlwings.
+#
+# Usage:
+#   python update_dropdowns.py
+#   python update_dropdowns.py --engine openpyxl
+#   python update_dropdowns.py --engine openpyxl --workers 4 --months januar februar
+#   python update_dropdowns.py --force        # a naprakész fájlokat is újraírja
+#   python update_dropdowns.py --layout names # listák egy rejtett "Lists" lapon
+#
+# Elrendezés (--layout):
+#   columns (alap): minden frissített hónap lap Y/Z oszlopa a saját listamásolat.
+#   names:          a listák munkafüzetenként egyszer, a rejtett "Lists" lapon
+#                   (A: ügyfélkódok, B: projektek), munkafüzet-szintű nevekkel
+#                   (UgyfelkodLista, ProjektLista); a D/E validációk ezekre a
+#                   nevekre mutatnak. Kódváltozáskor csak a Lists lap íródik.
+#
+# Naprakész fájlok kihagyása: a frissítés a kódlisták hash-ét egyéni
+# dokumentum-tulajdonságként a fájlba írja (dropdown_stamp); ha a következő
+# futáskor a hash egyezik, a fájlt meg sem nyitjuk.
 import os
 import unicodedata
 from datetime import datetime
@@ -8,30 +39,62 @@ import logging
 from pathlib import Path
 import time
 import sys
+import argparse
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+
+from openpyxl import load_workbook
+from openpyxl.workbook.defined_name import DefinedName
+from openpyxl.worksheet.cell_range import CellRange
+from openpyxl.worksheet.datavalidation import DataValidation
+
+import master_data
+import progress
+from dropdown_stamp import code_list_hash, is_up_to_date, stamp_openpyxl, stamp_xlwings
 
 # =========================
 # Config
 # =========================
 FOLDER_PATH = "."
-ECOVIS_PATH = "Ecovis Compliance Solution számlázási adatok_2025.xlsx"
-TS_KODOK_SHEET = "TS kódok"
+ECOVIS_PATH = master_data.COMPLIANCE_FILE
+TS_KODOK_SHEET = master_data.TS_KODOK_SHEET
+ENGINES = ("xlwings", "openpyxl")
+DEFAULT_ENGINE = "xlwings"
+ENGINE_ENV = "TS_DROPDOWN_ENGINE"
+
+# Segédoszlopok (Y: ügyfélkódok, Z: projektek) és a validált blokkok
+LIST_FIRST_ROW = 2
+LIST_LAST_ROW = 1000
+CLIENT_COL, PROJECT_COL = 25, 26  # Y, Z
+VALIDATED_BLOCKS = ("D2:D301", "E2:E301")
+
+# "names" elrendezés: rejtett listalap + munkafüzet-szintű definiált nevek
+LAYOUTS = ("columns", "names")
+LISTS_SHEET = "Lists"
+CLIENT_LIST_NAME = "UgyfelkodLista"
+PROJECT_LIST_NAME = "ProjektLista"
 
 # =========================
 # Logging setup (UTF-8)
 # =========================
 LOG_DIR = Path("logs")
-LOG_DIR.mkdir(exist_ok=True)
-LOG_FILE = LOG_DIR / f"update_dropdowns_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding="utf-8"),
-        logging.StreamHandler(sys.stdout),
-    ],
-)
-logging.info("▶ update_dropdowns started")
-logging.info(f"Log file: {LOG_FILE.resolve()}")
+
+
+def setup_logging() -> Path:
+    # csak a fő folyamatban — a pool worker-ek naplósorokat adnak vissza
+    LOG_DIR.mkdir(exist_ok=True)
+    log_file = LOG_DIR / f"update_dropdowns_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[
+            logging.FileHandler(log_file, encoding="utf-8"),
+            logging.StreamHandler(sys.stdout),
+        ],
+    )
+    return log_file
 
 
 # =========================
@@ -57,168 +120,526 @@ HONAPOK = [
     "november",
     "december",
 ]
-cur_idx = datetime.now().month - 1
-TARGET_MONTHS = HONAPOK[cur_idx:]
-logging.info(f"Csak ezek a hónapok frissülnek: {', '.join(TARGET_MONTHS)}")
 
-# =========================
-# Load Ecovis data once
-# =========================
-try:
-    ecovis_df = pd.read_excel(ECOVIS_PATH, sheet_name=TS_KODOK_SHEET)
-    ceg = pd.read_excel(ECOVIS_PATH, sheet_name="Cégadatok")
-    active_clients = set(
-        ceg[ceg["Ügyfél aktív"].astype(str).str.strip().str.lower() == "igen"]["Ügyfélkód"].astype(str)
+
+def default_target_months() -> list[str]:
+    # az aktuális hónaptól az év végéig
+    return HONAPOK[datetime.now().month - 1 :]
+
+
+def is_ts_file(name: str) -> bool:
+    return name.endswith(".xlsx") and "TS" in name and not name.startswith("~$")
+
+
+def default_engine() -> str:
+    engine = os.environ.get(ENGINE_ENV, "").strip().lower()
+    return engine if engine in ENGINES else DEFAULT_ENGINE
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="TS legördülő listák frissítése")
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=default_engine(),
+        help=f"xlwings (alap, Excel COM) vagy openpyxl (Excel nélkül, párhuzamosan); alap: ${ENGINE_ENV}",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Párhuzamos folyamatok száma az openpyxl motorhoz (1 = soros)",
+    )
+    parser.add_argument(
+        "--months",
+        nargs="+",
+        default=None,
+        help="Frissítendő hónap lapok (alap: az aktuális hónaptól év végéig)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Naprakész (azonos kódlista-hash-ű) fájlok frissítése is",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=LAYOUTS,
+        default="columns",
+        help="columns: Y/Z lista minden hónap lapon (alap); names: egy rejtett Lists lap + definiált nevek",
     )
+    return parser.parse_args(argv)
 
+
+# =========================
+# Ecovis adatok (egyszer)
+# =========================
+def load_code_lists() -> tuple[list[str], list[str]]:
+    # Cégadatok + TS kódok a master_data-ból (egyszer beolvasva, snapshot-tal)
+    active_clients = master_data.active_clients(ECOVIS_PATH)
     ugyfelkodok = sorted(
-        [
-            x
-            for x in ecovis_df["Ügyfélkód"].dropna().astype(str).unique()
-            if x in active_clients
-        ],
+        [x for x in master_data.ts_codes(ECOVIS_PATH) if x in active_clients],
         key=remove_accents,
     )
+    projektnevek = sorted(master_data.ts_projects(ECOVIS_PATH), key=remove_accents)
+    return ugyfelkodok, projektnevek
 
-    projektnevek = sorted(
-        ecovis_df["Projekt neve"].dropna().astype(str).unique(), key=remove_accents
-    )
-    logging.info(
-        f"Loaded TS kódok: {len(ugyfelkodok)} ügyfélkód, {len(projektnevek)} projekt"
+
+def list_formulas(
+    ugyfelkodok: list[str], projektnevek: list[str], layout: str = "columns"
+) -> tuple[str, str]:
+    """Képletek a validációhoz: Y / Z segédoszlop, vagy a definiált nevek."""
+    if layout == "names":
+        return f"={CLIENT_LIST_NAME}", f"={PROJECT_LIST_NAME}"
+    return (
+        f"=$Y$2:$Y${1 + len(ugyfelkodok)}",
+        f"=$Z$2:$Z${1 + len(projektnevek)}",
     )
-except Exception as e:
-    logging.exception(f"❌ Nem sikerült betölteni a TS kódok adatot: {e}")
-    raise
 
-# =========================
-# Counters
-# =========================
-start_time = time.time()
-processed = 0
-skipped = 0
-errors = 0
-skipped_workers: list[str] = []
+
+def list_name_refs(ugyfelkodok: list[str], projektnevek: list[str]) -> dict[str, str]:
+    """Definiált név → hivatkozás a Lists lapon (A: ügyfélkódok, B: projektek)."""
+    return {
+        CLIENT_LIST_NAME: f"{LISTS_SHEET}!$A$2:$A${1 + len(ugyfelkodok)}",
+        PROJECT_LIST_NAME: f"{LISTS_SHEET}!$B$2:$B${1 + len(projektnevek)}",
+    }
+
 
 # =========================
-# Main
+# openpyxl motor (worker)
 # =========================
-# FONTOS: saját App példány kezelése, hogy ne maradjanak üres EXCEL.EXE-k
-app = None
-try:
-    # add_book=False => NEM nyit “Book1”-et; visible=False => nem villog a GUI
-    app = xw.App(visible=False, add_book=False)
-    app.display_alerts = False
-    app.screen_updating = False
-
-    for file in os.listdir(FOLDER_PATH):
-        if not (file.endswith(".xlsx") and "TS" in file and not file.startswith("~$")):
-            continue
-
-        file_path = os.path.join(FOLDER_PATH, file)
-        logging.info(f"🔧 Feldolgozás: {file}")
-
-        wb = None
-        try:
-            # Mindig az általunk kezelt app-ban nyissunk!
-            wb = app.books.open(file_path, update_links=False, read_only=False)
-
-            for ws in wb.sheets:
-                sheet_norm = remove_accents(ws.name)
-                if sheet_norm not in TARGET_MONTHS:
-                    continue
-
-                logging.info(f"  ➔ Sheet: {ws.name}")
-
-                # 0) Inicializálás: üres cellák kitöltése, hogy Validation ne akadjon fenn
-                #    (gyorsabb blokkonként írni, de hagyjuk egyszerűen és stabilan)
-                for row in range(2, 302):
-                    for col in ("D", "E"):
-                        rng = ws.range(f"{col}{row}")
-                        if rng.value is None:
-                            rng.value = ""
-
-                # 1) Segédoszlopok ürítése + feltöltése (Y: ügyfélkódok, Z: projektek)
-                ws.range("Y2:Y1000").clear_contents()
-                ws.range("Z2:Z1000").clear_contents()
-                ws.range("Y2").options(transpose=True).value = ugyfelkodok
-                ws.range("Z2").options(transpose=True).value = projektnevek
-
-                # 2) Tartomány képletek a validációhoz
-                client_formula = f"=$Y$2:$Y${1 + len(ugyfelkodok)}"
-                project_formula = f"=$Z$2:$Z${1 + len(projektnevek)}"
-
-                # 3) Data validation a D és E oszlopokra (2..301)
-                d_block = ws.range("D2:D301").api
-                e_block = ws.range("E2:E301").api
-
-                # Töröljük a meglévő validációkat (ha lennének)
-                try:
-                    d_block.Validation.Delete()
-                except Exception:
-                    pass
-                try:
-                    e_block.Validation.Delete()
-                except Exception:
-                    pass
+def _subtract_range(rng: CellRange, block: CellRange) -> list[CellRange]:
+    """rng \\ block téglalapokként (mint az Excel Validation.Delete egy
+    résztartományon: a blokkon kívüli rész validációja megmarad)."""
+    if rng.isdisjoint(block):
+        return [rng]
+    parts = []
+    if rng.min_row < block.min_row:  # felette
+        parts.append((rng.min_col, rng.min_row, rng.max_col, block.min_row - 1))
+    if rng.max_row > block.max_row:  # alatta
+        parts.append((rng.min_col, block.max_row + 1, rng.max_col, rng.max_row))
+    top, bottom = max(rng.min_row, block.min_row), min(rng.max_row, block.max_row)
+    if rng.min_col < block.min_col:  # balra
+        parts.append((rng.min_col, top, block.min_col - 1, bottom))
+    if rng.max_col > block.max_col:  # jobbra
+        parts.append((block.max_col + 1, top, rng.max_col, bottom))
+    return [
+        CellRange(min_col=a, min_row=b, max_col=c, max_row=d) for a, b, c, d in parts
+    ]
 
-                # Add: Type=3 (xlValidateList), AlertStyle=1 (Stop), Operator=1 (Between)
-                d_block.Validation.Add(3, 1, 1, client_formula)
-                e_block.Validation.Add(3, 1, 1, project_formula)
 
-            wb.save()
-            wb.close()
-            processed += 1
-            logging.info(f"✅ Kész: {file}")
+def _clear_validations(ws, block: CellRange):
+    """A blokkot érintő meglévő validációk eltávolítása a blokkból."""
+    kept = []
+    for dv in ws.data_validations.dataValidation:
+        ranges = []
+        for rng in dv.sqref.ranges:
+            ranges.extend(_subtract_range(rng, block))
+        if ranges:
+            dv.sqref = " ".join(r.coord for r in ranges)
+            kept.append(dv)
+    ws.data_validations.dataValidation = kept
 
-        except Exception as e:
-            errors += 1
-            logging.exception(f"❌ Hiba feldolgozás közben: {file} — {e}")
-            try:
-                if wb is not None:
-                    wb.close()
-            except Exception:
-                pass
-            # ha nyitási hiba volt (pl. megnyitás írásvédetten), számoljuk kihagyásnak is
-            if "wb is None" or "Cannot open" in str(e):
-                skipped += 1
-                skipped_workers.append(file)
 
-    # Skip report
-    if skipped_workers:
+def _fill_list(ws, col: int, values: list[str]):
+    # 1) ürítés (csak a lap meglévő soráig — üres cellákat nem hozunk létre)
+    last = min(LIST_LAST_ROW, ws.max_row)
+    for (cell,) in ws.iter_rows(min_row=LIST_FIRST_ROW, max_row=last, min_col=col, max_col=col):
+        cell.value = None
+    # 2) feltöltés
+    for i, v in enumerate(values, start=LIST_FIRST_ROW):
+        ws.cell(row=i, column=col, value=v)
+
+
+def update_lists_sheet_openpyxl(wb, ugyfelkodok: list[str], projektnevek: list[str]):
+    """names elrendezés: a rejtett Lists lap + a munkafüzet-szintű nevek."""
+    if LISTS_SHEET in wb.sheetnames:
+        ws = wb[LISTS_SHEET]
+    else:
+        ws = wb.create_sheet(LISTS_SHEET)
+        ws["A1"], ws["B1"] = "Ügyfélkód", "Projekt"
+    ws.sheet_state = "hidden"
+    _fill_list(ws, 1, ugyfelkodok)
+    _fill_list(ws, 2, projektnevek)
+    for name, ref in list_name_refs(ugyfelkodok, projektnevek).items():
+        wb.defined_names[name] = DefinedName(name, attr_text=ref)
+
+
+def update_sheet_openpyxl(
+    ws, ugyfelkodok: list[str], projektnevek: list[str], layout: str = "columns"
+):
+    # A 0) lépés (üres D/E cellák ""-re állítása) csak az Excel COM-nak kellett;
+    # fájlszinten a validáció üres cellán is érvényes, ezért itt elmarad.
+    # names elrendezésben a lap saját Y/Z másolata megszűnik (a D/E validációk
+    # a definiált nevekre állnak át).
+    names = layout == "names"
+    _fill_list(ws, CLIENT_COL, [] if names else ugyfelkodok)
+    _fill_list(ws, PROJECT_COL, [] if names else projektnevek)
+
+    for ref, formula in zip(VALIDATED_BLOCKS, list_formulas(ugyfelkodok, projektnevek, layout)):
+        _clear_validations(ws, CellRange(ref))
+        # mint a Validation.Add(3, 1, 1, ...): lista, Stop figyelmeztetés, üres engedett
+        dv = DataValidation(
+            type="list",
+            formula1=formula.lstrip("="),
+            allow_blank=True,
+            errorStyle="stop",
+            showErrorMessage=True,
+            showInputMessage=True,
+        )
+        dv.add(ref)
+        ws.add_data_validation(dv)
+
+
+def update_file_openpyxl(
+    file: str,
+    folder: str,
+    target_months: list[str],
+    ugyfelkodok: list[str],
+    projektnevek: list[str],
+    digest: str | None = None,
+    layout: str = "columns",
+) -> dict:
+    """Egy TS fájl frissítése (worker folyamatban is futhat); a digest (ha
+    van) a kódlista-hash, amit mentés előtt a fájlba írunk.
+
+    A naplósorokat visszaadja ((szint, üzenet) párok) — a fő folyamat írja ki.
+    """
+    file_path = os.path.join(folder, file)
+    res = {"file": file, "ok": False, "skipped": False, "sheets": 0, "log": []}
+    log = res["log"]
+    log.append((logging.INFO, f"🔧 Feldolgozás: {file}"))
+
+    try:
+        wb = load_workbook(file_path)
+    except Exception as e:
+        # nem nyitható (sérült / zárolt) → kihagyás
+        log.append((logging.ERROR, f"❌ Nem nyitható: {file} — {e}"))
+        res["skipped"] = True
+        return res
+
+    try:
+        if layout == "names":
+            update_lists_sheet_openpyxl(wb, ugyfelkodok, projektnevek)
+        for ws in wb.worksheets:
+            if remove_accents(ws.title) not in target_months:
+                continue
+            log.append((logging.INFO, f"  ➔ Sheet: {ws.title}"))
+            update_sheet_openpyxl(ws, ugyfelkodok, projektnevek, layout)
+            res["sheets"] += 1
+        if digest:
+            stamp_openpyxl(wb, digest)
+
+        # atomikus csere: félbeszakadt mentés ne tegye tönkre a TS fájlt
+        tmp = f"{file_path}.{os.getpid()}.tmp"
         try:
-            with open("update_dropdowns_logs.txt", "w", encoding="utf-8") as f:
-                for worker in skipped_workers:
-                    f.write(worker + "\n")
-                f.write(f"\nGenerálva: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
-            logging.warning(
-                "A kihagyott fájlok listája elmentve: update_dropdowns_logs.txt"
+            wb.save(tmp)
+            os.replace(tmp, file_path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        res["ok"] = True
+        log.append((logging.INFO, f"✅ Kész: {file}"))
+    except PermissionError as e:
+        # Excelben nyitva (Windows zárolja) → kihagyás
+        log.append((logging.ERROR, f"❌ Nem írható (nyitva van?): {file} — {e}"))
+        res["skipped"] = True
+    except Exception as e:
+        log.append(
+            (logging.ERROR, f"❌ Hiba feldolgozás közben: {file} — {e}\n{traceback.format_exc()}")
+        )
+    finally:
+        wb.close()
+    return res
+
+
+def run_openpyxl(
+    files, target_months, ugyfelkodok, projektnevek, workers: int, digest=None, layout="columns"
+):
+    """Eredmények a files sorrendjében (párhuzamosan, ha workers > 1)."""
+    workers = max(1, min(workers, len(files)))
+    if workers == 1:
+        for file in files:
+            yield update_file_openpyxl(
+                file, FOLDER_PATH, target_months, ugyfelkodok, projektnevek, digest, layout
+            )
+        return
+
+    done = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            for res in ex.map(
+                update_file_openpyxl,
+                files,
+                repeat(FOLDER_PATH),
+                repeat(target_months),
+                repeat(ugyfelkodok),
+                repeat(projektnevek),
+                repeat(digest),
+                repeat(layout),
+            ):
+                done += 1
+                yield res
+    except (BrokenProcessPool, OSError) as e:
+        logging.warning(f"⚠️ Párhuzamos feldolgozás megszakadt ({e}), folytatás sorosan")
+        for file in files[done:]:
+            yield update_file_openpyxl(
+                file, FOLDER_PATH, target_months, ugyfelkodok, projektnevek, digest, layout
             )
-        except Exception as e:
-            logging.exception(f"Nem sikerült kiírni a kihagyott fájlok listáját: {e}")
-
-except Exception as top_e:
-    errors += 1
-    logging.exception(f"❌ Váratlan hiba: {top_e}")
-finally:
-    # Mindig zárjuk le az általunk indított App-ot, különben ott marad az EXCEL.EXE
+
+
+# =========================
+# xlwings motor (Excel COM)
+# =========================
+def _update_lists_sheet_xlwings(wb, ugyfelkodok: list[str], projektnevek: list[str]):
+    """names elrendezés: a rejtett Lists lap + a munkafüzet-szintű nevek (COM)."""
+    if LISTS_SHEET in [s.name for s in wb.sheets]:
+        ws = wb.sheets[LISTS_SHEET]
+    else:
+        ws = wb.sheets.add(LISTS_SHEET, after=wb.sheets[-1])
+        ws.range("A1").value = ["Ügyfélkód", "Projekt"]
+    ws.api.Visible = 0  # xlSheetHidden
+    ws.range("A2:B1000").clear_contents()
+    ws.range("A2").options(transpose=True).value = ugyfelkodok
+    ws.range("B2").options(transpose=True).value = projektnevek
+    for name, ref in list_name_refs(ugyfelkodok, projektnevek).items():
+        existing = [n for n in wb.names if n.name == name]
+        if existing:
+            existing[0].refers_to = f"={ref}"
+        else:
+            wb.names.add(name, f"={ref}")
+
+
+def _validation_formula(block) -> str | None:
     try:
-        if app is not None:
-            # Zárjuk, ha véletlen maradt volna nyitott munkafüzet
-            for b in list(app.books):
+        return block.Validation.Formula1
+    except Exception:
+        return None  # nincs validáció a tartományon
+
+
+def run_xlwings(files, target_months, ugyfelkodok, projektnevek, digest=None, layout="columns"):
+    # csak itt importáljuk: az openpyxl motorhoz (és Linuxon) nem kell Excel
+    import xlwings as xw
+
+    client_formula, project_formula = list_formulas(ugyfelkodok, projektnevek, layout)
+
+    # FONTOS: saját App példány kezelése, hogy ne maradjanak üres EXCEL.EXE-k
+    app = None
+    try:
+        # add_book=False => NEM nyit “Book1”-et; visible=False => nem villog a GUI
+        app = xw.App(visible=False, add_book=False)
+        # az EXCEL.EXE nem a gyerekünk (COM indítja): a GUI megszakításkor ezt is leállítja
+        progress.process(app.pid)
+        app.display_alerts = False
+        app.screen_updating = False
+
+        for file in files:
+            file_path = os.path.join(FOLDER_PATH, file)
+            res = {"file": file, "ok": False, "skipped": False, "sheets": 0, "log": []}
+            logging.info(f"🔧 Feldolgozás: {file}")
+
+            wb = None
+            try:
+                # Mindig az általunk kezelt app-ban nyissunk!
+                wb = app.books.open(file_path, update_links=False, read_only=False)
+                if layout == "names":
+                    _update_lists_sheet_xlwings(wb, ugyfelkodok, projektnevek)
+
+                for ws in wb.sheets:
+                    sheet_norm = remove_accents(ws.name)
+                    if sheet_norm not in target_months:
+                        continue
+
+                    # names elrendezés: ha a lap már a nevekre mutat, nincs vele dolgunk
+                    if layout == "names" and (
+                        _validation_formula(ws.range("D2").api) == client_formula
+                        and _validation_formula(ws.range("E2").api) == project_formula
+                    ):
+                        continue
+
+                    logging.info(f"  ➔ Sheet: {ws.name}")
+
+                    # 0) Inicializálás: üres cellák kitöltése, hogy Validation ne akadjon fenn
+                    #    (gyorsabb blokkonként írni, de hagyjuk egyszerűen és stabilan)
+                    for row in range(2, 302):
+                        for col in ("D", "E"):
+                            rng = ws.range(f"{col}{row}")
+                            if rng.value is None:
+                                rng.value = ""
+
+                    # 1) Segédoszlopok ürítése + feltöltése (Y: ügyfélkódok, Z: projektek);
+                    #    names elrendezésben csak ürítés
+                    ws.range("Y2:Y1000").clear_contents()
+                    ws.range("Z2:Z1000").clear_contents()
+                    if layout != "names":
+                        ws.range("Y2").options(transpose=True).value = ugyfelkodok
+                        ws.range("Z2").options(transpose=True).value = projektnevek
+
+                    # 2) Data validation a D és E oszlopokra (2..301)
+                    d_block = ws.range("D2:D301").api
+                    e_block = ws.range("E2:E301").api
+
+                    # Töröljük a meglévő validációkat (ha lennének)
+                    try:
+                        d_block.Validation.Delete()
+                    except Exception:
+                        pass
+                    try:
+                        e_block.Validation.Delete()
+                    except Exception:
+                        pass
+
+                    # Add: Type=3 (xlValidateList), AlertStyle=1 (Stop), Operator=1 (Between)
+                    d_block.Validation.Add(3, 1, 1, client_formula)
+                    e_block.Validation.Add(3, 1, 1, project_formula)
+                    res["sheets"] += 1
+
+                if digest:
+                    stamp_xlwings(wb, digest)
+                wb.save()
+                wb.close()
+                res["ok"] = True
+                logging.info(f"✅ Kész: {file}")
+
+            except Exception as e:
+                logging.exception(f"❌ Hiba feldolgozás közben: {file} — {e}")
                 try:
-                    b.close()
+                    if wb is not None:
+                        wb.close()
                 except Exception:
                     pass
-            app.quit()
-    except Exception:
-        # végső fallback
-        pass
-
-    # Summary
-    duration = time.time() - start_time
-    logging.info("📊 Run summary:")
-    logging.info(f"   ✔ {processed} files processed")
-    logging.info(f"   ⚠ {skipped} skipped")
-    logging.info(f"   ❌ {errors} errors")
-    logging.info(f"   ⏱ Duration: {duration:.1f}s")
-    logging.info("✅ update_dropdowns finished")
+                # nyitási hiba (pl. megnyitás írásvédetten) → kihagyás
+                if wb is None or "Cannot open" in str(e):
+                    res["skipped"] = True
+            yield res
+    finally:
+        # Mindig zárjuk le az általunk indított App-ot, különben ott marad az EXCEL.EXE
+        try:
+            if app is not None:
+                # Zárjuk, ha véletlen maradt volna nyitott munkafüzet
+                for b in list(app.books):
+                    try:
+                        b.close()
+                    except Exception:
+                        pass
+                app.quit()
+        except Exception:
+            # végső fallback
+            pass
+
+
+# =========================
+# Main
+# =========================
+def main(argv=None):
+    log_file = setup_logging()
+    logging.info("▶ update_dropdowns started")
+    logging.info(f"Log file: {log_file.resolve()}")
+
+    args = parse_args(argv)
+    target_months = (
+        [remove_accents(m) for m in args.months] if args.months else default_target_months()
+    )
+    logging.info(f"Csak ezek a hónapok frissülnek: {', '.join(target_months)}")
+
+    try:
+        ugyfelkodok, projektnevek = load_code_lists()
+        logging.info(
+            f"Loaded TS kódok: {len(ugyfelkodok)} ügyfélkód, {len(projektnevek)} projekt"
+        )
+    except Exception as e:
+        logging.exception(f"❌ Nem sikerült betölteni a TS kódok adatot: {e}")
+        raise
+
+    # Counters
+    start_time = time.time()
+    processed = 0
+    skipped = 0
+    up_to_date = 0
+    errors = 0
+    skipped_workers: list[str] = []
+
+    try:
+        files = sorted(f for f in os.listdir(FOLDER_PATH) if is_ts_file(f))
+        progress.start("update_dropdowns", total=len(files))
+
+        # naprakész fájlok: a hash a zip-ből olvasva, megnyitás nélkül
+        digest = code_list_hash(ugyfelkodok, projektnevek, target_months, args.layout)
+        if not args.force:
+            stale = []
+            for f in files:
+                if is_up_to_date(os.path.join(FOLDER_PATH, f), digest):
+                    up_to_date += 1
+                    logging.info(f"⏭ Naprakész, kihagyva: {f}")
+                    progress.file_skipped(f, "naprakész")
+                else:
+                    stale.append(f)
+            files = stale
+
+        if not files:
+            results = []  # minden fájl naprakész: se Excel, se folyamatkészlet
+        elif args.engine == "xlwings":
+            logging.info(f"{len(files)} TS fájl, motor: xlwings (Excel)")
+            results = run_xlwings(
+                files, target_months, ugyfelkodok, projektnevek, digest, args.layout
+            )
+        else:
+            workers = max(1, min(args.workers, len(files)))
+            logging.info(f"{len(files)} TS fájl, motor: openpyxl, {workers} worker")
+            results = run_openpyxl(
+                files, target_months, ugyfelkodok, projektnevek, workers, digest, args.layout
+            )
+
+        for res in results:
+            for level, msg in res["log"]:
+                logging.log(level, msg)
+            if res["ok"]:
+                processed += 1
+            else:
+                errors += 1
+            if res["skipped"]:
+                skipped += 1
+                skipped_workers.append(res["file"])
+                progress.file_skipped(res["file"])
+            elif res["ok"]:
+                progress.file_finished(res["file"])
+            else:
+                progress.file_failed(res["file"])
+
+        # Skip report
+        if skipped_workers:
+            try:
+                with open("update_dropdowns_logs.txt", "w", encoding="utf-8") as f:
+                    for worker in skipped_workers:
+                        f.write(worker + "\n")
+                    f.write(f"\nGenerálva: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
+                logging.warning(
+                    "A kihagyott fájlok listája elmentve: update_dropdowns_logs.txt"
+                )
+            except Exception as e:
+                logging.exception(f"Nem sikerült kiírni a kihagyott fájlok listáját: {e}")
+
+    except Exception as top_e:
+        errors += 1
+        logging.exception(f"❌ Váratlan hiba: {top_e}")
+        progress.error(f"Váratlan hiba: {top_e}")
+    finally:
+        # Summary
+        duration = time.time() - start_time
+        logging.info("📊 Run summary:")
+        logging.info(f"   ✔ {processed} files processed")
+        logging.info(f"   ⏭ {up_to_date} up to date (unchanged code lists)")
+        logging.info(f"   ⚠ {skipped} skipped")
+        logging.info(f"   ❌ {errors} errors")
+        logging.info(f"   ⏱ Duration: {duration:.1f}s")
+        logging.info("✅ update_dropdowns finished")
+        progress.summary(
+            processed=processed,
+            skipped=skipped,
+            up_to_date=up_to_date,
+            errors=errors,
+            seconds=round(duration, 2),
+        )
+
+
+if __name__ == "__main__":
+    main()
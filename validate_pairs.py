@@ -7,10 +7,8 @@ import unicodedata
 from datetime import datetime
 from typing import Optional
 
-from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill
 from openpyxl.drawing.image import Image
-from openpyxl.worksheet.table import Table, TableStyleInfo
 from openpyxl.formatting.rule import Rule
 from openpyxl.styles.differential import DifferentialStyle
 from openpyxl.utils import get_column_letter
@@ -19,6 +17,13 @@ import logging
 from pathlib import Path
 import time
 
+import master_data
+import progress
+import ts_facts
+from report_writer import StreamingReport
+from sheet_index import has_month_sheet
+from ts_cache import sheet_names, read_sheet, read_sheets
+
 # --- LOGGING ---
 LOG_DIR = Path("logs")
 LOG_DIR.mkdir(exist_ok=True)
@@ -33,8 +38,8 @@ logging.info(f"Log file: {LOG_FILE.resolve()}")
 
 # --- CONFIG ---
 FOLDER_PATH = "."
-ECOVIS_PATH = "Ecovis Compliance Solution számlázási adatok_2025.xlsx"
-TS_KODOK_SHEET = "TS kódok"
+ECOVIS_PATH = master_data.COMPLIANCE_FILE
+TS_KODOK_SHEET = master_data.TS_KODOK_SHEET
 MAX_ROWS = 300
 SKIP_MISSING = (
     False  # ha False, a hiányzó Ügyfélkód/Projekt neve sorok is bekerülnek a riportba
@@ -74,6 +79,8 @@ HONAPOK = [
     "december",
 ]
 
+YEAR_ARG = "teljes ev"  # a GUI "Teljes év" opciója, ékezetmentesítve
+
 
 def resolve_selected_month(arg_month: Optional[str]) -> str:
     if arg_month:
@@ -88,142 +95,71 @@ def resolve_selected_month(arg_month: Optional[str]) -> str:
 
 def load_allowed_map() -> dict[str, set[str]]:
     logging.info(f"TS kódok beolvasása: {ECOVIS_PATH} / {TS_KODOK_SHEET}")
-    df = pd.read_excel(
-        ECOVIS_PATH, sheet_name=TS_KODOK_SHEET, usecols=["Ügyfélkód", "Projekt neve"]
-    )
-    df = df.dropna(subset=["Ügyfélkód", "Projekt neve"])
-    df["kod_norm"] = df["Ügyfélkód"].astype(str).map(remove_accents)
-    df["prj_norm"] = df["Projekt neve"].astype(str).map(remove_accents)
-    allowed: dict[str, set[str]] = {}
-    for _, r in df.iterrows():
-        allowed.setdefault(r["kod_norm"], set()).add(r["prj_norm"])
+    md = master_data.load(ECOVIS_PATH)  # folyamatonként egyszer (mtime szerint)
+    allowed = md["allowed"]
     logging.info(
-        f"Engedélyezett párok betöltve: {len(allowed)} ügyfélkód, összesen ~{int(df.shape[0])} sor"
+        f"Engedélyezett párok betöltve: {len(allowed)} ügyfélkód, összesen ~{md['allowed_rows']} sor"
     )
     return allowed
 
 
-def validate_file(
-    ts_path: str, month_norm: str, allowed: dict[str, set[str]]
-) -> list[list]:
+def find_month_sheets(xls_sheets: list[str], month_norm: Optional[str]) -> list[str]:
+    """A keresett hónap lapja; month_norm=None (teljes év) esetén az összes hónap-lap."""
+    if month_norm is None:
+        return [s for s in xls_sheets if remove_accents(s) in HONAPOK]
+    for s in xls_sheets:
+        if remove_accents(s) == month_norm:
+            return [s]
+    return []
+
+
+def validate_file(ts_path: str, month_norm: Optional[str], index: dict) -> list[list]:
+    """Egy TS fájl hibás sorai; month_norm=None esetén mind a 12 hónap-lap,
+    egyetlen munkafüzet-megnyitással beolvasva."""
     rows: list[list] = []
     basename = os.path.basename(ts_path)
     logging.info(f"Feldolgozás: {basename}")
     try:
-        xls = pd.ExcelFile(ts_path)
+        xls_sheets = sheet_names(ts_path)
     except Exception as e:
         rows.append([basename, "-", "-", "-", "-", f"Nem nyitható: {e}"])
         logging.exception(f"Nem nyitható: {basename} — {e}")
         return rows
 
-    # keresett hónap sheet
-    target_sheet = None
-    for s in xls.sheet_names:
-        if remove_accents(s) == month_norm:
-            target_sheet = s
-            break
-    if not target_sheet:
+    # keresett hónap sheet(ek)
+    target_sheets = find_month_sheets(xls_sheets, month_norm)
+    if not target_sheets:
         logging.info(f"Kihagyva (nincs megfelelő hónap sheet): {basename}")
         return rows  # nincs ilyen sheet -> nincs mit ellenőrizni
 
-    logging.info(f"  Sheet: {target_sheet}")
-
     usecols = ["Ügyfélkód", "Projekt neve"]
     try:
-        df = pd.read_excel(
-            xls, sheet_name=target_sheet, usecols=usecols, nrows=MAX_ROWS, dtype=str
-        )
-    except Exception as e:
-        rows.append(
-            [basename, target_sheet, "-", "-", "-", f"Sheet olvasási hiba: {e}"]
-        )
-        logging.exception(f"Sheet olvasási hiba ({basename}/{target_sheet}): {e}")
-        return rows
-
-    for idx, r in df.iterrows():
-        kod_raw = r.get("Ügyfélkód", None)
-        prj_raw = r.get("Projekt neve", None)
-        excel_row = idx + 2  # A1 fejlec, adatok 2-től
-        # load active clients once globally (top of file)
-        ceg = pd.read_excel(ECOVIS_PATH, sheet_name="Cégadatok")
-        active_clients = set(
-            ceg[ceg["Ügyfél aktív"].astype(str).str.strip().str.lower() == "igen"]["Ügyfélkód"].astype(str).map(remove_accents)
-        )
-        
-        if kod_norm not in active_clients:
-            continue  # passzív ügyfél – TS sor kihagyva teljesen
-
-
-        kod_norm = remove_accents(kod_raw)
-        prj_norm = remove_accents(prj_raw)
-        
-        if kod_norm == "eco":
-            continue  # ECO kódot nem ellenőrzünk
-
-        if SKIP_MISSING and (kod_norm == "" or prj_norm == ""):
-            continue
-
-        if kod_norm == "" and prj_norm == "":
-            # rows.append(
-            #     [
-            #         basename,
-            #         target_sheet,
-            #         excel_row,
-            #         str(kod_raw or ""),
-            #         str(prj_raw or ""),
-            #         "Hiányzó Ügyfélkód és Projekt neve",
-            #     ]
-            # )
-            continue
-        if kod_norm == "":
-            rows.append(
-                [
-                    basename,
-                    target_sheet,
-                    excel_row,
-                    "#" if pd.isna(kod_raw) or kod_raw == "" else str(kod_raw),
-                    "#" if pd.isna(prj_raw) or prj_raw == "" else str(prj_raw),
-                    "Hiányzó Ügyfélkód",
-                ]
-            )
-            continue
-        if prj_norm == "":
-            rows.append(
-                [
-                    basename,
-                    target_sheet,
-                    excel_row,
-                    "#" if pd.isna(kod_raw) or kod_raw == "" else str(kod_raw),
-                    "#" if pd.isna(prj_raw) or prj_raw == "" else str(prj_raw),
-                    "Hiányzó Projekt neve",
-                ]
-            )
-            continue
-
-        if kod_norm not in allowed:
+        # közös cache-ből (streamelő olvasó, csak a két oszlop), a hiányzó
+        # lapok egy megnyitással
+        frames = read_sheets(ts_path, target_sheets, nrows=MAX_ROWS, columns=usecols)
+    except Exception:
+        frames = {}  # lapszintű hibakezelés lent, lapról lapra
+
+    for target_sheet in target_sheets:
+        logging.info(f"  Sheet: {target_sheet}")
+        progress.sheet(basename, target_sheet)
+        try:
+            df = frames.get(target_sheet)
+            if df is None:
+                df = read_sheet(ts_path, target_sheet, nrows=MAX_ROWS, columns=usecols)
+            miss = [c for c in usecols if c not in df.columns]
+            if miss:
+                raise ValueError(f"Hiányzó oszlop(ok): {miss}")
+            # ugyanaz a str konverzió, mint a korábbi read_excel(usecols=..., dtype=str) hívásnál
+            df = df[usecols].map(lambda v: v if pd.isna(v) else str(v))
+        except Exception as e:
             rows.append(
-                [
-                    basename,
-                    target_sheet,
-                    excel_row,
-                    str(kod_raw),
-                    str(prj_raw),
-                    "Ismeretlen Ügyfélkód (nincs a TS kódokban)",
-                ]
+                [basename, target_sheet, "-", "-", "-", f"Sheet olvasási hiba: {e}"]
             )
+            logging.exception(f"Sheet olvasási hiba ({basename}/{target_sheet}): {e}")
             continue
 
-        if prj_norm not in allowed[kod_norm]:
-            rows.append(
-                [
-                    basename,
-                    target_sheet,
-                    excel_row,
-                    str(kod_raw),
-                    str(prj_raw),
-                    "Érvénytelen páros: Ügyfélkódhoz ez a Projekt nem engedélyezett",
-                ]
-            )
+        rows.extend(validate_sheet(basename, target_sheet, df, index))
 
     if rows:
         logging.info(f"Hibás sorok a fájlban: {len(rows)}")
@@ -232,6 +168,96 @@ def validate_file(
     return rows
 
 
+ERR_MISSING_CODE = "Hiányzó Ügyfélkód"
+ERR_MISSING_PROJECT = "Hiányzó Projekt neve"
+ERR_UNKNOWN_CODE = "Ismeretlen Ügyfélkód (nincs a TS kódokban)"
+ERR_INVALID_PAIR = "Érvénytelen páros: Ügyfélkódhoz ez a Projekt nem engedélyezett"
+
+
+def build_pair_index() -> dict:
+    """Egyszer felépített ellenőrző index: engedélyezett (kód, projekt) párok
+    DataFrame-ben (anti-joinhoz), az ismert kódok és az aktív ügyfelek halmaza
+    — mind normalizálva (remove_accents)."""
+    allowed = load_allowed_map()
+    pairs = pd.DataFrame(
+        [(k, p) for k, prjs in allowed.items() for p in prjs],
+        columns=["kod_norm", "prj_norm"],
+        dtype=object,
+    )
+    return {
+        "pairs": pairs,
+        "codes": set(allowed),
+        "active": master_data.active_clients_norm(ECOVIS_PATH),
+    }
+
+
+def _norm_series(s: pd.Series) -> pd.Series:
+    """remove_accents oszlopra: csak az egyedi értékeket normalizáljuk."""
+    uniq = s.dropna().unique()
+    mapping = {v: remove_accents(v) for v in uniq}
+    return s.map(mapping).fillna("").astype(object)
+
+
+def _display(raw: pd.Series) -> pd.Series:
+    """Hiányzó értékeknél "#", különben az eredeti szöveg."""
+    return raw.map(lambda v: "#" if pd.isna(v) or v == "" else str(v))
+
+
+def validate_sheet(
+    basename: str, target_sheet: str, df: pd.DataFrame, index: dict
+) -> list[list]:
+    """Egy hónap-lap (Ügyfélkód, Projekt neve) sorainak ellenőrzése, vektorizáltan.
+
+    Sorrend soronként: ECO kód és teljesen üres sor kihagyva → Hiányzó
+    Ügyfélkód → passzív ügyfél kihagyva → Hiányzó Projekt neve → Ismeretlen
+    Ügyfélkód → Érvénytelen páros (anti-join az engedélyezett párokra).
+    """
+    if df.empty:
+        return []
+    kod_raw = df["Ügyfélkód"]
+    prj_raw = df["Projekt neve"]
+    kod_norm = _norm_series(kod_raw)
+    prj_norm = _norm_series(prj_raw)
+
+    miss_k = kod_norm == ""
+    miss_p = prj_norm == ""
+    base = (kod_norm != "eco") & ~(miss_k & miss_p)  # ECO kódot nem ellenőrzünk
+    if SKIP_MISSING:
+        base &= ~(miss_k | miss_p)
+
+    err = pd.Series(None, index=df.index, dtype=object)
+    err[base & miss_k] = ERR_MISSING_CODE
+    # passzív ügyfél – TS sor kihagyva teljesen
+    checked = base & ~miss_k & kod_norm.isin(index["active"])
+    err[checked & miss_p] = ERR_MISSING_PROJECT
+    checked &= ~miss_p
+    unknown = checked & ~kod_norm.isin(index["codes"])
+    err[unknown] = ERR_UNKNOWN_CODE
+    checked &= ~unknown
+
+    # anti-join: a (kód, projekt) pár nincs az engedélyezettek között
+    cand = pd.DataFrame(
+        {"kod_norm": kod_norm[checked], "prj_norm": prj_norm[checked]}
+    )
+    if not cand.empty:
+        merged = cand.reset_index().merge(
+            index["pairs"], on=["kod_norm", "prj_norm"], how="left", indicator=True
+        )
+        invalid = merged.loc[merged["_merge"] == "left_only", "index"]
+        err.loc[invalid.to_numpy()] = ERR_INVALID_PAIR
+
+    hit = err.notna()
+    if not hit.any():
+        return []
+    missing = err[hit].isin([ERR_MISSING_CODE, ERR_MISSING_PROJECT])
+    kod_out = kod_raw[hit].astype(object).where(~missing, _display(kod_raw[hit]))
+    prj_out = prj_raw[hit].astype(object).where(~missing, _display(prj_raw[hit]))
+    return [
+        [basename, target_sheet, int(i) + 2, str(k), str(p), e]  # A1 fejléc, adatok 2-től
+        for i, k, p, e in zip(df.index[hit], kod_out, prj_out, err[hit])
+    ]
+
+
 # --- Excel styling helpers ---
 def autosize_columns(
     ws,
@@ -240,36 +266,32 @@ def autosize_columns(
     min_col: int = 1,
     max_col: int | None = None,
 ):
-    """MergedCell-safe: indexekből kalkulálja az oszlopbetűt, nem cellából.
+    """A tervezett lap értékeiből (adatblokkokon vektorizáltan), kiírás előtt.
     min_row-t érdemes a táblázat fejlécre állítani (pl. 4), hogy a banner ne torzítson.
     """
-    if max_row is None:
-        max_row = ws.max_row
-    if max_col is None:
-        max_col = ws.max_column
-    for col_idx in range(min_col, max_col + 1):
-        max_len = 0
-        for row in range(min_row, max_row + 1):
-            v = ws.cell(row=row, column=col_idx).value
-            if v is not None:
-                l = len(str(v))
-                if l > max_len:
-                    max_len = l
-        ws.column_dimensions[get_column_letter(col_idx)].width = min(max_len + 2, 60)
+    ws.autosize(min_row=min_row, min_col=min_col, max_col=max_col, cap=60)
 
 
 def add_title_banner(ws, title: str, subtitle: str):
     # címsor a1..f1, piros sáv
-    ws.merge_cells("A1:F1")
-    ws["A1"].value = title
-    ws["A1"].font = Font(size=16, bold=True, color="FFFFFF")
-    ws["A1"].alignment = Alignment(horizontal="left", vertical="center")
-    ws["A1"].fill = PatternFill("solid", fgColor=BRAND_COLOR)
+    ws.merge("A1:F1")
+    ws.set(
+        1,
+        1,
+        title,
+        font=Font(size=16, bold=True, color="FFFFFF"),
+        alignment=Alignment(horizontal="left", vertical="center"),
+        fill=PatternFill("solid", fgColor=BRAND_COLOR),
+    )
 
-    ws.merge_cells("A2:F2")
-    ws["A2"].value = subtitle
-    ws["A2"].font = Font(size=11, color="333333")
-    ws["A2"].alignment = Alignment(horizontal="left", vertical="center")
+    ws.merge("A2:F2")
+    ws.set(
+        2,
+        1,
+        subtitle,
+        font=Font(size=11, color="333333"),
+        alignment=Alignment(horizontal="left", vertical="center"),
+    )
 
 
 def write_table(
@@ -279,40 +301,23 @@ def write_table(
     table_name: str,
     table_style: str = "TableStyleMedium9",
 ):
-    # fejlécek
-    headers = list(df.columns)
-    ws.append([""] * len(headers))  # spacer
-    row0 = start_row
-    for j, h in enumerate(headers, start=1):
-        c = ws.cell(row=row0, column=j, value=h)
-        c.font = Font(bold=True, color="FFFFFF")
-        c.alignment = Alignment(horizontal="center")
-        c.fill = PatternFill("solid", fgColor=ACCENT_COLOR)
-
-    # adatok
-    for _, r in df.iterrows():
-        ws.append([r.get(h) for h in headers])
-
-    last_row = ws.max_row
-    last_col_letter = get_column_letter(len(headers))
-    ref = f"A{row0}:{last_col_letter}{last_row}"
-    table = Table(displayName=table_name, ref=ref)
-    style = TableStyleInfo(
-        name=table_style, showRowStripes=True, showColumnStripes=False
+    # spacer + fejléc + adatok (közvetlenül a DataFrame oszlopaiból, streamelve)
+    ws.write_table(
+        start_row,
+        df,
+        table_name,
+        table_style=table_style,
+        header_style={
+            "font": Font(bold=True, color="FFFFFF"),
+            "alignment": Alignment(horizontal="center"),
+            "fill": PatternFill("solid", fgColor=ACCENT_COLOR),
+        },
     )
-    table.tableStyleInfo = style
-    ws.add_table(table)
-    # fagyasztás a fejléc alatt
-    ws.freeze_panes = None
 
 
 def add_error_highlights(ws, header_row: int):
     # "Hiba" oszlop megkeresése
-    col_idx = None
-    for cell in ws[header_row]:
-        if (str(cell.value or "")).strip().lower() == "hiba":
-            col_idx = cell.column
-            break
+    col_idx = ws.find_header(header_row, "hiba")
     if col_idx is None:
         return
 
@@ -329,7 +334,7 @@ def add_error_highlights(ws, header_row: int):
         stopIfTrue=False,
     )
     rule1.formula = [f'NOT(ISERROR(SEARCH("Érvénytelen páros",{hcol}{header_row+1})))']
-    ws.conditional_formatting.add(rng, rule1)
+    ws.add_conditional(rng, rule1)
 
     # sárga háttér "Hiányzó" esetén
     yellow = DifferentialStyle(fill=PatternFill("solid", fgColor="FFF3CD"))
@@ -341,10 +346,20 @@ def add_error_highlights(ws, header_row: int):
         stopIfTrue=False,
     )
     rule2.formula = [f'NOT(ISERROR(SEARCH("Hiányzó",{hcol}{header_row+1})))']
-    ws.conditional_formatting.add(rng, rule2)
+    ws.add_conditional(rng, rule2)
 
 
-def build_summary_sheet(wb: Workbook, data_df: pd.DataFrame, month_txt: str):
+def _month_order_key(col: pd.Series) -> pd.Series:
+    """Rendezési kulcs: a Hónap oszlop naptári sorrendben, a többi változatlanul."""
+    if col.name != "Hónap":
+        return col
+    order = {m: i for i, m in enumerate(HONAPOK)}
+    return col.map(lambda s: order.get(remove_accents(s), len(HONAPOK)))
+
+
+def build_summary_sheet(
+    wb: StreamingReport, data_df: pd.DataFrame, month_txt: str, per_month: bool = False
+):
     ws = wb.create_sheet("Összegzés")
     add_title_banner(
         ws,
@@ -354,9 +369,8 @@ def build_summary_sheet(wb: Workbook, data_df: pd.DataFrame, month_txt: str):
 
     start = 4
     # 1) Összes hiba darabszám
-    ws["A" + str(start)].value = "Összes hibás sor"
-    ws["A" + str(start)].font = Font(bold=True)
-    ws["B" + str(start)].value = len(data_df.index)
+    ws.set(start, 1, "Összes hibás sor", font=Font(bold=True))
+    ws.set(start, 2, len(data_df.index))
     start += 2
 
     # 2) Hibatípusok számossága
@@ -369,8 +383,7 @@ def build_summary_sheet(wb: Workbook, data_df: pd.DataFrame, month_txt: str):
         )
         for _ in range(1):  # spacer
             ws.append([])
-        ws["A" + str(start)].value = "Hibatípusok"
-        ws["A" + str(start)].font = Font(bold=True)
+        ws.set(start, 1, "Hibatípusok", font=Font(bold=True))
         write_table(
             ws, start + 1, by_err, "Hibatipusok", table_style="TableStyleMedium2"
         )
@@ -383,13 +396,26 @@ def build_summary_sheet(wb: Workbook, data_df: pd.DataFrame, month_txt: str):
             .reset_index(name="Darab")
             .sort_values("Darab", ascending=False)
         )
-        ws["A" + str(start)].value = "Hibák fájlonként"
-        ws["A" + str(start)].font = Font(bold=True)
+        ws.set(start, 1, "Hibák fájlonként", font=Font(bold=True))
         write_table(
             ws, start + 1, by_file, "HibakFajlonkent", table_style="TableStyleMedium4"
         )
         start = ws.max_row + 2
 
+        # 3/b) Teljes év: hibák havonta (naptári sorrendben)
+        if per_month:
+            by_month = (
+                data_df.groupby("Hónap", sort=False)
+                .size()
+                .reset_index(name="Darab")
+                .sort_values("Hónap", key=_month_order_key, kind="stable")
+            )
+            ws.set(start, 1, "Hibák havonta", font=Font(bold=True))
+            write_table(
+                ws, start + 1, by_month, "HibakHavonta", table_style="TableStyleMedium2"
+            )
+            start = ws.max_row + 2
+
         # 4) Ismétlődő hibás párok
         if {"Ügyfélkód", "Projekt neve"}.issubset(set(data_df.columns)):
             by_pair = (
@@ -398,15 +424,11 @@ def build_summary_sheet(wb: Workbook, data_df: pd.DataFrame, month_txt: str):
                 .reset_index(name="Darab")
                 .sort_values("Darab", ascending=False)
             )
-            ws["A" + str(start)].value = "Ismétlődő hibás párok"
-            ws["A" + str(start)].font = Font(bold=True)
+            ws.set(start, 1, "Ismétlődő hibás párok", font=Font(bold=True))
             write_table(
                 ws, start + 1, by_pair, "HibasParok", table_style="TableStyleMedium9"
             )
 
-    # Ne legyen fagyasztás az Összegzés lapon:
-    ws.freeze_panes = None
-
     # A banner miatt jobb, ha a táblázatoktól méretezünk
     autosize_columns(ws, min_row=4)
 
@@ -419,32 +441,70 @@ def main():
             sys.argv[1] if len(sys.argv) > 1 else None
         )
         month_txt = selected_month  # ékezetmentes név
+        year_mode = selected_month == YEAR_ARG
+        if year_mode:
+            # teljes év: minden fájl egyszer nyílik meg, mind a 12 hónap-lap ellenőrizve
+            selected_month = None
+            month_txt = "teljes_ev"
+            logging.info("Hónap szűrő: TELJES ÉV")
 
-        # Engedélyezett párosok
-        allowed = load_allowed_map()
+        # Engedélyezett párosok + aktív ügyfelek: egyszer felépített index
+        index = build_pair_index()
 
         # Ellenőrzés
         all_rows: list[list] = []
-        for fname in os.listdir(FOLDER_PATH):
-            if fname.endswith(".xlsx") and "TS" in fname and not fname.startswith("~$"):
-                print(f"🔧 Feldolgozás: {fname}")
+        if ts_facts.enabled():
+            # éves ténytábla: csak az új/módosult TS fájlokat olvassuk be
+            progress.start("validate_pairs", total=0)
+            store = ts_facts.update(FOLDER_PATH)
+            seen: set[str] = set()
+            for fname, sheet, df in ts_facts.validation_frames(store, selected_month):
+                seen.add(fname)
+                if isinstance(df, str):
+                    all_rows.append([fname, sheet, "-", "-", "-", f"Sheet olvasási hiba: {df}"])
+                    continue
+                all_rows.extend(validate_sheet(fname, sheet, df, index))
+            for fname, entry in store["files"].items():
+                if entry.get("error"):  # mint a validate_file-ban: hibasor, feldolgozottként
+                    all_rows.append([fname, "-", "-", "-", "-", f"Nem nyitható: {entry['error']}"])
+                    seen.add(fname)
+            processed_files = len(seen)
+            skipped_files = len(store["files"]) - len(seen)
+            logging.info(f"Ténytábla lekérdezés: {processed_files} fájl")
+        else:
+            ts_files = [
+                f
+                for f in os.listdir(FOLDER_PATH)
+                if f.endswith(".xlsx") and "TS" in f and not f.startswith("~$")
+            ]
+            progress.start("validate_pairs", total=len(ts_files))
+            for fname in ts_files:
                 path = os.path.join(FOLDER_PATH, fname)
-                before = len(all_rows)
-                rows = validate_file(path, selected_month, allowed)
+                # lapnév-index: hónap lap nélküli fájlt meg sem nyitunk
+                if not has_month_sheet(path, selected_month):
+                    skipped_files += 1
+                    logging.info(f"Kihagyva (nincs megfelelő hónap sheet): {fname}")
+                    progress.file_skipped(fname, "nincs hónap lap")
+                    continue
+                print(f"🔧 Feldolgozás: {fname}")
+                progress.file_started(fname)
+                rows = validate_file(path, selected_month, index)
                 all_rows.extend(rows)
                 if rows is None:
                     skipped_files += 1
+                    progress.file_skipped(fname)
                 else:
                     processed_files += 1
+                    progress.file_finished(fname, rows=len(rows))
 
         row_issues_total = len(all_rows)
         ts = datetime.now().strftime("%Y%m%d_%H%M")
         out_name = f"invalid_parok_{month_txt}_{ts}.xlsx"
 
         # Workbook & szépítés
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Hibák"
+        # write-only kimenet: a lapok tervét a végén egy menetben streameljük
+        wb = StreamingReport()
+        ws = wb.create_sheet("Hibák")
 
         add_title_banner(
             ws,
@@ -462,7 +522,12 @@ def main():
                 all_rows,
                 columns=["Fájl", "Hónap", "Sor", "Ügyfélkód", "Projekt neve", "Hiba"],
             )
-            df.sort_values(by=["Fájl", "Hónap", "Sor"], inplace=True, kind="stable")
+            df.sort_values(
+                by=["Fájl", "Hónap", "Sor"],
+                key=_month_order_key,
+                inplace=True,
+                kind="stable",
+            )
 
         # táblázat beírása és formázása
         start_row = 4  # fejléc sáv után
@@ -471,7 +536,7 @@ def main():
         autosize_columns(ws, min_row=start_row)
 
         # Összegző sheet
-        build_summary_sheet(wb, df, month_txt)
+        build_summary_sheet(wb, df, month_txt, per_month=year_mode)
 
         wb.save(out_name)
         if df.empty:
@@ -482,10 +547,12 @@ def main():
             msg = f"Kész a formázott hibalista: {out_name}"
             print(msg)
             logging.info(msg)
+        progress.output(out_name)
 
     except Exception as e:
         errors += 1
         logging.exception(f"Végzetes hiba futás közben: {e}")
+        progress.error(f"Végzetes hiba futás közben: {e}")
         raise
     finally:
         duration = time.time() - start_time
@@ -496,6 +563,13 @@ def main():
         logging.info(f"   Hibás sorok összesen: {row_issues_total}")
         logging.info(f"   Duration: {duration:.1f}s")
         logging.info("validate_pairs finished")
+        progress.summary(
+            processed=processed_files,
+            skipped=skipped_files,
+            errors=errors,
+            issues=row_issues_total,
+            seconds=round(duration, 2),
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Közös oszlopszélesség-tervező a riportokhoz (összesítés, párellenőrzés,
+számlamelléklet).
+
+A szélességet nem a kész munkalap celláiból számoljuk (soronként/cellánként
+ws.cell(...)), hanem a kiírandó adatokból, még írás előtt: a DataFrame
+oszlopokon vektorizált str.len().max(), az egyedi cellákon (fejléc, címke)
+sima len(str()). A banner sorokat egyszerűen nem adjuk a tervhez.
+
+Szabály (ahogy a szkriptek eddig is): szélesség = leghosszabb szöveg + pad,
+legalább floor, legfeljebb cap (összesítés / párellenőrzés: 60,
+számlamelléklet: 10..90). Üres (None) érték nem számít.
+
+Usage:
+    from width_plan import WidthPlan
+    plan = WidthPlan()
+    plan.add_frame(df, start_col=1)      # fejléc + oszlopok
+    plan.add(3, "Egyedi címke")
+    plan.apply(ws, cap=60)
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+from openpyxl.utils import get_column_letter
+
+
+def max_text_len(values) -> int:
+    """max(len(str(v))) a None-okat kihagyva; tömbön/Series-en vektorizált."""
+    if values is None:
+        return 0
+    if isinstance(values, (str, bytes)) or np.isscalar(values):
+        return len(str(values))
+    if isinstance(values, pd.Series):
+        s = values
+    elif isinstance(values, np.ndarray):
+        s = pd.Series(values)
+    else:  # lista / tuple: típuskövetkeztetés nélkül (a None maradjon None)
+        s = pd.Series(list(values), dtype=object)
+    if s.dtype == object:
+        s = s[[v is not None for v in s.to_numpy()]]
+    if s.empty:
+        return 0
+    return int(s.astype(str).str.len().max())
+
+
+class WidthPlan:
+    """Oszlopindex (1-alapú) → a benne megjelenő értékek (darabokban)."""
+
+    def __init__(self):
+        self._chunks: dict[int, list] = defaultdict(list)
+
+    def add(self, col: int, values) -> "WidthPlan":
+        """Egy érték vagy érték-tömb az adott oszlopban."""
+        if values is not None:
+            self._chunks[col].append(values)
+        return self
+
+    def add_frame(self, df: pd.DataFrame, start_col: int = 1, header: bool = True) -> "WidthPlan":
+        """A DataFrame oszlopai (és fejlécei) start_col-tól."""
+        for j, name in enumerate(df.columns):
+            if header:
+                self.add(start_col + j, str(name))
+            self.add(start_col + j, df.iloc[:, j])
+        return self
+
+    def lengths(self) -> dict[int, int]:
+        return {col: max((max_text_len(c) for c in chunks), default=0) for col, chunks in self._chunks.items()}
+
+    def widths(
+        self,
+        min_col: int = 1,
+        max_col: int | None = None,
+        pad: int = 2,
+        floor: int = 0,
+        cap: int = 60,
+    ) -> dict[int, int]:
+        """{oszlop: szélesség} min_col..max_col-ra (terv nélküli oszlop: 0 hossz)."""
+        lens = self.lengths()
+        if max_col is None:
+            max_col = max(lens, default=min_col - 1)
+        return {c: min(max(lens.get(c, 0) + pad, floor), cap) for c in range(min_col, max_col + 1)}
+
+    def apply(self, ws, **kwargs) -> dict[int, int]:
+        """A tervezett szélességek beállítása a munkalapon (column_dimensions)."""
+        out = self.widths(**kwargs)
+        for col, width in out.items():
+            ws.column_dimensions[get_column_letter(col)].width = width
+        return out
+
+
+__all__ = ["WidthPlan", "max_text_len"]
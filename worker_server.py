@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""
+Tartósan futó ("meleg") worker folyamat a GUI szkript-futtatásaihoz.
+
+A GUI eddig minden kattintásnál új Python folyamatot indított
+(sys.executable <szkript>.py): minden futás újra importálta a pandas-t, az
+openpyxl-t és a segédmodulokat, és újraolvasta a törzsadatokat. Ez a worker
+egyszer indul, előre betölti ezeket (a master_data memóriában tartja a
+Cégadatok / TS kódok adatot, fájl-ujjlenyomat szerint), majd a feladatokat
+a stdin-en kapja, és ugyanabban a folyamatban futtatja a szkriptet
+(runpy, __main__-ként, a megadott argv-vel és munkakönyvtárban).
+
+Protokoll (soronként egy JSON, UTF-8):
+    GUI → worker:  {"id": 1, "argv": ["timesheet_summary.py", "januar"],
+                    "cwd": "C:/TS", "env": {"TS_FACTS": "1"}}
+    worker → GUI:  {"ready": true}                       (induláskor egyszer)
+                   {"id": 1, "line": "... naplósor ..."}  (a szkript kimenete)
+                   {"id": 1, "rc": 0}                     (a feladat vége)
+
+Feladatonként a root logger handlerei lezárulnak és törlődnek (a szkriptek
+logging.basicConfig-ja így újra beállítja a saját log fájlját), a
+sys.stdout / sys.stderr pedig a feladat soraiként kerül vissza a GUI-hoz.
+
+A GUI oldali kliens a WarmWorker: ha a worker foglalt, még nem állt fel,
+leállt, vagy más TS mappára indult, try_submit None-t ad, és a hívó a
+megszokott Popen úton fut. A worker stderr-je a stdout-ba megy: feladat
+közben a feladat naplójába kerül, azon kívül (előtöltés, összeomlás két
+feladat között) az on_output visszahívásba. TS mappa váltásakor a worker
+újraindul, hogy a régi mappából importált modulok ne maradjanak sys.modules-ban.
+
+Usage:
+    from worker_server import WarmWorker
+    worker = WarmWorker(on_output=lambda line: post("warn", line))
+    threading.Thread(target=worker.start, args=(ts_folder,), daemon=True).start()
+    job = worker.try_submit(["validate_pairs.py", "januar"], cwd=ts_folder)
+    if job is not None:
+        for line in job.stdout:
+            ...
+        rc = job.wait()
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import logging
+import os
+import runpy
+import subprocess
+import sys
+import threading
+import traceback
+from pathlib import Path
+
+from job_manager import POPEN_GROUP_KWARGS
+
+# előre betöltött modulok (a TS mappából importálhatók is, ha ott vannak)
+WARM_IMPORTS = ["numpy", "pandas", "openpyxl"]
+WARM_LOCAL_IMPORTS = [
+    "master_data",
+    "sheet_index",
+    "ts_cache",
+    "ts_reader",
+    "ts_ingest",
+    "ts_partials",
+    "ts_facts",
+    "report_writer",
+    "width_plan",
+]
+
+
+# =========================
+# Worker oldal
+# =========================
+class _LineEmitter(io.TextIOBase):
+    """sys.stdout / sys.stderr helyett: minden teljes sor egy protokoll üzenet.
+
+    Szálbiztos: a szkript több szálból is írhat (pl. month_close).
+    """
+
+    def __init__(self, send, job_id):
+        self._send = send
+        self._id = job_id
+        self._buf = ""
+        self._lock = threading.Lock()
+
+    def writable(self):
+        return True
+
+    def write(self, s):
+        with self._lock:
+            self._buf += s
+            while "\n" in self._buf:
+                line, self._buf = self._buf.split("\n", 1)
+                self._send({"id": self._id, "line": line})
+        return len(s)
+
+    def flush(self):
+        pass
+
+    def close_line(self):
+        with self._lock:
+            if self._buf:
+                self._send({"id": self._id, "line": self._buf})
+                self._buf = ""
+
+
+def _reset_logging():
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+        try:
+            h.close()
+        except Exception:
+            pass
+
+
+def _warm_up(cwd: str):
+    for name in WARM_IMPORTS:
+        try:
+            __import__(name)
+        except Exception as e:
+            print(f"előtöltés: {name} import sikertelen: {e}", file=sys.stderr)
+    if cwd not in sys.path:
+        sys.path.insert(0, cwd)
+    for name in WARM_LOCAL_IMPORTS:
+        try:
+            __import__(name)
+        except Exception as e:
+            print(f"előtöltés: {name} import sikertelen: {e}", file=sys.stderr)
+    # törzsadatok (Cégadatok + TS kódok) memóriába — ha a TS mappában van a fájl
+    try:
+        prev = os.getcwd()
+        os.chdir(cwd)
+        try:
+            sys.modules["master_data"].load()
+        finally:
+            os.chdir(prev)
+    except Exception:
+        pass
+
+
+def _run_job(job: dict, send) -> int:
+    argv = [str(a) for a in job["argv"]]
+    cwd = job.get("cwd") or os.getcwd()
+    env = job.get("env") or {}
+    script = os.path.abspath(os.path.join(cwd, argv[0]))
+
+    saved_env = {k: os.environ.get(k) for k in env}
+    saved = (sys.argv, sys.stdout, sys.stderr, os.getcwd(), list(sys.path))
+    out = _LineEmitter(send, job["id"])
+    rc = 0
+    try:
+        os.environ.update({k: str(v) for k, v in env.items()})
+        os.chdir(cwd)
+        sys.path.insert(0, os.path.dirname(script))  # mint "python szkript.py"-nál
+        sys.argv = [script] + argv[1:]
+        sys.stdout = sys.stderr = out
+        _reset_logging()
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            rc = 0
+        elif isinstance(e.code, int):
+            rc = e.code
+        else:
+            print(e.code, file=out)
+            rc = 1
+    except BaseException:
+        traceback.print_exc(file=out)
+        rc = 1
+    finally:
+        out.close_line()
+        _reset_logging()
+        sys.argv, sys.stdout, sys.stderr, prev_cwd, sys.path[:] = saved
+        os.chdir(prev_cwd)
+        for k, v in saved_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+    return rc
+
+
+def serve(cwd: str | None = None):
+    """A worker fő ciklusa: feladatok a stdin-ről, eredmény a stdout-ra."""
+    proto = sys.stdout
+    lock = threading.Lock()
+
+    def send(msg: dict):
+        with lock:
+            proto.write(json.dumps(msg, ensure_ascii=False) + "\n")
+            proto.flush()
+
+    _warm_up(cwd or os.getcwd())
+    send({"ready": True, "pid": os.getpid()})
+    for raw in sys.stdin:
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            job = json.loads(raw)
+        except ValueError:
+            continue
+        if job.get("cmd") == "quit":
+            break
+        rc = _run_job(job, send)
+        send({"id": job["id"], "rc": rc})
+
+
+# =========================
+# GUI (kliens) oldal
+# =========================
+class WarmJob:
+    """Egy futó feladat a worker-ben — a Popen-hez hasonló stdout / wait()."""
+
+    def __init__(self, worker: "WarmWorker", job_id: int):
+        self._worker = worker
+        self._id = job_id
+        self.returncode: int | None = None
+        self.stdout = self._lines()
+
+    def _lines(self):
+        proc = self._worker._proc
+        try:
+            for raw in proc.stdout:
+                try:
+                    msg = json.loads(raw)
+                except ValueError:
+                    yield raw  # nem protokoll sor (pl. egy al-folyamat kiírása)
+                    continue
+                if not isinstance(msg, dict) or msg.get("id") != self._id:
+                    continue
+                if "line" in msg:
+                    yield msg["line"] + "\n"
+                elif "rc" in msg:
+                    self.returncode = int(msg["rc"])
+                    return
+            # EOF: a worker leállt a feladat közben
+            self.returncode = -1
+            self._worker._mark_dead()
+        finally:
+            if self.returncode is None:
+                self.returncode = -1
+            self._worker._release()
+
+    def wait(self) -> int:
+        for _ in self.stdout:
+            pass
+        return self.returncode if self.returncode is not None else -1
+
+    @property
+    def pid(self) -> int | None:
+        proc = self._worker._proc
+        return proc.pid if proc is not None else None
+
+    def kill_tree(self):
+        """Megszakítás: a worker (és minden gyereke) leáll; a sor EOF-fal zárul."""
+        from job_manager import kill_tree
+
+        pid = self.pid
+        if pid:
+            kill_tree(pid)
+        self._worker._mark_dead()
+
+
+class WarmWorker:
+    """A worker folyamat kezelése a GUI-ból (egyszerre egy feladat)."""
+
+    def __init__(
+        self,
+        python: str = sys.executable,
+        script: str | os.PathLike | None = None,
+        on_output=None,
+    ):
+        self._python = python
+        self._script = str(script or Path(__file__).resolve())
+        self._on_output = on_output  # feladaton kívüli kimenet (előtöltés, összeomlás)
+        self._proc: subprocess.Popen | None = None
+        self._cwd: str | None = None
+        self._ready = False
+        self._busy = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._next_id = 0
+
+    def start(self, cwd: str) -> bool:
+        """Indítás és a "ready" üzenet megvárása (háttérszálból hívandó).
+
+        Ha a worker más TS mappára fut, és éppen szabad, újraindul.
+        """
+        cwd = str(cwd)
+        with self._start_lock:
+            self._check_exit()
+            if self.alive():
+                if self._cwd == cwd:
+                    return True
+                if not self._busy.acquire(blocking=False):
+                    return False  # a futó feladat után, a következő start()-nál
+                try:
+                    self._report(f"TS mappa változott, újraindítás ({cwd})")
+                    self.stop()
+                finally:
+                    self._busy.release()
+            self._cwd = cwd
+            try:
+                self._proc = subprocess.Popen(
+                    [self._python, "-u", self._script, "--serve", "--cwd", cwd],
+                    cwd=cwd,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,  # hibák a protokoll mellett, nem elnyelve
+                    text=True,
+                    encoding="utf-8",
+                    errors="replace",
+                    **POPEN_GROUP_KWARGS,
+                )
+                for raw in self._proc.stdout:
+                    try:
+                        msg = json.loads(raw)
+                    except ValueError:
+                        msg = None
+                    if isinstance(msg, dict) and msg.get("ready"):
+                        self._ready = True
+                        break
+                    self._report(raw.rstrip("\n"))
+                else:
+                    self._report(f"leállt indulás közben (rc={self._proc.wait()})")
+            except Exception as e:
+                self._report(f"indítás sikertelen: {e}")
+                self._proc = None
+                self._ready = False
+            return self.alive()
+
+    def alive(self) -> bool:
+        return self._ready and self._proc is not None and self._proc.poll() is None
+
+    def _report(self, line: str):
+        if not line:
+            return
+        if self._on_output is not None:
+            try:
+                self._on_output(f"Meleg worker: {line}")
+            except Exception:
+                pass
+        else:
+            logging.getLogger(__name__).warning(f"Meleg worker: {line}")
+
+    def _check_exit(self):
+        """Feladaton kívül leállt worker: a maradék kimenete és az rc a naplóba."""
+        proc = self._proc
+        if proc is None or not self._ready or proc.poll() is None:
+            return
+        if not self._busy.acquire(blocking=False):
+            return  # a futó WarmJob olvassa a kimenetet
+        try:
+            try:
+                for raw in proc.stdout:
+                    self._report(raw.rstrip("\n"))
+            except Exception:
+                pass
+            self._report(f"váratlanul leállt (rc={proc.returncode})")
+            self._mark_dead()
+        finally:
+            self._busy.release()
+
+    def try_submit(self, argv: list[str], cwd: str, env: dict | None = None) -> WarmJob | None:
+        """Feladat beküldése; None, ha a worker nem áll készen, foglalt vagy
+        más TS mappára indult (ilyenkor a háttérben újraindul)."""
+        self._check_exit()
+        if self.alive() and self._cwd != str(cwd):
+            threading.Thread(target=self.start, args=(str(cwd),), daemon=True).start()
+            return None
+        if not self.alive() or not self._busy.acquire(blocking=False):
+            return None
+        try:
+            self._next_id += 1
+            job = {"id": self._next_id, "argv": list(argv), "cwd": str(cwd), "env": env or {}}
+            self._proc.stdin.write(json.dumps(job, ensure_ascii=False) + "\n")
+            self._proc.stdin.flush()
+        except Exception:
+            self._mark_dead()
+            self._busy.release()
+            return None
+        return WarmJob(self, self._next_id)
+
+    def _release(self):
+        if self._busy.locked():
+            self._busy.release()
+
+    def _mark_dead(self):
+        self._ready = False
+        proc, self._proc = self._proc, None
+        if proc is not None:
+            try:
+                proc.kill()
+            except Exception:
+                pass
+
+    def stop(self):
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.write(json.dumps({"cmd": "quit"}) + "\n")
+            self._proc.stdin.flush()
+            self._proc.wait(timeout=3)
+        except Exception:
+            pass
+        self._mark_dead()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Meleg worker a GUI szkript-futtatásaihoz")
+    parser.add_argument("--serve", action="store_true", help="Feladatok fogadása a stdin-en")
+    parser.add_argument("--cwd", default=None, help="TS mappa (előtöltéshez)")
+    args = parser.parse_args(argv)
+    if args.serve:
+        serve(args.cwd)
+
+
+__all__ = ["WarmJob", "WarmWorker", "serve"]
+
+
+if __name__ == "__main__":
+    main()